@@ -0,0 +1,42 @@
+"""add solver_profiles
+
+Revision ID: 3c1e8a9d2b47
+Revises: fc364f5d5cf5
+Create Date: 2026-10-17 09:12:31.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e8a9d2b47'
+down_revision: Union[str, Sequence[str], None] = 'fc364f5d5cf5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'solver_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('max_time_in_seconds', sa.Float(), nullable=False),
+        sa.Column('num_workers', sa.Integer(), nullable=False),
+        sa.Column('relative_gap_limit', sa.Float(), nullable=False),
+        sa.Column('random_seed', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('location_id', 'name', name='uq_solver_profiles_location_name')
+    )
+    op.create_index(op.f('ix_solver_profiles_id'), 'solver_profiles', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_solver_profiles_id'), table_name='solver_profiles')
+    op.drop_table('solver_profiles')
@@ -0,0 +1,55 @@
+"""add employee_week_states
+
+Revision ID: 5b9e3f7a1c20
+Revises: 8d4f2b6e1a93
+Create Date: 2026-10-17 15:24:08.318512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e3f7a1c20'
+down_revision: Union[str, Sequence[str], None] = '8d4f2b6e1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'employee_week_states',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('employee_id', sa.Integer(), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('days_worked', sa.Integer(), nullable=False),
+        sa.Column('streak', sa.Integer(), nullable=False),
+        sa.Column('worked_fri_night', sa.Boolean(), nullable=False),
+        sa.Column('worked_sat_noon', sa.Boolean(), nullable=False),
+        sa.Column('worked_sat_night', sa.Boolean(), nullable=False),
+        sa.Column('mornings', sa.Integer(), nullable=False),
+        sa.Column('evenings', sa.Integer(), nullable=False),
+        sa.Column('nights', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('location_id', 'week_start', 'employee_id',
+                            name='uq_employee_week_states_location_week_employee')
+    )
+    op.create_index(op.f('ix_employee_week_states_id'), 'employee_week_states', ['id'], unique=False)
+    op.create_index(op.f('ix_employee_week_states_employee_id'), 'employee_week_states', ['employee_id'],
+                    unique=False)
+
+    # Schema only. The rows are backfilled by f3c9a1d7b5e2, once duplicate assignments are ruled out by
+    # a4c7e2d9f318; employees without a row fall back to scanning their assignments.
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_employee_week_states_employee_id'), table_name='employee_week_states')
+    op.drop_index(op.f('ix_employee_week_states_id'), table_name='employee_week_states')
+    op.drop_table('employee_week_states')
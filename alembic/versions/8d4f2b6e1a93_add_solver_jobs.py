@@ -0,0 +1,55 @@
+"""add solver_jobs
+
+Revision ID: 8d4f2b6e1a93
+Revises: 3c1e8a9d2b47
+Create Date: 2026-10-17 11:02:47.551903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2b6e1a93'
+down_revision: Union[str, Sequence[str], None] = '3c1e8a9d2b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'solver_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('profile_name', sa.String(), nullable=True),
+        sa.Column('warm_start', sa.Boolean(), nullable=False),
+        sa.Column('requested_by_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Enum('queued', 'running', 'succeeded', 'failed', 'cancelled', name='jobstatus'),
+                  nullable=False),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.Column('solutions_found', sa.Integer(), nullable=False),
+        sa.Column('best_objective', sa.Float(), nullable=True),
+        sa.Column('best_bound', sa.Float(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+        sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_solver_jobs_id'), 'solver_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_solver_jobs_status'), 'solver_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_solver_jobs_status'), table_name='solver_jobs')
+    op.drop_index(op.f('ix_solver_jobs_id'), table_name='solver_jobs')
+    op.drop_table('solver_jobs')
+    sa.Enum(name='jobstatus').drop(op.get_bind(), checkfirst=True)
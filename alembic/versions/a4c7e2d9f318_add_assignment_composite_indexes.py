@@ -0,0 +1,58 @@
+"""add composite indexes and a unique key on assignments
+
+Revision ID: a4c7e2d9f318
+Revises: 5b9e3f7a1c20
+Create Date: 2026-10-17 16:02:41.907215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2d9f318'
+down_revision: Union[str, Sequence[str], None] = '5b9e3f7a1c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Shown when duplicates block the unique key: review them, then keep the oldest row of each by hand
+DEDUPE_INSTRUCTIONS = """\
+Review the duplicates with:
+    SELECT employee_id, date, shift_id, COUNT(*) FROM assignments
+    GROUP BY employee_id, date, shift_id HAVING COUNT(*) > 1;
+then keep the oldest row of each and run the upgrade again:
+    DELETE FROM assignments WHERE id NOT IN
+    (SELECT MIN(id) FROM assignments GROUP BY employee_id, date, shift_id);"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Refuse to enforce the key over duplicated (employee, date, shift) rows rather than pick which to drop
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT employee_id, date, shift_id, COUNT(*) FROM assignments "
+        "GROUP BY employee_id, date, shift_id HAVING COUNT(*) > 1 ORDER BY employee_id, date, shift_id"
+    )).all()
+    if duplicates:
+        examples = "\n".join(f"    employee {e}, {d}, shift {s}: {n} rows" for e, d, s, n in duplicates[:10])
+        raise RuntimeError(
+            f"{len(duplicates)} (employee, date, shift) combinations are assigned more than once, "
+            f"so uq_assignments_employee_date_shift cannot be created. First ones:\n{examples}\n"
+            f"{DEDUPE_INSTRUCTIONS}"
+        )
+    op.create_unique_constraint('uq_assignments_employee_date_shift', 'assignments',
+                                ['employee_id', 'date', 'shift_id'])
+    op.create_index('ix_assignments_location_date', 'assignments', ['location_id', 'date'], unique=False)
+    op.create_index('ix_assignments_location_employee_date', 'assignments',
+                    ['location_id', 'employee_id', 'date'], unique=False)
+    op.create_index('ix_weekly_constraints_employee_date', 'weekly_constraints', ['employee_id', 'date'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_weekly_constraints_employee_date', table_name='weekly_constraints')
+    op.drop_index('ix_assignments_location_employee_date', table_name='assignments')
+    op.drop_index('ix_assignments_location_date', table_name='assignments')
+    op.drop_constraint('uq_assignments_employee_date_shift', 'assignments', type_='unique')
@@ -0,0 +1,28 @@
+"""add solver_jobs.attempts
+
+Revision ID: b7d2e9c4a6f1
+Revises: f3c9a1d7b5e2
+Create Date: 2026-10-17 23:41:12.907315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e9c4a6f1'
+down_revision: Union[str, Sequence[str], None] = 'f3c9a1d7b5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('solver_jobs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('solver_jobs', 'attempts')
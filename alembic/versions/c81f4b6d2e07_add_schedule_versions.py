@@ -0,0 +1,40 @@
+"""add schedule_versions
+
+Revision ID: c81f4b6d2e07
+Revises: a4c7e2d9f318
+Create Date: 2026-10-17 17:11:52.640183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4b6d2e07'
+down_revision: Union[str, Sequence[str], None] = 'a4c7e2d9f318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'schedule_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('location_id', 'week_start', name='uq_schedule_versions_location_week')
+    )
+    op.create_index(op.f('ix_schedule_versions_id'), 'schedule_versions', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_schedule_versions_id'), table_name='schedule_versions')
+    op.drop_table('schedule_versions')
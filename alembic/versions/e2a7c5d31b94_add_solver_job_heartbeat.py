@@ -0,0 +1,28 @@
+"""add solver_jobs.heartbeat_at
+
+Revision ID: e2a7c5d31b94
+Revises: c81f4b6d2e07
+Create Date: 2026-10-17 19:02:37.418265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5d31b94'
+down_revision: Union[str, Sequence[str], None] = 'c81f4b6d2e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('solver_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('solver_jobs', 'heartbeat_at')
@@ -0,0 +1,138 @@
+"""backfill employee_week_states
+
+Revision ID: f3c9a1d7b5e2
+Revises: e2a7c5d31b94
+Create Date: 2026-10-17 21:14:06.552301
+
+"""
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a1d7b5e2'
+down_revision: Union[str, Sequence[str], None] = 'e2a7c5d31b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of the tables and of the week summary rules (app.services.history_state_service and
+# app.engine.shift_timing at the time of writing), so later changes to the app do not change this migration.
+shift_definitions = sa.table(
+    'shift_definitions',
+    sa.column('id', sa.Integer), sa.column('location_id', sa.Integer), sa.column('name', sa.String),
+    sa.column('start_time', sa.String), sa.column('end_time', sa.String)
+)
+assignments = sa.table(
+    'assignments',
+    sa.column('location_id', sa.Integer), sa.column('employee_id', sa.Integer), sa.column('shift_id', sa.Integer),
+    sa.column('date', sa.Date)
+)
+employee_week_states = sa.table(
+    'employee_week_states',
+    sa.column('location_id', sa.Integer), sa.column('employee_id', sa.Integer), sa.column('week_start', sa.Date),
+    sa.column('days_worked', sa.Integer), sa.column('streak', sa.Integer),
+    sa.column('worked_fri_night', sa.Boolean), sa.column('worked_sat_noon', sa.Boolean),
+    sa.column('worked_sat_night', sa.Boolean), sa.column('mornings', sa.Integer), sa.column('evenings', sa.Integer),
+    sa.column('nights', sa.Integer)
+)
+
+MORNING, EVENING, NIGHT = 'morning', 'evening', 'night'
+NAME_KEYWORDS = ((NIGHT, ("לילה", "night")), (EVENING, ("ערב", "צהריים", "evening")), (MORNING, ("בוקר", "morning")))
+
+
+def _minutes(value):
+    parts = value.strip().split(":") if isinstance(value, str) else []
+    if len(parts) < 2 or not all(p.isdigit() for p in parts[:2]):
+        return None
+    hours, minutes = int(parts[0]), int(parts[1])
+    return hours * 60 + minutes if 0 <= hours < 24 and 0 <= minutes < 60 else None
+
+
+def _shift_kind(name, start_time, end_time):
+    start, end = _minutes(start_time), _minutes(end_time)
+    if start is not None and end is not None and start != end:
+        middle = (start + (end if end > start else end + 24 * 60)) // 2 % (24 * 60)
+        if 6 * 60 <= middle < 14 * 60:
+            return MORNING
+        if 14 * 60 <= middle < 22 * 60:
+            return EVENING
+        return NIGHT
+    name = (name or "").strip().lower()
+    for kind, keywords in NAME_KEYWORDS:
+        if any(keyword in name for keyword in keywords):
+            return kind
+    return None
+
+
+def _summarize_week(week_start, worked, kinds, previous_streak):
+    row = dict(days_worked=0, streak=0, worked_fri_night=False, worked_sat_noon=False, worked_sat_night=False,
+               mornings=0, evenings=0, nights=0)
+    dates = set()
+    for day, shift_id in worked:
+        dates.add(day)
+        kind = kinds.get(shift_id)
+        if kind == MORNING:
+            row['mornings'] += 1
+        elif kind == EVENING:
+            row['evenings'] += 1
+        elif kind == NIGHT:
+            row['nights'] += 1
+        if day.weekday() == 4 and kind == NIGHT:
+            row['worked_fri_night'] = True
+        elif day.weekday() == 5:
+            if kind == EVENING:
+                row['worked_sat_noon'] = True
+            elif kind == NIGHT:
+                row['worked_sat_night'] = True
+
+    trailing = 0
+    while trailing < 7 and week_start + timedelta(days=6 - trailing) in dates:
+        trailing += 1
+    row['days_worked'] = len(dates)
+    row['streak'] = 7 + previous_streak if trailing == 7 else trailing
+    return row
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rebuild the history rows of every location from its assignments (one location at a time),
+    # now that duplicate assignments are ruled out by uq_assignments_employee_date_shift
+    bind = op.get_bind()
+    location_ids = bind.execute(sa.select(assignments.c.location_id).distinct()).scalars().all()
+    for location_id in location_ids:
+        kinds = {
+            shift_id: _shift_kind(name, start_time, end_time)
+            for shift_id, name, start_time, end_time in bind.execute(sa.select(
+                shift_definitions.c.id, shift_definitions.c.name,
+                shift_definitions.c.start_time, shift_definitions.c.end_time
+            ).where(shift_definitions.c.location_id == location_id))
+        }
+
+        # (employee_id, week_start) -> [(date, shift_id)]; weeks start on Sunday
+        worked = {}
+        for employee_id, day, shift_id in bind.execute(sa.select(
+            assignments.c.employee_id, assignments.c.date, assignments.c.shift_id
+        ).where(assignments.c.location_id == location_id)):
+            week_start = day - timedelta(days=(day.weekday() + 1) % 7)
+            worked.setdefault((employee_id, week_start), []).append((day, shift_id))
+
+        # Oldest week first, so each week continues the streak of the one before it
+        rows, streaks = [], {}
+        for employee_id, week_start in sorted(worked):
+            previous = streaks.get((employee_id, week_start - timedelta(days=7)), 0)
+            row = _summarize_week(week_start, worked[(employee_id, week_start)], kinds, previous)
+            streaks[(employee_id, week_start)] = row['streak']
+            rows.append(dict(row, location_id=location_id, employee_id=employee_id, week_start=week_start))
+
+        bind.execute(employee_week_states.delete().where(employee_week_states.c.location_id == location_id))
+        if rows:
+            bind.execute(employee_week_states.insert(), rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data only: the rows stay valid for the previous revision
+    pass
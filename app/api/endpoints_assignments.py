@@ -24,15 +24,40 @@ This guarantees 100% data consistency, minimizes network traffic, preserves hist
 shift IDs, and provides an idempotent endpoint (safe to call multiple times).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+import threading
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from typing import List
-from datetime import date
+from typing import List, Optional
+from datetime import date, timedelta
 
 from app.core import models, schemas
 from app.core.database import get_db
-from app.services.weekly_schedule_service import generate_weekly_schedule
+from app.core.enums import ScheduleMode
+from app.engine.callbacks import SolutionProgressCallback
+from app.services.weekly_schedule_service import (
+    generate_weekly_schedule,
+    evaluate_weekly_schedule,
+    repair_weekly_schedule,
+    prepare_optimizer,
+    build_schedule_result,
+    keys_to_draft
+)
+from app.services.assignment_sync_service import (
+    StaleScheduleVersion,
+    apply_assignment_patch,
+    load_schedule_etag,
+    load_schedule_versions,
+    lock_schedule_etag,
+    sync_assignments
+)
+from app.services.scoring_sessions import apply_scoring_moves, open_scoring_session, scoring_sessions
+from app.services.batch_schedule_service import generate_batch_schedules, resolve_batch_locations
+from app.tasks.job_queue import get_job_queue
 
 # Security Dependencies
 from app.api.dependencies import (
@@ -43,43 +68,69 @@ from app.api.dependencies import (
 
 router = APIRouter()
 
+# How often a silent event stream checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 1.0
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    """Whether an If-Match / If-None-Match header value names 'etag' (weak comparison, '*' matches all)."""
+    if header is None:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in [c[2:] if c.startswith("W/") else c for c in candidates]
+
+
+def _verify_location_access(db: Session, current_user: models.User, location_id: int, detail: str,
+                            allow_own_location: bool = False):
+    """
+    Helper to ensure a non-admin user is assigned to the location directly or through its client.
+    With allow_own_location, a regular employee may also access the location they work at (read-only views).
+    """
+    if current_user.role == schemas.RoleEnum.ADMIN:
+        return
+
+    if (allow_own_location and current_user.role == schemas.RoleEnum.EMPLOYEE and current_user.employee_id
+            and current_user.employee.location_id == location_id):
+        return
+
+    allowed_location_ids = [loc.id for loc in current_user.locations]
+    allowed_client_ids = [client.id for client in current_user.clients]
+
+    loc_stmt = select(models.Location.client_id).where(models.Location.id == location_id)
+    loc_client_id = db.execute(loc_stmt).scalar_one_or_none()
+
+    if location_id not in allowed_location_ids and loc_client_id not in allowed_client_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
 
 @router.get("/", response_model=List[schemas.AssignmentResponse])
 def read_assignments(
     location_id: int,
     start_date: date,
     end_date: date,
+    response: Response,
     employee_id: int = None,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
     Retrieve the working schedule (assignments) for a specific location and date range.
     Access restricted based on user role and permitted locations.
+    The response carries the range's ETag (from the week versions); polling with If-None-Match
+    gets 304 Not Modified, without loading the assignments, until one of the weeks is saved.
     """
-    # 1. RBAC Check: Ensure user has access to this location
-    if current_user.role != schemas.RoleEnum.ADMIN:
-        allowed_location_ids = [loc.id for loc in current_user.locations]
-        allowed_client_ids = [client.id for client in current_user.clients]
-
-        # Check if it's a regular employee querying their own location
-        is_own_location = (
-            current_user.role == schemas.RoleEnum.EMPLOYEE
-            and current_user.employee_id
-            and current_user.employee.location_id == location_id
-        )
-
-        # Fetch the location's client_id to verify M2M client access
-        loc_stmt = select(models.Location.client_id).where(models.Location.id == location_id)
-        loc_client_id = db.execute(loc_stmt).scalar_one_or_none()
+    # 1. RBAC Check: Ensure user has access to this location (employees may read their own location)
+    _verify_location_access(db, current_user, location_id, "Not authorized to view schedule for this location",
+                            allow_own_location=True)
 
-        if not is_own_location and location_id not in allowed_location_ids and loc_client_id not in allowed_client_ids:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to view schedule for this location"
-            )
+    # 2. Conditional read: one indexed lookup of the week versions
+    etag = load_schedule_etag(db, location_id, start_date, end_date)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
 
-    # 2. Build and execute query
+    # 3. Build and execute query
     stmt = select(models.Assignment).where(
         models.Assignment.location_id == location_id,
         models.Assignment.date >= start_date,
@@ -100,6 +151,8 @@ def sync_weekly_assignments(
     start_date: date,
     end_date: date,
     assignments_in: List[schemas.AssignmentCreate],
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 
     # Guard: Admins, Managers, and Schedulers can sync schedules
@@ -110,77 +163,182 @@ def sync_weekly_assignments(
     Adds new shifts, removes deleted shifts, and keeps existing shifts intact
     to preserve their original database IDs.
     Restricted RBAC to ensure users only modify their permitted locations..
+    With If-Match (the ETag of the last read), the sync is rejected with 412 when another save
+    changed one of the weeks since, instead of silently overwriting it.
+    The response carries the new ETag, and 'versions' maps each week (Sunday) the sync changed to its
+    new version number, the base_version of the next patch save of that week.
     """
     # 1. RBAC Check: Ensure user has access to modify this location
-    if current_user.role != schemas.RoleEnum.ADMIN:
-        allowed_location_ids = [loc.id for loc in current_user.locations]
-        allowed_client_ids = [client.id for client in current_user.clients]
-
-        loc_stmt = select(models.Location.client_id).where(models.Location.id == location_id)
-        loc_client_id = db.execute(loc_stmt).scalar_one_or_none()
+    _verify_location_access(db, current_user, location_id, "Not authorized to modify the schedule for this location")
 
-        if location_id not in allowed_location_ids and loc_client_id not in allowed_client_ids:
+    # 2. Optimistic concurrency: the week versions are locked until the commit, then compared
+    if if_match is not None:
+        current_etag = lock_schedule_etag(db, location_id, start_date, end_date)
+        if not _etag_matches(if_match, current_etag):
+            db.rollback()
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to modify the schedule for this location"
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="The schedule was changed since it was loaded; reload it and retry",
+                headers={"ETag": current_etag}
             )
 
-    # 2. Fetch all existing assignments within the specified date range
-    stmt = select(models.Assignment).where(
-        models.Assignment.location_id == location_id,
-        models.Assignment.date >= start_date,
-        models.Assignment.date <= end_date
+    # 3. Compare with the existing keys and apply the diff with one INSERT and one DELETE;
+    #    the rolling history of the employees and weeks that changed is refreshed in the same transaction
+    result = sync_assignments(
+        db, location_id, start_date, end_date,
+        ((a.employee_id, a.shift_id, a.date) for a in assignments_in)
     )
-    existing_assignments = db.execute(stmt).scalars().all()
 
-    # Map existing assignments using a unique key: (employee_id, shift_id, date)
-    # This allows for O(1) lookup time during the comparison phase
-    existing_map = {
-        (a.employee_id, a.shift_id, a.date): a for a in existing_assignments
+    # Commit all changes (inserts and deletes) in a single, safe transaction
+    db.commit()
+    response.headers["ETag"] = load_schedule_etag(db, location_id, start_date, end_date)
+
+    return {
+        "message": "Schedule synchronized successfully",
+        "added": result.added,
+        "removed": result.removed,
+        "unchanged": result.unchanged,
+        "versions": {week.isoformat(): version for week, version in result.versions.items()}
     }
 
-    incoming_keys = set()
-    added_count = 0
-
-    # 2. Identify and insert new assignments that don't exist in the DB
-    for a in assignments_in:
-        key = (a.employee_id, a.shift_id, a.date)
-        incoming_keys.add(key)
-
-        if key not in existing_map:
-            # This is a completely new shift added by the frontend
-            new_db_assignment = models.Assignment(
-                location_id=location_id,
-                employee_id=a.employee_id,
-                shift_id=a.shift_id,
-                date=a.date
-            )
-            db.add(new_db_assignment)
-            added_count += 1
 
-    # 3. Identify and delete assignments that were removed from the frontend's state
-    removed_count = 0
-    for key, db_obj in existing_map.items():
-        if key not in incoming_keys:
-            # The shift exists in the DB but was not sent in the payload, hence it was deleted
-            db.delete(db_obj)
-            removed_count += 1
+@router.get("/weeks/{location_id}/version", status_code=status.HTTP_200_OK)
+def read_week_version(
+        location_id: int,
+        start_date: date,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """Current version of a week (0 when never saved), to be sent back with patch saves."""
+    _verify_location_access(db, current_user, location_id, "Not authorized to view schedule for this location")
+    return {
+        "location_id": location_id,
+        "start_date": start_date,
+        "version": load_schedule_versions(db, location_id, [start_date])[start_date]
+    }
 
-    # Commit all changes (inserts and deletes) in a single, safe transaction
+
+@router.patch("/weeks/{location_id}", status_code=status.HTTP_200_OK)
+def patch_week_assignments(
+        location_id: int,
+        start_date: date,
+        patch_in: schemas.AssignmentPatch,
+        response: Response,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Save explicit add / remove edits of one week (start_date is its Sunday), instead of the whole state.
+    The patch names the week version it was made against; it is applied atomically, or rejected with
+    409 and the current version when the week was saved in between.
+    """
+    _verify_location_access(db, current_user, location_id, "Not authorized to modify the schedule for this location")
+
+    try:
+        result = apply_assignment_patch(
+            db, location_id, start_date, patch_in.base_version,
+            [(a.employee_id, a.shift_id, a.date) for a in patch_in.add],
+            [(a.employee_id, a.shift_id, a.date) for a in patch_in.remove]
+        )
+    except StaleScheduleVersion as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail={"message": str(e), "current_version": e.current_version})
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     db.commit()
+    response.headers["ETag"] = load_schedule_etag(db, location_id, start_date, start_date + timedelta(days=6))
 
     return {
-        "message": "Schedule synchronized successfully",
-        "added": added_count,
-        "removed": removed_count,
-        "unchanged": len(existing_assignments) - removed_count
+        "message": "Schedule patched successfully",
+        "added": result.added,
+        "removed": result.removed,
+        "version": result.version
     }
 
 
+@router.post("/evaluate/{location_id}", status_code=status.HTTP_200_OK)
+def evaluate_assignments(
+        location_id: int,
+        start_date: date,
+        assignments_in: List[schemas.AssignmentCreate],
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Score a week's assignments (e.g. a manually edited draft) without running the solver.
+    Returns the broken hard constraints ('conflicts') and the penalty breakdown of the objective.
+    """
+    _verify_location_access(db, current_user, location_id, "Not authorized to view schedule for this location")
+
+    try:
+        return evaluate_weekly_schedule(db, location_id, start_date, assignments_in)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/scoring/{location_id}", status_code=status.HTTP_200_OK)
+def open_scoring(
+        location_id: int,
+        start_date: date,
+        assignments_in: Optional[List[schemas.AssignmentCreate]] = None,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Open (or reset) the drag-and-drop scoring session of a week.
+    Starts from the posted assignments, or from the saved week when the body is empty.
+    """
+    _verify_location_access(db, current_user, location_id, "Not authorized to view schedule for this location")
+    return open_scoring_session(db, location_id, start_date, assignments_in)
+
+
+@router.post("/scoring/{location_id}/moves", status_code=status.HTTP_200_OK)
+def apply_scoring(
+        location_id: int,
+        start_date: date,
+        moves_in: List[schemas.ScoringMove],
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Apply grid edits to the open scoring session and return the change in penalties and violations.
+    Only the terms touching the edited slots are re-scored, so each call costs the same on any week size.
+    404 when the session is gone (closed, expired or held by another API process): reopen it and resend.
+    """
+    _verify_location_access(db, current_user, location_id, "Not authorized to view schedule for this location")
+
+    try:
+        return apply_scoring_moves(location_id, start_date, moves_in)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.delete("/scoring/{location_id}", status_code=status.HTTP_204_NO_CONTENT)
+def close_scoring(
+        location_id: int,
+        start_date: date,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """Close the week's scoring session (e.g. when the schedule screen is left)."""
+    _verify_location_access(db, current_user, location_id, "Not authorized to view schedule for this location")
+    scoring_sessions.close(location_id, start_date)
+
+
 @router.post("/auto-generate/{location_id}", status_code=status.HTTP_200_OK)
 def run_auto_shift(
         location_id: int,
         start_date: date,
+        profile: Optional[str] = None,
+        warm_start: bool = True,
+        use_cache: bool = True,
+        mode: ScheduleMode = ScheduleMode.OPTIMIZE,
+        greedy_hint: bool = False,
+        draft: Optional[List[schemas.AssignmentCreate]] = None,
         db: Session = Depends(get_db),
         # Guard: Admins, Managers, and Schedulers can run optimization
         current_user: models.User = Depends(get_current_scheduler_user)
@@ -188,21 +346,232 @@ def run_auto_shift(
     """
     Trigger the automated shift scheduling engine for a specific location.
     Restricted to Admin users only.
+    The optional 'profile' selects a named solver budget (e.g. 'interactive', 'overnight').
+    An optional draft in the body (or, by default, last week's schedule) warm-starts the solver.
+    Repeating a request with unchanged inputs returns the cached result ('use_cache=false' forces a new solve).
+    'mode=instant' skips the solver and returns a greedy draft in milliseconds (status 'HEURISTIC');
+    'greedy_hint=true' warm-starts the solver from that greedy draft instead of last week.
     """
     # 1. RBAC Check: Ensure user has access to run optimization for this location
-    if current_user.role != schemas.RoleEnum.ADMIN:
-        allowed_location_ids = [loc.id for loc in current_user.locations]
-        allowed_client_ids = [client.id for client in current_user.clients]
+    _verify_location_access(db, current_user, location_id, "Not authorized to run auto-shift for this location")
+
+    # 2. Call the service layer to handle logic and database operations
+    try:
+        result = generate_weekly_schedule(
+            db, location_id, start_date, profile_name=profile, draft=draft, warm_start=warm_start,
+            use_cache=use_cache, mode=mode, greedy_hint=greedy_hint
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return result
+
+
+@router.post("/auto-generate/{location_id}/repair", status_code=status.HTTP_200_OK)
+def repair_auto_shift(
+        location_id: int,
+        start_date: date,
+        employee_id: int,
+        from_date: date,
+        to_date: Optional[date] = None,
+        profile: Optional[str] = None,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Repair the published week after an employee drops out (e.g. calls in sick on Tuesday).
+    Days before 'from_date' stay as published; the employee is unavailable from 'from_date' to 'to_date'
+    (default: end of the week). Returns the full draft with the fewest possible changes,
+    plus the 'added' and 'removed' assignments.
+    """
+    _verify_location_access(db, current_user, location_id, "Not authorized to run auto-shift for this location")
+
+    try:
+        return repair_weekly_schedule(
+            db, location_id, start_date, employee_id, from_date, to_date=to_date, profile_name=profile
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        loc_stmt = select(models.Location.client_id).where(models.Location.id == location_id)
-        loc_client_id = db.execute(loc_stmt).scalar_one_or_none()
 
-        if location_id not in allowed_location_ids and loc_client_id not in allowed_client_ids:
+@router.post("/auto-generate-batch", status_code=status.HTTP_200_OK)
+def run_batch_auto_shift(
+        start_date: date,
+        client_id: Optional[int] = None,
+        organization_id: Optional[int] = None,
+        profile: Optional[str] = None,
+        warm_start: bool = True,
+        use_cache: bool = True,
+        max_cpus: Optional[int] = Query(None, ge=1),
+        max_time_per_location: Optional[float] = Query(None, gt=0),
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Auto-generate the week for every location of a client or an organization in one call.
+    Locations are solved in parallel processes; 'max_cpus' caps the cores used by the whole batch
+    and 'max_time_per_location' caps each location's solver profile.
+    Returns one report with the status, objective, timings and draft of every location.
+    400 when the batch could run longer than MAX_BATCH_REQUEST_SECONDS (e.g. the 'overnight' profile):
+    lower max_time_per_location or queue the locations as background jobs.
+    """
+    try:
+        locations = resolve_batch_locations(db, client_id=client_id, organization_id=organization_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # RBAC Check: a non-admin must have access to every location in the batch
+    if current_user.role != schemas.RoleEnum.ADMIN:
+        allowed_location_ids = {loc.id for loc in current_user.locations}
+        allowed_client_ids = {client.id for client in current_user.clients}
+        if any(loc.id not in allowed_location_ids and loc.client_id not in allowed_client_ids for loc in locations):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to run auto-shift for this location"
+                detail="Not authorized to run auto-shift for every location in this batch"
             )
 
-    # 2. Call the service layer to handle logic and database operations
-    result = generate_weekly_schedule(db, location_id, start_date)
-    return result
\ No newline at end of file
+    try:
+        return generate_batch_schedules(
+            db, start_date, client_id=client_id, organization_id=organization_id, profile_name=profile,
+            warm_start=warm_start, use_cache=use_cache, max_cpus=max_cpus,
+            max_time_per_location=max_time_per_location
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Formats a single Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/auto-generate/{location_id}/stream")
+def stream_auto_shift(
+        request: Request,
+        location_id: int,
+        start_date: date,
+        profile: Optional[str] = None,
+        warm_start: bool = True,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Stream improving drafts over Server-Sent Events while the solver runs.
+    Each 'solution' event carries the draft with its objective, bound and wall time;
+    a final 'done' event carries the same payload as the synchronous endpoint.
+    Closing the connection stops the search, so schedulers can stop once a draft is good enough.
+    """
+    _verify_location_access(db, current_user, location_id, "Not authorized to run auto-shift for this location")
+
+    try:
+        optimizer, inputs = prepare_optimizer(db, location_id, start_date, profile_name=profile, warm_start=warm_start)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def event_stream():
+        # The solver thread hands events to the event loop, so waiting for the next draft holds no worker thread
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def publish(event: str, payload: dict):
+            try:
+                loop.call_soon_threadsafe(events.put_nowait, (event, payload))
+            except RuntimeError:
+                pass  # The loop is gone: nobody is listening any more
+
+        def on_solution(progress: dict):
+            progress["draft_assignments"] = keys_to_draft(progress.pop("assignments"), location_id, start_date)
+            publish("solution", progress)
+
+        def run_solver():
+            try:
+                solver_status = optimizer.solve(
+                    inputs.employee_settings, inputs.employee_states,
+                    solution_callback=SolutionProgressCallback(on_solution, optimizer.shift_vars)
+                )
+                publish("done", build_schedule_result(optimizer, solver_status, location_id, start_date))
+            except Exception as e:
+                publish("error", {"detail": str(e)})
+
+        threading.Thread(target=run_solver, daemon=True).start()
+        try:
+            while True:
+                try:
+                    event, payload = await asyncio.wait_for(events.get(), timeout=DISCONNECT_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    continue
+                yield _sse_event(event, payload)
+                if event in ("done", "error"):
+                    break
+        finally:
+            # Client disconnected (or the stream ended): release the solver threads
+            optimizer.stop()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# -------
+# ----- Background Auto-Generate Jobs ------
+
+@router.post("/auto-generate/{location_id}/jobs", response_model=schemas.SolverJobResponse,
+             status_code=status.HTTP_202_ACCEPTED)
+def enqueue_auto_shift_job(
+        location_id: int,
+        start_date: date,
+        profile: Optional[str] = None,
+        warm_start: bool = True,
+        db: Session = Depends(get_db),
+        queue=Depends(get_job_queue),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Queue an auto-generate run for a worker process and return its job immediately.
+    Poll GET /jobs/{job_id} for progress; the finished draft is stored in 'result'.
+    """
+    _verify_location_access(db, current_user, location_id, "Not authorized to run auto-shift for this location")
+
+    return queue.enqueue(
+        location_id, start_date, profile_name=profile, warm_start=warm_start, requested_by_id=current_user.id
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.SolverJobResponse)
+def read_auto_shift_job(
+        job_id: int,
+        db: Session = Depends(get_db),
+        queue=Depends(get_job_queue),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Poll the status, progress (solutions found, best objective and bound) and result of a job.
+    """
+    job = queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    _verify_location_access(db, current_user, job.location_id, "Not authorized to view this job")
+    return job
+
+
+@router.delete("/jobs/{job_id}", response_model=schemas.SolverJobResponse)
+def cancel_auto_shift_job(
+        job_id: int,
+        db: Session = Depends(get_db),
+        queue=Depends(get_job_queue),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Cancel a job. Queued jobs are cancelled at once; running jobs stop their search
+    and keep the best draft found so far.
+    """
+    job = queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    _verify_location_access(db, current_user, job.location_id, "Not authorized to cancel this job")
+    return queue.request_cancel(job_id)
@@ -282,4 +282,85 @@ def get_location_weights(
             **schemas.LocationWeightsBase().model_dump()
         )
 
-    return weights
\ No newline at end of file
+    return weights
+
+
+# -------
+# ----- Solver Profile Operations ------
+
+def _get_accessible_location(db: Session, current_user: models.User, location_id: int) -> models.Location:
+    """
+    Returns the location if it exists and the user may manage it (directly or through its client).
+    Raises 404 otherwise, as read_location_by_id does, so a location's existence is not leaked.
+    """
+    location = db.execute(select(models.Location).where(models.Location.id == location_id)).scalar_one_or_none()
+
+    if location and current_user.role != schemas.RoleEnum.ADMIN:
+        allowed_location_ids = [loc.id for loc in current_user.locations]
+        allowed_client_ids = [client.id for client in current_user.clients]
+        if location.id not in allowed_location_ids and location.client_id not in allowed_client_ids:
+            location = None
+
+    if not location:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Location not found or access denied"
+        )
+    return location
+
+
+@router.get("/{location_id}/solver-profiles", response_model=List[schemas.SolverProfileResponse])
+def get_location_solver_profiles(
+        location_id: int,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Retrieve the stored solver profiles for a specific location.
+    Built-in profiles ('interactive', 'overnight') are used when no row overrides them.
+    """
+    # 1. RBAC Verification
+    _get_accessible_location(db, current_user, location_id)
+
+    stmt = select(models.SolverProfile).where(
+        models.SolverProfile.location_id == location_id
+    ).order_by(models.SolverProfile.name)
+    return db.execute(stmt).scalars().all()
+
+
+@router.put("/{location_id}/solver-profiles/{profile_name}", response_model=schemas.SolverProfileResponse)
+def upsert_location_solver_profile(
+        location_id: int,
+        profile_name: str,
+        profile_in: schemas.SolverProfileUpdate,
+        db: Session = Depends(get_db),
+        # Guard: Admins, Managers, and Schedulers can configure solver budgets
+        current_user: models.User = Depends(get_current_scheduler_user)
+):
+    """
+    Create or update a named solver profile for a specific location.
+    """
+    # 1. RBAC Verification
+    _get_accessible_location(db, current_user, location_id)
+
+    # 2. Upsert by (location_id, name)
+    stmt = select(models.SolverProfile).where(
+        models.SolverProfile.location_id == location_id,
+        models.SolverProfile.name == profile_name
+    )
+    profile = db.execute(stmt).scalar_one_or_none()
+
+    if profile:
+        for key, value in profile_in.model_dump().items():
+            setattr(profile, key, value)
+    else:
+        profile = models.SolverProfile(
+            location_id=location_id,
+            name=profile_name,
+            **profile_in.model_dump()
+        )
+        db.add(profile)
+
+    db.commit()
+    db.refresh(profile)
+    return profile
@@ -19,4 +19,17 @@ class ConstraintType(str, enum.Enum):
 class ConstraintSource(str, enum.Enum):
     YALAM = "yalam"
     MISHMAROT = "mishmarot"
-    SHIFT_ORG = "shiftorg"
\ No newline at end of file
+    SHIFT_ORG = "shiftorg"
+
+# Lifecycle of a background auto-generate job
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+# How auto-generate builds the draft
+class ScheduleMode(str, enum.Enum):
+    OPTIMIZE = "optimize"  # CP-SAT within the solver profile's budget
+    INSTANT = "instant"    # Greedy heuristic only, returns in milliseconds
@@ -1,13 +1,13 @@
 import enum
 from datetime import date, datetime
-from sqlalchemy import Integer, String, ForeignKey, Boolean, Date, Enum, Table, Column, DateTime
+from sqlalchemy import Integer, String, ForeignKey, Boolean, Date, Enum, Table, Column, DateTime, Float, UniqueConstraint, JSON, Index
 from sqlalchemy.sql import func # for server_default timestamp
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from typing import List, Optional
 
 from app.core.database import Base
-from app.core.enums import ConstraintType, RoleEnum
+from app.core.enums import ConstraintType, RoleEnum, JobStatus
 
 
 # ==========================================
@@ -70,6 +70,7 @@ class Location(Base):
     shift_definitions: Mapped[List["ShiftDefinition"]] = relationship("ShiftDefinition", back_populates="location")
     assignments: Mapped[List["Assignment"]] = relationship("Assignment", back_populates="location")
     weights: Mapped[Optional["LocationWeights"]] = relationship("LocationWeights", back_populates="location", uselist=False)
+    solver_profiles: Mapped[List["SolverProfile"]] = relationship("SolverProfile", back_populates="location")
 
 
 # ==========================================
@@ -135,6 +136,28 @@ class LocationWeights(Base):
     location: Mapped["Location"] = relationship("Location", back_populates="weights")
 
 
+class SolverProfile(Base):
+    """
+    Named CP-SAT search budget for a location.
+    Example: 'interactive' (2s, 8 workers, 1% gap) for the schedule screen,
+    'overnight' (10 min, all cores) for batch runs.
+    """
+    __tablename__ = "solver_profiles"
+    __table_args__ = (UniqueConstraint("location_id", "name", name="uq_solver_profiles_location_name"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    location_id: Mapped[int] = mapped_column(Integer, ForeignKey("locations.id"))
+    name: Mapped[str] = mapped_column(String)  # e.g., "interactive", "overnight"
+
+    # CP-SAT parameters
+    max_time_in_seconds: Mapped[float] = mapped_column(Float, default=2.0)
+    num_workers: Mapped[int] = mapped_column(Integer, default=8)  # 0 = all cores
+    relative_gap_limit: Mapped[float] = mapped_column(Float, default=0.01)
+    random_seed: Mapped[int] = mapped_column(Integer, default=0)
+
+    location: Mapped["Location"] = relationship("Location", back_populates="solver_profiles")
+
+
 class Employee(Base):
     __tablename__ = "employees"
 
@@ -191,6 +214,8 @@ class EmployeeSettings(Base):
 
 class WeeklyConstraint(Base):
     __tablename__ = "weekly_constraints"
+    # Constraints are loaded for a location's employees over a date range
+    __table_args__ = (Index("ix_weekly_constraints_employee_date", "employee_id", "date"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id"))
@@ -206,6 +231,13 @@ class WeeklyConstraint(Base):
 class Assignment(Base):
     """The final schedule result."""
     __tablename__ = "assignments"
+    __table_args__ = (
+        # An employee works a given shift at most once a day; the sync upserts on this key
+        UniqueConstraint("employee_id", "date", "shift_id", name="uq_assignments_employee_date_shift"),
+        # Week loads and history scans: a location over a date range, optionally for some employees
+        Index("ix_assignments_location_date", "location_id", "date"),
+        Index("ix_assignments_location_employee_date", "location_id", "employee_id", "date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"))
@@ -217,6 +249,91 @@ class Assignment(Base):
     employee: Mapped["Employee"] = relationship("Employee", back_populates="assignments")
     shift_def: Mapped["ShiftDefinition"] = relationship("ShiftDefinition")
 
+
+class EmployeeWeekState(Base):
+    """
+    Rolling history of an employee at a location, one row per worked week (weeks start on Sunday).
+    Kept up to date by the assignments sync, so the solver reads last week's state with one indexed
+    lookup instead of rescanning assignments. Weeks without any assignment have no row.
+    """
+    __tablename__ = "employee_week_states"
+    __table_args__ = (UniqueConstraint("location_id", "week_start", "employee_id",
+                                       name="uq_employee_week_states_location_week_employee"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"))
+    employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id"), index=True)
+    week_start: Mapped[date] = mapped_column(Date)
+
+    days_worked: Mapped[int] = mapped_column(Integer, default=0)
+    # Consecutive worked days up to the week's Saturday, continuing into earlier weeks without a cap
+    streak: Mapped[int] = mapped_column(Integer, default=0)
+    worked_fri_night: Mapped[bool] = mapped_column(Boolean, default=False)
+    worked_sat_noon: Mapped[bool] = mapped_column(Boolean, default=False)
+    worked_sat_night: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    # Shifts worked this week per kind (see app/engine/shift_timing.py)
+    mornings: Mapped[int] = mapped_column(Integer, default=0)
+    evenings: Mapped[int] = mapped_column(Integer, default=0)
+    nights: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class ScheduleVersion(Base):
+    """
+    Version number of a location's week (weeks start on Sunday), bumped by every save of that week.
+    Patch saves name the version they were made against and are rejected when it is stale.
+    Weeks never saved have no row (version 0).
+    """
+    __tablename__ = "schedule_versions"
+    __table_args__ = (UniqueConstraint("location_id", "week_start", name="uq_schedule_versions_location_week"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"))
+    week_start: Mapped[date] = mapped_column(Date)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class SolverJob(Base):
+    """
+    A queued auto-generate run, consumed by worker processes (app/tasks/worker.py).
+    Holds progress while running and the final draft once finished.
+    """
+    __tablename__ = "solver_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"))
+    start_date: Mapped[date] = mapped_column(Date)
+    profile_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    warm_start: Mapped[bool] = mapped_column(Boolean, default=True)
+    requested_by_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
+
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus, values_callable=lambda obj: [e.value for e in obj]),
+        default=JobStatus.QUEUED,
+        index=True
+    )
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Number of times a worker claimed the job; past MAX_ATTEMPTS an abandoned job fails instead of running again
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+    # Progress (updated at most once a second while solving, and once more at the end)
+    solutions_found: Mapped[int] = mapped_column(Integer, default=0)
+    best_objective: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    best_bound: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    # Outcome
+    result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Lease of the worker running the job, renewed while it solves; an expired lease re-queues the job
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
 # ==========================================
 #       User M2M Association Tables
 # ==========================================
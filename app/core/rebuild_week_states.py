@@ -0,0 +1,40 @@
+"""
+Rebuilds the employee_week_states rows of every location from its assignments.
+
+The rows are backfilled by the migrations; run this whenever the stored history must be repaired
+(e.g. after assignments were written outside the sync endpoints):
+    python -m app.core.rebuild_week_states [location_id ...]
+"""
+import sys
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.models import Assignment
+from app.services.history_state_service import rebuild_week_states
+
+
+def rebuild_all_week_states(db: Session, location_ids: List[int] = None) -> int:
+    """
+    Rebuilds the given locations (all locations with assignments by default), one commit per location.
+    Returns the number of rows written.
+    """
+    if not location_ids:
+        location_ids = db.execute(select(Assignment.location_id).distinct()).scalars().all()
+
+    written = 0
+    for location_id in location_ids:
+        written += rebuild_week_states(db, location_id)
+        db.commit()
+    return written
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        rows = rebuild_all_week_states(db, [int(arg) for arg in sys.argv[1:]])
+        print(f"Rebuilt {rows} employee week states.")
+    finally:
+        db.close()
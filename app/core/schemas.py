@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict, Field, EmailStr
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import date, datetime
-from app.core.enums import ConstraintType, RoleEnum, ConstraintSource
+from app.core.enums import ConstraintType, RoleEnum, ConstraintSource, JobStatus
 
 # =======================
 # Organization & Hierarchy
@@ -91,6 +91,30 @@ class LocationWeightsResponse(LocationWeightsBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+# =======================
+# Solver Profiles
+# =======================
+
+class SolverProfileBase(BaseModel):
+    """
+    CP-SAT search budget selectable on auto-generate.
+    num_workers=0 lets the solver use all cores.
+    """
+    max_time_in_seconds: float = Field(default=2.0, gt=0)
+    num_workers: int = Field(default=8, ge=0)
+    relative_gap_limit: float = Field(default=0.01, ge=0)
+    random_seed: int = Field(default=0, ge=0)
+
+class SolverProfileUpdate(SolverProfileBase):
+    pass
+
+class SolverProfileResponse(SolverProfileBase):
+    id: int
+    location_id: int
+    name: str
+
+    model_config = ConfigDict(from_attributes=True)
+
 # =======================
 # Locations
 # =======================
@@ -243,6 +267,54 @@ class AssignmentResponse(BaseModel):
     date: date
     model_config = ConfigDict(from_attributes=True)
 
+class AssignmentPatch(BaseModel):
+    """
+    Explicit edits of one week, made against the week's version (0 for a week never saved).
+    The patch is applied whole or not at all.
+    """
+    base_version: int
+    add: List[AssignmentCreate] = []
+    remove: List[AssignmentCreate] = []
+
+class ScoringMove(BaseModel):
+    """
+    One edit in a scoring session. 'add' / 'remove' toggle employee_id's shift on that date;
+    'move' drags it from from_employee_id to employee_id.
+    """
+    action: Literal["add", "remove", "move"]
+    employee_id: int
+    shift_id: int
+    date: date
+    from_employee_id: Optional[int] = None
+
+# =======================
+# Auto-Generate Jobs
+# =======================
+class SolverJobResponse(BaseModel):
+    """
+    Status of a background auto-generate job, polled by the schedule screen.
+    'result' holds the same payload as the synchronous auto-generate endpoint once finished.
+    """
+    id: int
+    location_id: int
+    start_date: date
+    profile_name: Optional[str] = None
+    warm_start: bool = True
+    status: JobStatus
+    cancel_requested: bool = False
+    attempts: int = 0
+    solutions_found: int = 0
+    best_objective: Optional[float] = None
+    best_bound: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 # =======================
 # Constraints
 # =======================
@@ -0,0 +1,29 @@
+from typing import Callable, Dict
+from ortools.sat.python import cp_model
+
+
+class SolutionProgressCallback(cp_model.CpSolverSolutionCallback):
+    """
+    Reports every improving solution CP-SAT finds during a solve.
+    on_solution receives a dict with the solution count, objective, best bound and wall time.
+    When shift_vars is given, the dict also carries the (emp_id, day, shift_id) keys assigned
+    in that solution under "assignments".
+    """
+
+    def __init__(self, on_solution: Callable[[dict], None], shift_vars: Dict = None):
+        super().__init__()
+        self.on_solution = on_solution
+        self.shift_vars = shift_vars
+        self.solution_count = 0
+
+    def on_solution_callback(self):
+        self.solution_count += 1
+        progress = {
+            "solutions_found": self.solution_count,
+            "objective": self.ObjectiveValue(),
+            "bound": self.BestObjectiveBound(),
+            "wall_time": self.WallTime()
+        }
+        if self.shift_vars is not None:
+            progress["assignments"] = [key for key, var in self.shift_vars.items() if self.Value(var)]
+        self.on_solution(progress)
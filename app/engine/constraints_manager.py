@@ -1,17 +1,96 @@
+import time
+
 from ortools.sat.python import cp_model
 from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+from app.engine.demand_index import DemandIndex
+from app.engine.shift_timing import MORNING, EVENING, NIGHT, shift_timing
+from app.engine.variable_tensor import ShiftVarTensor
+from app.engine.symmetry import MAX_LEX_LENGTH
 from typing import List, Dict
 
 
 class ConstraintManager:
-    def __init__(self, model, shift_vars, employees, shifts, demands, weights, num_days=7):
+    def __init__(self, model, shift_vars, employees, shifts, demands, weights, num_days=7, demand_index=None,
+                 symmetry_classes=None, diagnose=False, compact_penalties=True):
         self.model = model
+        # Constraint families sum over precomputed tensor slices; plain dicts (engine tests) are wrapped
+        if not isinstance(shift_vars, ShiftVarTensor):
+            shift_vars = ShiftVarTensor.from_dict(shift_vars, employees, num_days, shifts)
         self.shift_vars = shift_vars
         self.employees = employees
         self.shifts = shifts
         self.demands = demands
         self.weights = weights
         self.num_days = num_days
+        # Required staff per (day, shift), built once unless the caller already has one
+        self.demand_index = demand_index or DemandIndex(shifts, demands, num_days)
+        # Rest rules and shift kinds, from the shift times (or the positional convention without times)
+        self.timing = shift_timing(shifts)
+        # Groups of interchangeable employee positions (see symmetry.find_interchangeable_classes)
+        self.symmetry_classes = symmetry_classes or []
+        # In diagnose mode every hard constraint is guarded by an assumption literal,
+        # keyed by a label describing the family and the employee/slot it belongs to
+        self.guards: Dict[tuple, tuple] = {} if diagnose else None
+        # Half-reify the minimized penalty indicators (one clause each) instead of full equivalence
+        self.compact_penalties = compact_penalties
+        # Per constraint family: wall time, variables / constraints added and objective terms contributed
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._mark = None
+
+    def _start_stats(self, objective_terms: list = None):
+        """Starts attributing model growth to the next _record_stats() call."""
+        proto = self.model.Proto()
+        self._mark = (time.perf_counter(), len(proto.variables), len(proto.constraints),
+                      len(objective_terms) if objective_terms is not None else 0)
+
+    def _record_stats(self, family: str, objective_terms: list = None):
+        """
+        Adds everything built since the previous mark to 'family', then moves the mark.
+        Families recorded inside the per-employee loop accumulate across employees.
+        """
+        proto = self.model.Proto()
+        now = time.perf_counter()
+        num_terms = len(objective_terms) if objective_terms is not None else 0
+        started, num_vars, num_constraints, prev_terms = self._mark
+        entry = self.stats.setdefault(family, {"seconds": 0.0, "variables": 0, "constraints": 0,
+                                               "objective_terms": 0})
+        entry["seconds"] += now - started
+        entry["variables"] += len(proto.variables) - num_vars
+        entry["constraints"] += len(proto.constraints) - num_constraints
+        entry["objective_terms"] += num_terms - prev_terms
+        self._mark = (now, len(proto.variables), len(proto.constraints), num_terms)
+
+    def _guard(self, family: str, **details) -> list:
+        """
+        Enforcement literals for one hard-constraint group (an empty list outside diagnose mode).
+        Constraints sharing the same family and details share one literal.
+        """
+        if self.guards is None:
+            return []
+        key = (family,) + tuple(sorted(details.items()))
+        if key not in self.guards:
+            literal = self.model.NewBoolVar(f'guard_{len(self.guards)}_{family}')
+            self.guards[key] = (literal, {"family": family, **details})
+        return [self.guards[key][0]]
+
+    def guard_labels(self) -> Dict[int, dict]:
+        """Maps each assumption literal's index to its label."""
+        return {literal.Index(): label for literal, label in (self.guards or {}).values()}
+
+    def _penalty_indicator(self, name: str, literals: list, weight: int):
+        """
+        Boolean penalty indicator that is 1 when all 'literals' are 1.
+        With a non-negative weight the objective pushes the indicator down, so the single clause
+        indicator >= AND(literals) is enough (half-reification); otherwise it is fully reified.
+        """
+        indicator = self.model.NewBoolVar(name)
+        if self.compact_penalties and weight >= 0:
+            self.model.AddBoolOr([literal.Not() for literal in literals] + [indicator])
+        else:
+            self.model.AddBoolAnd(literals).OnlyEnforceIf(indicator)
+            # If at least one of them is not assigned, the indicator must be False (0)
+            self.model.AddBoolOr([literal.Not() for literal in literals]).OnlyEnforceIf(indicator.Not())
+        return indicator
 
     def apply_all_constraints(self, employee_settings: Dict[int, EmployeeSettings], employee_states: Dict[int, any], weekly_constraints: List[any]):
         """
@@ -23,37 +102,40 @@ class ConstraintManager:
         return self._get_objective_terms(employee_settings, employee_states)
 
     def _add_hard_constraints(self, employee_settings, employee_states, weekly_constraints):
+        self._start_stats()
+
         # 1. Demand Constraint: Every shift must be filled
+        sv = self.shift_vars
         for d in range(self.num_days):
-            for s_def in self.shifts:
+            for s, s_def in enumerate(self.shifts):
                 # Sum of all employees assigned to this specific shift on this day
-                shift_total = sum(self.shift_vars[(emp.id, d, s_def.id)] for emp in self.employees)
-
-                # Assume the default is the general number of staff defined for the shift
-                required_staff = getattr(s_def, 'default_staff_count', 1)
+                shift_total = cp_model.LinearExpr.Sum(sv.by_day_shift[d][s])
 
-                # Find if we have a specific demand from the UI
-                for dem in self.demands:
-                    # Updated field names based on our new DB models
-                    if dem.shift_definition_id == s_def.id and dem.day_of_week == d:
-                        required_staff = dem.required_employees
-                        break
+                # Default staff count, overridden by a specific demand from the UI if one exists
+                required_staff = self.demand_index.required(d, s_def.id)
 
                 # CRITICAL BUG FIX: Actually enforce the demand constraint!
-                self.model.Add(shift_total == required_staff)
+                self.model.Add(shift_total == required_staff).OnlyEnforceIf(
+                    self._guard('demand', day_index=d, shift_id=s_def.id, required=required_staff))
+        self._record_stats('demand')
 
         # 2. Daily Limit: One shift per day per employee
-        for emp in self.employees:
+        for e, emp in enumerate(self.employees):
             for d in range(self.num_days):
-                self.model.Add(sum(self.shift_vars[(emp.id, d, s.id)] for s in self.shifts) <= 1)
+                self.model.AddAtMostOne(sv.by_emp_day[e][d]).OnlyEnforceIf(
+                    self._guard('one_shift_per_day', employee_id=emp.id))
+        self._record_stats('daily_limit')
 
         # 3. Weekly Limits (from EmployeeSettings)
-        for emp in self.employees:
+        for e, emp in enumerate(self.employees):
             settings = employee_settings.get(emp.id)
             if settings:
-                all_emp_shifts = [self.shift_vars[(emp.id, d, s.id)] for d in range(self.num_days) for s in self.shifts]
-                self.model.Add(sum(all_emp_shifts) <= settings.max_shifts_per_week)
-                self.model.Add(sum(all_emp_shifts) >= settings.min_shifts_per_week)
+                total_shifts = cp_model.LinearExpr.Sum(sv.by_emp[e])
+                guard = self._guard('weekly_shift_limits', employee_id=emp.id,
+                                    min_shifts=settings.min_shifts_per_week, max_shifts=settings.max_shifts_per_week)
+                self.model.Add(total_shifts <= settings.max_shifts_per_week).OnlyEnforceIf(guard)
+                self.model.Add(total_shifts >= settings.min_shifts_per_week).OnlyEnforceIf(guard)
+        self._record_stats('weekly_limits')
 
         # 4. Enforce Specific Weekly Employee Constraints (Time-offs / Blocks)
         if weekly_constraints:
@@ -67,59 +149,71 @@ class ConstraintManager:
                 if (emp_id, day_idx, shift_id) in self.shift_vars:
                     # Handle lowercase enum values or uppercase fallbacks
                     if c_type in ('cannot_work', 'CANNOT_WORK'):
+                        if (emp_id, day_idx, shift_id) in sv.pruned:
+                            continue  # Already a constant 0 (domain reduction)
                         # Hard block: Employee cannot be assigned to this shift
-                        self.model.Add(self.shift_vars[(emp_id, day_idx, shift_id)] == 0)
+                        self.model.Add(self.shift_vars[(emp_id, day_idx, shift_id)] == 0).OnlyEnforceIf(
+                            self._guard('cannot_work', employee_id=emp_id, day_index=day_idx, shift_id=shift_id))
                     elif c_type in ('must_work', 'MUST_WORK'):
                         # Forced assignment: Employee must work this shift
-                        self.model.Add(self.shift_vars[(emp_id, day_idx, shift_id)] == 1)
+                        self.model.Add(self.shift_vars[(emp_id, day_idx, shift_id)] == 1).OnlyEnforceIf(
+                            self._guard('must_work', employee_id=emp_id, day_index=day_idx, shift_id=shift_id))
+        self._record_stats('weekly_constraints')
 
         # 5. Prevent Back-to-Back Shifts
-        # Assuming shifts are ordered chronologically by start time
-        for emp in self.employees:
+        # Every (today, tomorrow) shift pair with too little rest in between (see shift_timing)
+        for e, emp in enumerate(self.employees):
             for d in range(self.num_days - 1):
-                if len(self.shifts) > 1:
-                    morning_shift_id = self.shifts[0].id
-                    night_shift_id = self.shifts[-1].id
-                    # Cannot work any late shift today and then morning shift tomorrow
-
-                    self.model.Add(
-                        self.shift_vars[(emp.id, d, night_shift_id)] +
-                        self.shift_vars[(emp.id, d + 1, morning_shift_id)] <= 1
-                    )
+                for a, b in self.timing.hard_pairs:
+                    self.model.AddAtMostOne([sv.by_emp_day[e][d][a], sv.by_emp_day[e][d + 1][b]]).OnlyEnforceIf(
+                        self._guard('no_back_to_back', employee_id=emp.id))
+        self._record_stats('back_to_back')
 
-        # 5b. History-based Back-to-Back: Prevent Sunday morning if worked Saturday night last week
+        # 5b. History-based Back-to-Back: Prevent the Sunday shifts too close to last Saturday's night shift
         # This bridges the gap between the previous week and the current one
-        if len(self.shifts) > 0:
-            morning_shift_id = self.shifts[0].id
-            for emp in self.employees:
-                state = employee_states.get(emp.id)
-                # Check if the employee worked the last night shift of the previous week
-                if state and getattr(state, 'worked_last_sat_night', False):
-                    # Hard constraint: Sunday (day 0) morning shift must be 0
-                    self.model.Add(self.shift_vars[(emp.id, 0, morning_shift_id)] == 0)
-
-        # 6. Max Work Streak (Maximum 7 consecutive working days, considering history)
         for emp in self.employees:
-            work_days_vars = []
-            for d in range(self.num_days):
-                is_working_day = self.model.NewBoolVar(f'working_day_e{emp.id}_d{d}')
-                # True if employee works any shift on day 'd'
-                self.model.Add(sum(self.shift_vars[(emp.id, d, s.id)] for s in self.shifts) > 0).OnlyEnforceIf(
-                    is_working_day)
-                self.model.Add(sum(self.shift_vars[(emp.id, d, s.id)] for s in self.shifts) == 0).OnlyEnforceIf(
-                    is_working_day.Not())
-                work_days_vars.append(is_working_day)
+            state = employee_states.get(emp.id)
+            # Check if the employee worked the last night shift of the previous week
+            if state and getattr(state, 'worked_last_sat_night', False):
+                for pos in self.timing.after_sat_night_forbidden:
+                    # Hard constraint: this Sunday (day 0) shift must be 0
+                    self.model.Add(self.shift_vars[(emp.id, 0, self.shifts[pos].id)] == 0).OnlyEnforceIf(
+                        self._guard('rest_after_last_saturday_night', employee_id=emp.id))
+        self._record_stats('history_back_to_back')
 
+        # 6. Max Work Streak (Maximum 7 consecutive working days, considering history)
+        # The daily limit above allows at most one shift per day, so the number of shifts
+        # worked in a window equals the number of working days in it (no per-day indicator needed)
+        S = len(self.shifts)
+        for e, emp in enumerate(self.employees):
             state = employee_states.get(emp.id)
             streak = state.history_streak if state else 0
 
             if streak > 0:
-                limit = 7 - streak
+                # A streak of 7 or more days already breaks the rule: Sunday must be a day off
+                limit = max(7 - streak, 1)
                 # Apply historical constraint if within current week
-                if 0 < limit <= self.num_days:
-                    self.model.Add(sum(work_days_vars[0:limit]) < limit)
+                if limit <= self.num_days:
+                    self.model.Add(cp_model.LinearExpr.Sum(sv.by_emp[e][0:limit * S]) <= limit - 1).OnlyEnforceIf(
+                        self._guard('max_work_streak', employee_id=emp.id, history_streak=streak))
             else:
-                self.model.Add(sum(work_days_vars) < 7)
+                self.model.Add(cp_model.LinearExpr.Sum(sv.by_emp[e][0:7 * S]) <= 6).OnlyEnforceIf(
+                    self._guard('max_work_streak', employee_id=emp.id, history_streak=streak))
+        self._record_stats('streak')
+
+        # 7. Symmetry Breaking: interchangeable employees get their schedules in lexicographic order,
+        # so the search never visits the same roster with two of them swapped
+        length = self.num_days * S
+        coeffs = [1 << (length - 1 - k) for k in range(length)]
+        for members in self.symmetry_classes:
+            for a, b in zip(members, members[1:]):
+                if length <= MAX_LEX_LENGTH:
+                    self.model.Add(cp_model.LinearExpr.WeightedSum(sv.by_emp[a], coeffs) >=
+                                   cp_model.LinearExpr.WeightedSum(sv.by_emp[b], coeffs))
+                else:
+                    # Too many slots for a single weighted sum: order by shift count instead
+                    self.model.Add(cp_model.LinearExpr.Sum(sv.by_emp[a]) >= cp_model.LinearExpr.Sum(sv.by_emp[b]))
+        self._record_stats('symmetry_breaking')
 
     def _get_objective_terms(self, employee_settings, employee_states):
         objective_terms = []
@@ -142,35 +236,25 @@ class ConstraintManager:
             'MIN_EVENINGS': get_safe_weight('min_evenings', 2)
         }
 
-        for emp in self.employees:
-
-            # Map shift IDs assuming chronological order (Morning, Evening, Night)
-            morning_shift_id = self.shifts[0].id if len(self.shifts) > 0 else None
-            evening_shift_id = self.shifts[1].id if len(self.shifts) > 1 else None
-            night_shift_id = self.shifts[2].id if len(self.shifts) > 2 else None
+        sv = self.shift_vars
+        timing = self.timing
+        self._start_stats(objective_terms)
+        for e, emp in enumerate(self.employees):
 
             # Rest Gap (Soft Constraint) ---
-            # Penalize assigning an Evening shift followed by a Morning shift the next day
-            if morning_shift_id and evening_shift_id:
-                for d in range(self.num_days - 1):
-                    # Create a boolean variable triggered only if both shifts are assigned
-                    bad_gap = self.model.NewBoolVar(f'bad_gap_eve_morn_e{emp.id}_d{d}')
-
-                    # Link the boolean variable to the condition (Evening today AND Morning tomorrow)
-                    self.model.AddBoolAnd([
-                        self.shift_vars[(emp.id, d, evening_shift_id)],
-                        self.shift_vars[(emp.id, d + 1, morning_shift_id)]
-                    ]).OnlyEnforceIf(bad_gap)
-
-                    # If at least one of them is not assigned, bad_gap must be False (0)
-                    self.model.AddBoolOr([
-                        self.shift_vars[(emp.id, d, evening_shift_id)].Not(),
-                        self.shift_vars[(emp.id, d + 1, morning_shift_id)].Not()
-                    ]).OnlyEnforceIf(bad_gap.Not())
+            # Penalize (today, tomorrow) shift pairs with a short rest in between, e.g. Evening then Morning
+            for d in range(self.num_days - 1):
+                for a, b in timing.soft_pairs:
+                    # Boolean triggered only if both shifts are assigned (shift a today AND shift b tomorrow)
+                    bad_gap = self._penalty_indicator(f'bad_gap_e{emp.id}_d{d}_s{a}_{b}', [
+                        sv.by_emp_day[e][d][a],
+                        sv.by_emp_day[e][d + 1][b]
+                    ], w['REST_GAP'])
 
                     # Add the penalty weight to the objective terms
                     objective_terms.append(bad_gap * w['REST_GAP'])
             # ------------------------------------------------
+            self._record_stats('rest_gap', objective_terms)
 
             # 1. History-based rest gap constraints
             state = employee_states.get(emp.id, {})
@@ -179,11 +263,14 @@ class ConstraintManager:
             worked_sat_noon = state.worked_last_sat_noon if state else False
             worked_sat_night = state.worked_last_sat_night if state else False
 
-            if worked_sat_noon and morning_shift_id:
-                objective_terms.append(self.shift_vars[(emp.id, 0, morning_shift_id)] * w['REST_GAP'])
+            if worked_sat_noon:
+                for pos in timing.after_sat_noon_penalized:
+                    objective_terms.append(sv.by_emp_day[e][0][pos] * w['REST_GAP'])
 
-            if worked_sat_night and evening_shift_id:
-                objective_terms.append(self.shift_vars[(emp.id, 0, evening_shift_id)] * w['REST_GAP'])
+            if worked_sat_night:
+                for pos in timing.after_sat_night_penalized:
+                    objective_terms.append(sv.by_emp_day[e][0][pos] * w['REST_GAP'])
+            self._record_stats('history_rest_gap', objective_terms)
 
             # Variables needed for subsequent calculations
             settings = employee_settings.get(emp.id)
@@ -192,64 +279,40 @@ class ConstraintManager:
                 # Use explicit target_shifts if available, otherwise fallback to the average
                 target = settings.target_shifts if getattr(settings, 'target_shifts', None) is not None else (settings.min_shifts_per_week + settings.max_shifts_per_week) // 2
 
-                all_emp_shifts = [self.shift_vars[(emp.id, d, s.id)] for d in range(self.num_days) for s in self.shifts]
-                total_worked = sum(all_emp_shifts)
+                total_worked = cp_model.LinearExpr.Sum(sv.by_emp[e])
 
                 delta = self.model.NewIntVar(0, self.num_days, f'delta_target_e{emp.id}')
                 self.model.Add(total_worked - target <= delta)
                 self.model.Add(target - total_worked <= delta)
                 objective_terms.append(delta * w['TARGET_SHIFTS'])
+                self._record_stats('target_shifts', objective_terms)
 
                 # 3. Shift Type Limits (Min/Max Mornings, Evenings, Nights)
-                if morning_shift_id:
-                    mornings = [self.shift_vars[(emp.id, d, morning_shift_id)] for d in range(self.num_days)]
-                    if settings.max_mornings is not None:
-                        ex_m = self.model.NewIntVar(0, self.num_days, f'ex_morn_e{emp.id}')
-                        self.model.Add(sum(mornings) <= settings.max_mornings + ex_m)
-                        objective_terms.append(ex_m * w['MAX_MORNINGS'])
-                    if settings.min_mornings is not None:
-                        sh_m = self.model.NewIntVar(0, self.num_days, f'sh_morn_e{emp.id}')
-                        self.model.Add(sum(mornings) + sh_m >= settings.min_mornings)
-                        objective_terms.append(sh_m * w['MIN_MORNINGS'])
-
-                if evening_shift_id:
-                    evenings = [self.shift_vars[(emp.id, d, evening_shift_id)] for d in range(self.num_days)]
-                    if settings.max_evenings is not None:
-                        ex_e = self.model.NewIntVar(0, self.num_days, f'ex_eve_e{emp.id}')
-                        self.model.Add(sum(evenings) <= settings.max_evenings + ex_e)
-                        objective_terms.append(ex_e * w['MAX_EVENINGS'])
-                    if settings.min_evenings is not None:
-                        sh_e = self.model.NewIntVar(0, self.num_days, f'sh_eve_e{emp.id}')
-                        self.model.Add(sum(evenings) + sh_e >= settings.min_evenings)
-                        objective_terms.append(sh_e * w['MIN_EVENINGS'])
-
-                if night_shift_id:
-                    nights = [self.shift_vars[(emp.id, d, night_shift_id)] for d in range(self.num_days)]
-                    if settings.max_nights is not None:
-                        ex_n = self.model.NewIntVar(0, self.num_days, f'ex_night_e{emp.id}')
-                        self.model.Add(sum(nights) <= settings.max_nights + ex_n)
-                        objective_terms.append(ex_n * w['MAX_NIGHTS'])
-                    if settings.min_nights is not None:
-                        sh_n = self.model.NewIntVar(0, self.num_days, f'sh_night_e{emp.id}')
-                        self.model.Add(sum(nights) + sh_n >= settings.min_nights)
-                        objective_terms.append(sh_n * w['MIN_NIGHTS'])
+                for kind, label, max_field, min_field in ((MORNING, 'morn', 'max_mornings', 'min_mornings'),
+                                                          (EVENING, 'eve', 'max_evenings', 'min_evenings'),
+                                                          (NIGHT, 'night', 'max_nights', 'min_nights')):
+                    positions = timing.kinds[kind]
+                    if not positions:
+                        continue
+                    worked = cp_model.LinearExpr.Sum([var for pos in positions for var in sv.by_emp_shift[e][pos]])
+                    if getattr(settings, max_field) is not None:
+                        excess = self.model.NewIntVar(0, self.num_days, f'ex_{label}_e{emp.id}')
+                        self.model.Add(worked <= getattr(settings, max_field) + excess)
+                        objective_terms.append(excess * w[max_field.upper()])
+                    if getattr(settings, min_field) is not None:
+                        shortage = self.model.NewIntVar(0, self.num_days, f'sh_{label}_e{emp.id}')
+                        self.model.Add(worked + shortage >= getattr(settings, min_field))
+                        objective_terms.append(shortage * w[min_field.upper()])
+                self._record_stats('shift_type_quotas', objective_terms)
 
             # 4. Consecutive Nights Penalty (3 nights in a row)
-            if night_shift_id:
+            nights = self._nights_by_day(e, emp)
+            if nights:
                 # Part A: Check within the current week
                 for d in range(self.num_days - 2):
-                    is_three_nights = self.model.NewBoolVar(f'3nights_e{emp.id}_d{d}')
-                    self.model.AddBoolAnd([
-                        self.shift_vars[(emp.id, d, night_shift_id)],
-                        self.shift_vars[(emp.id, d + 1, night_shift_id)],
-                        self.shift_vars[(emp.id, d + 2, night_shift_id)]
-                    ]).OnlyEnforceIf(is_three_nights)
-
-                    self.model.AddBoolOr([
-                        self.shift_vars[(emp.id, d, night_shift_id)].Not(),
-                        self.shift_vars[(emp.id, d + 1, night_shift_id)].Not(),
-                        self.shift_vars[(emp.id, d + 2, night_shift_id)].Not()
-                    ]).OnlyEnforceIf(is_three_nights.Not())
+                    is_three_nights = self._penalty_indicator(f'3nights_e{emp.id}_d{d}', [
+                        nights[d], nights[d + 1], nights[d + 2]
+                    ], w['CONSECUTIVE_NIGHTS'])
 
                     objective_terms.append(is_three_nights * w['CONSECUTIVE_NIGHTS'])
 
@@ -259,24 +322,33 @@ class ConstraintManager:
 
                 if worked_fri and worked_sat:
                     # Penalize Sunday night if they worked Friday and Saturday nights
-                    is_3rd_sun = self.model.NewBoolVar(f'3nights_sun_e{emp.id}')
-                    self.model.Add(self.shift_vars[(emp.id, 0, night_shift_id)] == 1).OnlyEnforceIf(is_3rd_sun)
-                    self.model.Add(self.shift_vars[(emp.id, 0, night_shift_id)] == 0).OnlyEnforceIf(is_3rd_sun.Not())
+                    is_3rd_sun = self._penalty_indicator(f'3nights_sun_e{emp.id}', [
+                        nights[0]
+                    ], w['CONSECUTIVE_NIGHTS'])
                     objective_terms.append(is_3rd_sun * w['CONSECUTIVE_NIGHTS'])
 
                 elif worked_sat:
                     # Penalize Monday night if they worked Saturday and Sunday nights
-                    is_3rd_mon = self.model.NewBoolVar(f'3nights_mon_e{emp.id}')
-                    self.model.AddBoolAnd([
-                        self.shift_vars[(emp.id, 0, night_shift_id)],
-                        self.shift_vars[(emp.id, 1, night_shift_id)]
-                    ]).OnlyEnforceIf(is_3rd_mon)
-
-                    self.model.AddBoolOr([
-                        self.shift_vars[(emp.id, 0, night_shift_id)].Not(),
-                        self.shift_vars[(emp.id, 1, night_shift_id)].Not()
-                    ]).OnlyEnforceIf(is_3rd_mon.Not())
+                    is_3rd_mon = self._penalty_indicator(f'3nights_mon_e{emp.id}', [
+                        nights[0], nights[1]
+                    ], w['CONSECUTIVE_NIGHTS'])
 
                     objective_terms.append(is_3rd_mon * w['CONSECUTIVE_NIGHTS'])
+            self._record_stats('consecutive_nights', objective_terms)
+
+        return objective_terms
 
-        return objective_terms
\ No newline at end of file
+    def _nights_by_day(self, e: int, emp) -> list:
+        """
+        Per day, a literal that is 1 when the employee works a night shift.
+        With one night shift these are its variables; with several, one max-equality indicator per day.
+        """
+        positions = self.timing.kinds[NIGHT]
+        if len(positions) <= 1:
+            return [self.shift_vars.by_emp_day[e][d][positions[0]] for d in range(self.num_days)] if positions else []
+        nights = []
+        for d in range(self.num_days):
+            night = self.model.NewBoolVar(f'night_e{emp.id}_d{d}')
+            self.model.AddMaxEquality(night, [self.shift_vars.by_emp_day[e][d][pos] for pos in positions])
+            nights.append(night)
+        return nights
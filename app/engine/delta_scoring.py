@@ -0,0 +1,242 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.engine.evaluator import QUOTAS, ScheduleEvaluator
+from app.engine.shift_timing import NIGHT
+
+
+@dataclass
+class ScoreDelta:
+    """
+    Effect of one move (or a sequence of moves) on the schedule score.
+    penalties / violations: Change per objective term / hard constraint family (zero entries omitted)
+    total_penalty: Score after the move
+    """
+    applied: bool = True
+    penalty_delta: int = 0
+    penalties: Dict[str, int] = field(default_factory=dict)
+    violations: Dict[str, int] = field(default_factory=dict)
+    total_penalty: int = 0
+    total_violations: int = 0
+
+    def merge(self, other: "ScoreDelta") -> "ScoreDelta":
+        for target, source in ((self.penalties, other.penalties), (self.violations, other.violations)):
+            for name, value in source.items():
+                target[name] = target.get(name, 0) + value
+                if not target[name]:
+                    del target[name]
+        self.applied = self.applied and other.applied
+        self.penalty_delta += other.penalty_delta
+        self.total_penalty = other.total_penalty
+        self.total_violations = other.total_violations
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "applied": self.applied,
+            "penalty_delta": self.penalty_delta,
+            "penalties": dict(self.penalties),
+            "violations": dict(self.violations),
+            "total_penalty": self.total_penalty,
+            "total_violations": self.total_violations,
+            "feasible": self.total_violations == 0,
+        }
+
+
+class DeltaScorer:
+    """
+    Keeps the score of one week up to date under single-assignment moves, for interactive editing.
+
+    The full evaluation is done once by ScheduleEvaluator. After that, each add/remove only re-scores the
+    terms that can involve the touched slot: its demand cell, the employee's day, the adjacent-day pairs
+    (rest gap, back-to-back), the night triples around the day, and the employee's weekly counters
+    (total shifts, mornings / evenings / nights, days inside the streak window). The work per move
+    is constant, whatever the size of the location.
+    """
+
+    def __init__(self, evaluator: ScheduleEvaluator, keys: Iterable[Tuple[int, int, int]] = ()):
+        self.evaluator = ev = evaluator
+        E, D, S = len(ev.employees), ev.num_days, len(ev.shifts)
+        x = ev.to_array(keys)
+        evaluation = ev.evaluate(x)
+
+        # Plain nested lists: element access is much cheaper than on NumPy arrays
+        self.works = x.astype(bool).tolist()
+        self.staffed = x.sum(axis=0).tolist()
+        self.per_day = x.sum(axis=-1).tolist()
+        self.count = x.sum(axis=(1, 2)).tolist()
+        self.timing = ev.timing
+        self.kind_of = [ev.timing.kind_of(pos) for pos in range(S)]
+        self.kind_count = {kind: x[:, :, positions].sum(axis=(1, 2)).tolist() if len(positions) else [0] * E
+                           for kind, positions in ev.kinds.items()}
+        self.nights = ev.timing.kinds[NIGHT]
+        # Rest pairs by position: shifts that may not / should not precede or follow each shift
+        self.hard_before = [[a for a, b in ev.timing.hard_pairs if b == pos] for pos in range(S)]
+        self.hard_after = [[b for a, b in ev.timing.hard_pairs if a == pos] for pos in range(S)]
+        self.soft_before = [[a for a, b in ev.timing.soft_pairs if b == pos] for pos in range(S)]
+        self.soft_after = [[b for a, b in ev.timing.soft_pairs if a == pos] for pos in range(S)]
+        window = ev.streak_window.tolist()
+        self.window_count = [int(x[e, :window[e]].sum()) for e in range(E)]
+
+        self.required = ev.required.tolist()
+        self.cannot = ev.cannot.tolist()
+        self.must = ev.must.tolist()
+        self.has_settings = ev.has_settings.tolist()
+        self.min_shifts = ev.min_shifts.tolist()
+        self.max_shifts = ev.max_shifts.tolist()
+        self.target = ev.target.tolist()
+        self.quotas = {name: (has.tolist(), limit.tolist()) for name, (has, limit) in ev.quotas.items()}
+        self.fri_night = ev.fri_night.tolist()
+        self.sat_noon = ev.sat_noon.tolist()
+        self.sat_night = ev.sat_night.tolist()
+        self.streak_window = window
+        self.streak_cap = ev.streak_cap.tolist()
+        self.weights = ev.weights
+        self.num_days, self.num_shifts = D, S
+
+        self.penalties = dict(evaluation.penalties)
+        self.violations = dict(evaluation.violations)
+        self.employee_penalties = [int(p) for p in evaluation.employee_penalties]
+        self.total_penalty = evaluation.total_penalty
+
+    @property
+    def total_violations(self) -> int:
+        return sum(self.violations.values())
+
+    def is_assigned(self, emp_id: int, day: int, shift_id: int) -> bool:
+        slot = self._slot(emp_id, day, shift_id)
+        return slot is not None and self.works[slot[0]][day][slot[1]]
+
+    def assignments(self):
+        """(emp_id, day, shift_id) keys of the current state."""
+        emp_ids = [emp.id for emp in self.evaluator.employees]
+        shift_ids = [s.id for s in self.evaluator.shifts]
+        return {(emp_ids[e], d, shift_ids[s])
+                for e, days in enumerate(self.works) for d, row in enumerate(days) for s, on in enumerate(row) if on}
+
+    def add(self, emp_id: int, day: int, shift_id: int) -> ScoreDelta:
+        return self._toggle(emp_id, day, shift_id, True)
+
+    def remove(self, emp_id: int, day: int, shift_id: int) -> ScoreDelta:
+        return self._toggle(emp_id, day, shift_id, False)
+
+    def move(self, from_emp_id: int, to_emp_id: int, day: int, shift_id: int) -> ScoreDelta:
+        """Drag of a shift from one employee to another: a remove followed by an add, as one delta."""
+        if self._slot(to_emp_id, day, shift_id) is None:
+            raise ValueError(f"Unknown slot: employee {to_emp_id}, day {day}, shift {shift_id}")
+        if self.is_assigned(to_emp_id, day, shift_id) or not self.is_assigned(from_emp_id, day, shift_id):
+            return ScoreDelta(applied=False, total_penalty=self.total_penalty,
+                              total_violations=self.total_violations)
+        return self.remove(from_emp_id, day, shift_id).merge(self.add(to_emp_id, day, shift_id))
+
+    def _slot(self, emp_id: int, day: int, shift_id: int) -> Optional[Tuple[int, int]]:
+        e, s = self.evaluator.emp_pos.get(emp_id), self.evaluator.shift_pos.get(shift_id)
+        if e is None or s is None or not 0 <= day < self.num_days:
+            return None
+        return e, s
+
+    def _toggle(self, emp_id: int, day: int, shift_id: int, on: bool) -> ScoreDelta:
+        slot = self._slot(emp_id, day, shift_id)
+        if slot is None:
+            raise ValueError(f"Unknown slot: employee {emp_id}, day {day}, shift {shift_id}")
+        e, s = slot
+        if self.works[e][day][s] == on:
+            # Already in the requested state; nothing changes
+            return ScoreDelta(applied=False, total_penalty=self.total_penalty,
+                              total_violations=self.total_violations)
+
+        pen_before, vio_before = self._local(e, day, s)
+        step = 1 if on else -1
+        self.works[e][day][s] = on
+        self.staffed[day][s] += step
+        self.per_day[e][day] += step
+        self.count[e] += step
+        if self.kind_of[s]:
+            self.kind_count[self.kind_of[s]][e] += step
+        if day < self.streak_window[e]:
+            self.window_count[e] += step
+        pen_after, vio_after = self._local(e, day, s)
+
+        delta = ScoreDelta()
+        for name, after in pen_after.items():
+            change = after - pen_before[name]
+            if change:
+                delta.penalties[name] = change
+                self.penalties[name] = self.penalties.get(name, 0) + change
+                delta.penalty_delta += change
+        for name, after in vio_after.items():
+            change = after - vio_before[name]
+            if change:
+                delta.violations[name] = change
+                self.violations[name] = self.violations.get(name, 0) + change
+
+        self.employee_penalties[e] += delta.penalty_delta
+        self.total_penalty += delta.penalty_delta
+        delta.total_penalty = self.total_penalty
+        delta.total_violations = self.total_violations
+        return delta
+
+    def _local(self, e: int, d: int, s: int) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Value of every term and hard constraint family that can involve slot (e, d, s), restricted
+        to the parts that do. Taking it before and after a toggle gives the exact delta.
+        """
+        D, w = self.num_days, self.weights
+        x = self.works[e]
+        has_settings = self.has_settings[e]
+        count = self.count[e]
+
+        violations = {
+            'demand': int(self.staffed[d][s] != self.required[d][s]),
+            'daily_limit': int(self.per_day[e][d] > 1),
+            'weekly_limits': int(has_settings and not self.min_shifts[e] <= count <= self.max_shifts[e]),
+            'cannot_work': int(x[d][s] and self.cannot[e][d][s]),
+            'must_work': int(not x[d][s] and self.must[e][d][s]),
+            'streak': int(self.streak_window[e] > 0 and self.window_count[e] > self.streak_cap[e]),
+        }
+        penalties = {
+            'target_shifts': abs(count - self.target[e]) * has_settings * w['target_shifts'],
+        }
+
+        # Rest pairs with this shift: (a yesterday, s today) and (s today, b tomorrow)
+        hard = rest = 0
+        if d > 0:
+            hard += sum(x[d - 1][a] and x[d][s] for a in self.hard_before[s])
+            rest += sum(x[d - 1][a] and x[d][s] for a in self.soft_before[s])
+        if d < D - 1:
+            hard += sum(x[d][s] and x[d + 1][b] for b in self.hard_after[s])
+            rest += sum(x[d][s] and x[d + 1][b] for b in self.soft_after[s])
+        violations['back_to_back'] = hard
+        penalties['rest_gap'] = rest * w['rest_gap']
+
+        if d == 0:
+            timing = self.timing
+            violations['history_back_to_back'] = int(x[0][s] and self.sat_night[e]
+                                                     and s in timing.after_sat_night_forbidden)
+            history = int(x[0][s] and self.sat_noon[e] and s in timing.after_sat_noon_penalized) \
+                + int(x[0][s] and self.sat_night[e] and s in timing.after_sat_night_penalized)
+            penalties['history_rest_gap'] = history * w['rest_gap']
+
+        kind = self.kind_of[s]
+        if kind:
+            kind_count = self.kind_count[kind][e]
+            for name, limit_kind, is_max in QUOTAS:
+                if limit_kind != kind:
+                    continue
+                has_value, limit = self.quotas[name]
+                gap = kind_count - limit[e] if is_max else limit[e] - kind_count
+                penalties[name] = max(gap, 0) * (has_settings and has_value[e]) * w[name]
+
+        if kind == NIGHT:
+            nights = self.nights
+            night = [any(x[t][pos] for pos in nights) for t in range(D)] if len(nights) > 1 \
+                else [row[nights[0]] for row in x]
+            triples = sum(night[t] and night[t + 1] and night[t + 2] for t in range(max(d - 2, 0), min(d, D - 3) + 1))
+            carry = 0
+            if d < 2:
+                if self.fri_night[e] and self.sat_night[e]:
+                    carry = int(night[0])
+                elif self.sat_night[e] and D > 1:
+                    carry = int(night[0] and night[1])
+            penalties['consecutive_nights'] = (triples + carry) * w['consecutive_nights']
+        return penalties, violations
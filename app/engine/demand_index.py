@@ -0,0 +1,41 @@
+from typing import Dict, List
+
+
+class DemandIndex:
+    """
+    Dense (day x shift) table of required staff, built once per solve.
+    Starts from each ShiftDefinition.default_staff_count and applies ShiftDemand
+    rows as per-weekday overrides. Lookups are O(1) by day index and shift definition id.
+    """
+
+    def __init__(self, shifts, demands, num_days: int = 7):
+        self.num_days = num_days
+        self.shift_ids: List[int] = [s.id for s in shifts]
+        self.shift_pos: Dict[int, int] = {s_id: i for i, s_id in enumerate(self.shift_ids)}
+
+        # Assume the default is the general number of staff defined for the shift
+        defaults = [getattr(s, 'default_staff_count', 1) for s in shifts]
+        self.matrix: List[List[int]] = [list(defaults) for _ in range(num_days)]
+
+        # Apply specific demands from the UI. Walk in reverse so the first matching
+        # row wins, as it did with the original per-slot linear scan.
+        for dem in reversed(list(demands)):
+            self.set_override(dem.day_of_week, dem.shift_definition_id, dem.required_employees)
+
+    def set_override(self, day: int, shift_id: int, required: int) -> None:
+        """
+        Overrides the requirement for one (day, shift) slot.
+        Out-of-range days and unknown shifts are ignored.
+        Date-specific demands (holidays, events) plug in here.
+        """
+        pos = self.shift_pos.get(shift_id)
+        if pos is not None and 0 <= day < self.num_days:
+            self.matrix[day][pos] = required
+
+    def required(self, day: int, shift_id: int) -> int:
+        """Required staff for a shift definition on a day index."""
+        return self.matrix[day][self.shift_pos[shift_id]]
+
+    def total_for_day(self, day: int) -> int:
+        """Total staff required across all shifts on a day index."""
+        return sum(self.matrix[day])
@@ -0,0 +1,39 @@
+from typing import Dict, List, Set, Tuple
+
+from app.engine.shift_timing import shift_timing
+
+
+def compute_pruned_slots(employees, shifts, weekly_constraints: List[dict], employee_settings: Dict = None,
+                         employee_states: Dict = None, num_days: int = 7) -> Set[Tuple[int, int, int]]:
+    """
+    Domain reduction ahead of variable creation.
+    Returns the (emp_id, day, shift_id) slots that can never be 1 in a feasible schedule:
+    - 'cannot_work' weekly constraints,
+    - Sunday (day 0) shifts too close to last Saturday's night shift (history back-to-back rule),
+    - every slot of an employee whose settings allow no shifts this week.
+    These slots get a fixed 0 instead of a decision variable.
+    """
+    employee_settings = employee_settings or {}
+    employee_states = employee_states or {}
+    emp_ids = {emp.id for emp in employees}
+    shift_ids = {s.id for s in shifts}
+    after_sat_night = [shifts[pos].id for pos in shift_timing(shifts).after_sat_night_forbidden]
+    pruned = set()
+
+    for constraint in weekly_constraints or []:
+        key = (constraint["employee_id"], constraint["day_idx"], constraint["shift_id"])
+        # Handle lowercase enum values or uppercase fallbacks, like ConstraintManager does
+        if constraint["type"] in ('cannot_work', 'CANNOT_WORK') and key[0] in emp_ids \
+                and 0 <= key[1] < num_days and key[2] in shift_ids:
+            pruned.add(key)
+
+    for emp in employees:
+        state = employee_states.get(emp.id)
+        if state and getattr(state, 'worked_last_sat_night', False):
+            pruned.update((emp.id, 0, shift_id) for shift_id in after_sat_night)
+
+        settings = employee_settings.get(emp.id)
+        if settings and settings.max_shifts_per_week is not None and settings.max_shifts_per_week <= 0:
+            pruned.update((emp.id, d, s.id) for d in range(num_days) for s in shifts)
+
+    return pruned
@@ -0,0 +1,277 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+from app.engine.demand_index import DemandIndex
+from app.engine.shift_timing import MORNING, EVENING, NIGHT, shift_timing
+
+# Same fallbacks as ConstraintManager._get_objective_terms, used when a weight is missing or None
+DEFAULT_WEIGHTS = {
+    'rest_gap': 40,
+    'target_shifts': 40,
+    'consecutive_nights': 100,
+    'max_nights': 50,
+    'max_mornings': 4,
+    'max_evenings': 2,
+    'min_nights': 5,
+    'min_mornings': 4,
+    'min_evenings': 2,
+}
+
+# Shift type quotas: (settings field, shift kind, is_max)
+QUOTAS = [
+    ('max_mornings', MORNING, True), ('min_mornings', MORNING, False),
+    ('max_evenings', EVENING, True), ('min_evenings', EVENING, False),
+    ('max_nights', NIGHT, True), ('min_nights', NIGHT, False),
+]
+
+Score = Union[int, np.ndarray]
+
+
+@dataclass
+class Evaluation:
+    """
+    Score of one schedule (plain ints) or of a batch (arrays with one entry per schedule).
+    penalties: Weighted penalty per objective term. Their sum is the CP-SAT objective of the schedule
+        with every penalty variable at its lowest value (always the case for an OPTIMAL solve)
+    violations: Number of broken hard constraints per family (named like ConstraintManager.stats)
+    employee_penalties: Weighted penalty per employee, shape (..., employees)
+    """
+    total_penalty: Score
+    penalties: Dict[str, Score]
+    violations: Dict[str, Score]
+    employee_penalties: np.ndarray
+
+    @property
+    def feasible(self) -> Union[bool, np.ndarray]:
+        total = sum(self.violations.values())
+        return total == 0 if isinstance(total, np.ndarray) else bool(total == 0)
+
+    def to_dict(self) -> dict:
+        """JSON-ready form of a single-schedule evaluation."""
+        return {
+            "feasible": bool(self.feasible),
+            "total_penalty": int(self.total_penalty),
+            "penalties": {term: int(value) for term, value in self.penalties.items()},
+            "violations": {family: int(value) for family, value in self.violations.items()},
+        }
+
+
+class ScheduleEvaluator:
+    """
+    Scores assignment sets without CP-SAT, with the same hard constraints and objective terms as
+    ConstraintManager. Inputs are turned into dense arrays once; evaluate() then works on a 0/1 array
+    of shape (employees, days, shifts), or (schedules, employees, days, shifts) to score a batch at once.
+
+    Rest rules and shift kinds come from the same ShiftTiming as the model.
+    """
+
+    def __init__(self, employees, shifts, demands, weights, weekly_constraints=None, employee_settings=None,
+                 employee_states=None, num_days: int = 7, demand_index: DemandIndex = None):
+        self.employees = [e for e in employees if e.is_active]
+        self.shifts = shifts
+        self.num_days = num_days
+        employee_settings = employee_settings or {}
+        employee_states = employee_states or {}
+
+        E, D, S = len(self.employees), num_days, len(shifts)
+        self.emp_pos = {emp.id: e for e, emp in enumerate(self.employees)}
+        self.shift_pos = {s.id: s_idx for s_idx, s in enumerate(shifts)}
+        self.timing = shift_timing(shifts)
+        # Positions of each shift kind, as index arrays
+        self.kinds = {kind: np.array(positions, dtype=np.intp) for kind, positions in self.timing.kinds.items()}
+
+        demand_index = demand_index or DemandIndex(shifts, demands, num_days)
+        self.required = np.array([[demand_index.required(d, s.id) for s in shifts] for d in range(D)],
+                                 dtype=np.int32).reshape(D, S)
+
+        self.cannot = np.zeros((E, D, S), dtype=bool)
+        self.must = np.zeros((E, D, S), dtype=bool)
+        for c in weekly_constraints or []:
+            e, s, d = self.emp_pos.get(c["employee_id"]), self.shift_pos.get(c["shift_id"]), c["day_idx"]
+            if e is None or s is None or not 0 <= d < D:
+                continue
+            if c["type"] in ('cannot_work', 'CANNOT_WORK'):
+                self.cannot[e, d, s] = True
+            elif c["type"] in ('must_work', 'MUST_WORK'):
+                self.must[e, d, s] = True
+
+        def weight(name):
+            value = getattr(weights, name, DEFAULT_WEIGHTS[name])
+            return value if value is not None else DEFAULT_WEIGHTS[name]
+        self.weights = {name: weight(name) for name in DEFAULT_WEIGHTS}
+
+        # Settings, as arrays with a mask for employees (or fields) without a value
+        settings = [employee_settings.get(emp.id) for emp in self.employees]
+        self.has_settings = np.array([s is not None for s in settings], dtype=bool)
+        self.min_shifts = np.array([s.min_shifts_per_week if s else 0 for s in settings], dtype=np.int32)
+        self.max_shifts = np.array([s.max_shifts_per_week if s else D for s in settings], dtype=np.int32)
+        self.target = np.array([
+            (s.target_shifts if getattr(s, 'target_shifts', None) is not None
+             else (s.min_shifts_per_week + s.max_shifts_per_week) // 2) if s else 0
+            for s in settings
+        ], dtype=np.int32)
+        self.quotas = {}
+        for field, _, is_max in QUOTAS:
+            values = [getattr(s, field, None) if s else None for s in settings]
+            self.quotas[field] = (
+                np.array([v is not None for v in values], dtype=bool),
+                np.array([v if v is not None else 0 for v in values], dtype=np.int32),
+            )
+
+        states = [employee_states.get(emp.id) for emp in self.employees]
+        self.fri_night = np.array([bool(st and st.worked_last_fri_night) for st in states], dtype=bool)
+        self.sat_noon = np.array([bool(st and st.worked_last_sat_noon) for st in states], dtype=bool)
+        self.sat_night = np.array([bool(st and st.worked_last_sat_night) for st in states], dtype=bool)
+
+        # Max work streak window per employee (days counted from Sunday, max shifts in them); 0 = no rule
+        window, cap = [], []
+        for st in states:
+            streak = st.history_streak if st else 0
+            limit = max(7 - streak, 1)  # A streak of 7+ days: Sunday must be off
+            if streak > 0:
+                ok = limit <= D
+                window.append(limit if ok else 0)
+                cap.append(limit - 1 if ok else 0)
+            else:
+                window.append(min(7, D))
+                cap.append(6)
+        self.streak_window = np.array(window, dtype=np.int64)
+        self.streak_cap = np.array(cap, dtype=np.int32)
+
+    def to_array(self, keys: Iterable[Tuple[int, int, int]]) -> np.ndarray:
+        """
+        Builds the (employees, days, shifts) 0/1 array from (emp_id, day, shift_id) keys.
+        Keys for unknown employees or shifts, or outside the week, are ignored.
+        """
+        x = np.zeros((len(self.employees), self.num_days, len(self.shifts)), dtype=np.int8)
+        for emp_id, day, shift_id in keys:
+            e, s = self.emp_pos.get(emp_id), self.shift_pos.get(shift_id)
+            if e is not None and s is not None and 0 <= day < self.num_days:
+                x[e, day, s] = 1
+        return x
+
+    def evaluate(self, x: np.ndarray) -> Evaluation:
+        """Scores one schedule (employees, days, shifts) or a batch (schedules, employees, days, shifts)."""
+        x = np.asarray(x, dtype=np.int32)
+        single = x.ndim == 3
+        if single:
+            x = x[np.newaxis]
+        S = x.shape[-1]
+
+        violations = self._violations(x)
+        terms = self._penalty_terms(x, S)  # Each (N, E), already weighted
+
+        employee_penalties = sum(terms.values()) if terms else np.zeros(x.shape[:2], dtype=np.int64)
+        penalties = {name: value.sum(axis=-1) for name, value in terms.items()}
+        total = employee_penalties.sum(axis=-1)
+
+        if single:
+            return Evaluation(
+                total_penalty=int(total[0]),
+                penalties={name: int(value[0]) for name, value in penalties.items()},
+                violations={name: int(value[0]) for name, value in violations.items()},
+                employee_penalties=employee_penalties[0],
+            )
+        return Evaluation(total, penalties, violations, employee_penalties)
+
+    def _violations(self, x: np.ndarray) -> Dict[str, np.ndarray]:
+        """Hard constraint violations per family, each of shape (N,)."""
+        per_day = x.sum(axis=-1)  # (N, E, D)
+        totals = per_day.sum(axis=-1)  # (N, E)
+
+        violations = {
+            'demand': (x.sum(axis=1) != self.required).sum(axis=(1, 2)),
+            'daily_limit': (per_day > 1).sum(axis=(1, 2)),
+            'weekly_limits': (self.has_settings & ((totals < self.min_shifts) | (totals > self.max_shifts))).sum(axis=1),
+            'cannot_work': (x.astype(bool) & self.cannot).sum(axis=(1, 2, 3)),
+            'must_work': (~x.astype(bool) & self.must).sum(axis=(1, 2, 3)),
+        }
+        violations['back_to_back'] = self._pairs(x, self.timing.hard_pairs).sum(axis=-1)
+        violations['history_back_to_back'] = \
+            (x[:, :, 0, list(self.timing.after_sat_night_forbidden)].sum(axis=-1) * self.sat_night).sum(axis=1)
+
+        # Shifts worked within each employee's streak window, via a prefix sum over days
+        prefix = np.concatenate([np.zeros(per_day.shape[:2] + (1,), dtype=per_day.dtype),
+                                 per_day.cumsum(axis=-1)], axis=-1)  # (N, E, D + 1)
+        in_window = np.take_along_axis(prefix, np.broadcast_to(self.streak_window[None, :, None],
+                                                                prefix.shape[:2] + (1,)), axis=-1)[..., 0]
+        violations['streak'] = ((self.streak_window > 0) & (in_window > self.streak_cap)).sum(axis=1)
+        return violations
+
+    def _penalty_terms(self, x: np.ndarray, S: int) -> Dict[str, np.ndarray]:
+        """Weighted objective terms per employee, each of shape (N, E)."""
+        w = self.weights
+        terms = {}
+        timing = self.timing
+        if S > 1:
+            terms['rest_gap'] = self._pairs(x, timing.soft_pairs) * w['rest_gap']
+        if S > 0:
+            history = x[:, :, 0, list(timing.after_sat_noon_penalized)].sum(axis=-1) * self.sat_noon \
+                + x[:, :, 0, list(timing.after_sat_night_penalized)].sum(axis=-1) * self.sat_night
+            terms['history_rest_gap'] = history * w['rest_gap']
+
+        totals = x.sum(axis=(2, 3))
+        terms['target_shifts'] = np.abs(totals - self.target) * self.has_settings * w['target_shifts']
+
+        for field, kind, is_max in QUOTAS:
+            if not len(self.kinds[kind]):
+                continue
+            has_value, limit = self.quotas[field]
+            count = x[:, :, :, self.kinds[kind]].sum(axis=(2, 3))
+            gap = count - limit if is_max else limit - count
+            terms[field] = np.maximum(gap, 0) * (self.has_settings & has_value) * w[field]
+
+        if len(self.kinds[NIGHT]):
+            # Worked a night shift that day (at most one per day in a valid schedule)
+            nights = x[:, :, :, self.kinds[NIGHT]].max(axis=-1)
+            streaks = (nights[:, :, :-2] & nights[:, :, 1:-1] & nights[:, :, 2:]).sum(axis=-1)
+            # Carry-over from last weekend: Friday + Saturday nights, or Saturday night only
+            carry = np.where(self.fri_night & self.sat_night, nights[:, :, 0],
+                             np.where(self.sat_night, nights[:, :, 0] & nights[:, :, 1], 0))
+            terms['consecutive_nights'] = (streaks + carry) * w['consecutive_nights']
+        return terms
+
+    @staticmethod
+    def _pairs(x: np.ndarray, pairs) -> np.ndarray:
+        """Per employee, the (shift a today, shift b tomorrow) occurrences of the given pairs, shape (N, E)."""
+        count = np.zeros(x.shape[:2], dtype=np.int64)
+        for a, b in pairs:
+            count += (x[:, :, :-1, a] & x[:, :, 1:, b]).sum(axis=-1)
+        return count
+
+    def violation_details(self, x: np.ndarray) -> List[dict]:
+        """
+        Lists the broken hard constraints of one schedule, labelled like explain_infeasibility() conflicts.
+        """
+        x = np.asarray(x, dtype=np.int32)
+        emp_ids = [emp.id for emp in self.employees]
+        shift_ids = [s.id for s in self.shifts]
+        details = []
+
+        staffed = x.sum(axis=0)
+        for d, s in zip(*np.nonzero(staffed != self.required)):
+            details.append({"family": "demand", "day_index": int(d), "shift_id": shift_ids[s],
+                            "required": int(self.required[d, s]), "assigned": int(staffed[d, s])})
+        for e, d in zip(*np.nonzero(x.sum(axis=-1) > 1)):
+            details.append({"family": "one_shift_per_day", "employee_id": emp_ids[e], "day_index": int(d)})
+        totals = x.sum(axis=(1, 2))
+        for e in np.nonzero(self.has_settings & ((totals < self.min_shifts) | (totals > self.max_shifts)))[0]:
+            details.append({"family": "weekly_shift_limits", "employee_id": emp_ids[e], "assigned": int(totals[e]),
+                            "min_shifts": int(self.min_shifts[e]), "max_shifts": int(self.max_shifts[e])})
+        for family, mask in (("cannot_work", x.astype(bool) & self.cannot), ("must_work", ~x.astype(bool) & self.must)):
+            for e, d, s in zip(*np.nonzero(mask)):
+                details.append({"family": family, "employee_id": emp_ids[e], "day_index": int(d),
+                                "shift_id": shift_ids[s]})
+        for a, b in self.timing.hard_pairs:
+            for e, d in zip(*np.nonzero(x[:, :-1, a] & x[:, 1:, b])):
+                details.append({"family": "no_back_to_back", "employee_id": emp_ids[e], "day_index": int(d)})
+        for pos in self.timing.after_sat_night_forbidden:
+            for e in np.nonzero(x[:, 0, pos].astype(bool) & self.sat_night)[0]:
+                details.append({"family": "rest_after_last_saturday_night", "employee_id": emp_ids[e]})
+        per_day = x.sum(axis=-1)
+        for e, window in enumerate(self.streak_window):
+            if window and per_day[e, :window].sum() > self.streak_cap[e]:
+                details.append({"family": "max_work_streak", "employee_id": emp_ids[e]})
+        return details
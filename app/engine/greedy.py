@@ -0,0 +1,155 @@
+import heapq
+from dataclasses import dataclass, field
+from typing import List, Set, Tuple
+
+from app.engine.demand_index import DemandIndex
+from app.engine.domain_reduction import compute_pruned_slots
+from app.engine.shift_timing import shift_timing
+
+
+@dataclass
+class GreedyResult:
+    """
+    assignments: (emp_id, day, shift_id) keys of the draft
+    unfilled: Slots the heuristic could not staff, as {"day_index", "shift_id", "required", "missing"}
+    """
+    assignments: Set[Tuple[int, int, int]] = field(default_factory=set)
+    unfilled: List[dict] = field(default_factory=list)
+
+
+class GreedyScheduler:
+    """
+    Constructive heuristic alongside ShiftOptimizer: builds a plausible week in milliseconds, without CP-SAT.
+
+    must_work requests are placed first. The demand slots are then filled hardest first (fewest eligible
+    employees per missing worker), each with the employees furthest below their weekly minimum and target.
+    Every placement respects the daily limit, back-to-back, weekly maximum, max work streak and
+    cannot_work rules, so the draft never breaks them; it may leave slots unfilled or employees under
+    their minimum, which the caller can report or hand to CP-SAT as a hint.
+    """
+
+    def __init__(self, employees, shifts, demands, weekly_constraints=None, employee_settings=None,
+                 employee_states=None, num_days: int = 7, demand_index: DemandIndex = None):
+        self.employees = [e for e in employees if e.is_active]
+        self.shifts = shifts
+        self.num_days = num_days
+        self.demand_index = demand_index or DemandIndex(shifts, demands, num_days)
+        self.weekly_constraints = weekly_constraints or []
+        self.employee_settings = employee_settings or {}
+        self.employee_states = employee_states or {}
+
+    def solve(self) -> GreedyResult:
+        D, S = self.num_days, len(self.shifts)
+        E = len(self.employees)
+        shift_pos = {s.id: s_idx for s_idx, s in enumerate(self.shifts)}
+        timing = shift_timing(self.shifts)
+        # Per position: shifts that may not (hard) / should not (soft) be worked the day before / after
+        hard_before = [{a for a, b in timing.hard_pairs if b == s} for s in range(S)]
+        hard_after = [{b for a, b in timing.hard_pairs if a == s} for s in range(S)]
+        soft_before = [{a for a, b in timing.soft_pairs if b == s} for s in range(S)]
+        soft_after = [{b for a, b in timing.soft_pairs if a == s} for s in range(S)]
+        pruned = compute_pruned_slots(self.employees, self.shifts, self.weekly_constraints,
+                                      self.employee_settings, self.employee_states, D)
+        blocked = [[[(emp.id, d, s_def.id) in pruned for s_def in self.shifts] for d in range(D)]
+                   for emp in self.employees]
+
+        # Per-employee state, by position
+        works: List[List[int]] = [[-1] * D for _ in range(E)]  # shift position worked each day, -1 = off
+        count = [0] * E
+        window_count = [0] * E  # Days worked inside the employee's streak window
+        min_shifts, max_shifts, target, streak_limit = [], [], [], []
+        for emp in self.employees:
+            settings = self.employee_settings.get(emp.id)
+            low = settings.min_shifts_per_week if settings and settings.min_shifts_per_week is not None else 0
+            high = settings.max_shifts_per_week if settings and settings.max_shifts_per_week is not None else D
+            goal = getattr(settings, 'target_shifts', None) if settings else None
+            min_shifts.append(low)
+            max_shifts.append(high)
+            target.append(goal if goal is not None else (low + high) // 2)
+
+            # Same window as the max work streak rule in ConstraintManager: (days, max worked days in them)
+            state = self.employee_states.get(emp.id)
+            streak = state.history_streak if state else 0
+            limit = max(7 - streak, 1)  # A streak of 7+ days: Sunday must be off
+            if streak <= 0:
+                streak_limit.append((min(7, D), 6))
+            elif limit <= D:
+                streak_limit.append((limit, limit - 1))
+            else:
+                streak_limit.append((0, 0))
+
+        def can_work(e: int, d: int, s: int) -> bool:
+            if works[e][d] != -1 or count[e] >= max_shifts[e]:
+                return False
+            if blocked[e][d][s]:
+                return False
+            # No shift pair with too little rest in between (in either direction)
+            if d + 1 < D and works[e][d + 1] in hard_after[s]:
+                return False
+            if d > 0 and works[e][d - 1] in hard_before[s]:
+                return False
+            window, max_days = streak_limit[e]
+            if d < window and window_count[e] >= max_days:
+                return False
+            return True
+
+        def assign(e: int, d: int, s: int):
+            works[e][d] = s
+            count[e] += 1
+            if d < streak_limit[e][0]:
+                window_count[e] += 1
+
+        def rest_gap(e: int, d: int, s: int) -> int:
+            # A short rest (e.g. evening followed by morning) is allowed but penalized by the objective
+            if d + 1 < D and works[e][d + 1] in soft_after[s]:
+                return 1
+            if d > 0 and works[e][d - 1] in soft_before[s]:
+                return 1
+            return 0
+
+        result = GreedyResult()
+        emp_pos = {emp.id: e for e, emp in enumerate(self.employees)}
+        staffed = [[0] * S for _ in range(D)]
+
+        # 1. must_work requests
+        for c in self.weekly_constraints:
+            if c["type"] not in ('must_work', 'MUST_WORK'):
+                continue
+            e, s, d = emp_pos.get(c["employee_id"]), shift_pos.get(c["shift_id"]), c["day_idx"]
+            if e is not None and s is not None and 0 <= d < D and can_work(e, d, s):
+                assign(e, d, s)
+                staffed[d][s] += 1
+
+        # 2. Demand slots, hardest first
+        def eligible(d: int, s: int) -> int:
+            return sum(1 for e in range(E) if can_work(e, d, s))
+
+        slots = []
+        for d in range(D):
+            for s, s_def in enumerate(self.shifts):
+                needed = self.demand_index.required(d, s_def.id) - staffed[d][s]
+                if needed > 0:
+                    slots.append((eligible(d, s) / needed, d, s, needed))
+        slots.sort()
+
+        for _, d, s, needed in slots:
+            candidates = [e for e in range(E) if can_work(e, d, s)]
+            chosen = heapq.nsmallest(
+                needed, candidates,
+                key=lambda e: (count[e] >= min_shifts[e], count[e] - target[e], rest_gap(e, d, s), e)
+            )
+            for e in chosen:
+                assign(e, d, s)
+            if len(candidates) < needed:
+                result.unfilled.append({
+                    "day_index": d,
+                    "shift_id": self.shifts[s].id,
+                    "required": self.demand_index.required(d, self.shifts[s].id),
+                    "missing": needed - len(candidates)
+                })
+
+        result.assignments = {
+            (emp.id, d, self.shifts[works[e][d]].id)
+            for e, emp in enumerate(self.employees) for d in range(D) if works[e][d] != -1
+        }
+        return result
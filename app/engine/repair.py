@@ -0,0 +1,104 @@
+"""
+Minimal-change repair of a published week.
+
+When an employee drops out mid-week, regenerating the whole week reshuffles everyone. A repair keeps
+the days before 'from_day' exactly as published, removes the unavailable employees' slots, and asks
+CP-SAT for the schedule closest to the published one: first the fewest changed assignments, then
+(among those) the lowest penalty objective.
+
+The search starts in a small neighborhood: only the days that lost a published shift may change,
+everything else is baked into the model as constants. When that has no solution (e.g. the replacement
+needs a swap on another day), ShiftOptimizer retries with every day from from_day on.
+"""
+from dataclasses import dataclass, replace
+from typing import FrozenSet, Set, Tuple
+
+from ortools.sat.python import cp_model
+
+
+@dataclass(frozen=True)
+class RepairRequest:
+    """
+    :param published: (employee_id, day_index, shift_id) keys of the currently published week
+    :param from_day: First day index that may change; earlier days are frozen
+    :param unavailable: (employee_id, day_index) pairs the employee can no longer work
+    :param whole_week: Let every day from from_day change, not just the days that lost a shift
+    """
+    published: FrozenSet[Tuple[int, int, int]]
+    from_day: int
+    unavailable: FrozenSet[Tuple[int, int]] = frozenset()
+    whole_week: bool = False
+
+    def open_days(self, num_days: int = 7) -> Set[int]:
+        """Days whose assignments may change."""
+        if self.whole_week:
+            return set(range(self.from_day, num_days))
+        return {day for emp_id, day, _ in self.published
+                if (emp_id, day) in self.unavailable and day >= self.from_day}
+
+    def widened(self) -> "RepairRequest":
+        return replace(self, whole_week=True)
+
+    def fixed_slots(self, employees, shifts, num_days: int = 7) -> Tuple[set, set]:
+        """
+        Returns the slots fixed to 0 and the slots fixed to 1: the closed days as published,
+        plus the unavailable slots (always 0).
+        """
+        open_days = self.open_days(num_days)
+        fixed_off, fixed_on = set(), set()
+        for emp in employees:
+            for day in range(num_days):
+                for s_def in shifts:
+                    key = (emp.id, day, s_def.id)
+                    if (emp.id, day) in self.unavailable:
+                        fixed_off.add(key)
+                    elif day not in open_days:
+                        (fixed_on if key in self.published else fixed_off).add(key)
+        return fixed_off, fixed_on
+
+    def relax_weekly_constraints(self, weekly_constraints):
+        """Drops must_work requests on days the employee became unavailable."""
+        return [c for c in weekly_constraints
+                if not ((c["employee_id"], c["day_idx"]) in self.unavailable
+                        and c["type"] in ('must_work', 'MUST_WORK'))]
+
+    def relax_settings(self, employee_settings):
+        """
+        Lifts the weekly minimum of unavailable employees, which their absence may no longer allow.
+        The stored rows are left untouched; relaxed employees get a transient copy.
+        """
+        relaxed = dict(employee_settings)
+        for emp_id in {emp_id for emp_id, _ in self.unavailable}:
+            settings = relaxed.get(emp_id)
+            if settings is not None and settings.min_shifts_per_week:
+                columns = {c.key: getattr(settings, c.key) for c in settings.__table__.columns}
+                relaxed[emp_id] = type(settings)(**{**columns, "min_shifts_per_week": 0})
+        return relaxed
+
+    def changes_expr(self, shift_vars):
+        """
+        Number of assignments changed from the published week: published slots left out count as 1,
+        new slots count as 1. Forced removals (unavailable or pruned slots) are constants.
+        """
+        terms = []
+        constant = 0
+        for key, var in shift_vars.items():
+            if key in shift_vars.fixed_on:
+                continue
+            was_assigned = key in self.published
+            if key in shift_vars.pruned:
+                constant += 1 if was_assigned else 0
+            elif was_assigned:
+                constant += 1
+                terms.append(-var)
+            else:
+                terms.append(var)
+        return cp_model.LinearExpr.Sum(terms) + constant
+
+    def diff(self, assigned_keys) -> dict:
+        """Splits a repaired week into the (employee_id, day_index, shift_id) keys added and removed."""
+        assigned_keys = set(assigned_keys)
+        return {
+            "added": sorted(assigned_keys - self.published),
+            "removed": sorted(self.published - assigned_keys),
+        }
@@ -0,0 +1,162 @@
+"""
+Shift timing: when each shift of a location starts and ends, and what that implies between two days.
+
+Shift times are parsed into minutes once per location. From them we precompute, for every pair of shifts
+(a on day d, b on day d + 1), the rest between them and whether they overlap (shifts may cross midnight).
+The rest rules are generated from that matrix:
+- less than MIN_REST_MINUTES of rest (or an overlap) is forbidden (hard back-to-back),
+- less than FULL_REST_MINUTES is allowed but penalized (soft rest gap).
+Shift kinds (morning / evening / night, used by the quotas and the consecutive nights penalty) follow
+the middle of the shift, so a 19:00-07:00 shift is a night and a 12:00-20:00 shift an evening.
+
+Locations whose shifts have no usable times (e.g. the default "00:00"-"00:00") keep the historical
+positional convention: shifts[0] morning, shifts[1] evening, shifts[2] night, and the last shift of a
+day may not be followed by the first shift of the next.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+MIN_REST_MINUTES = 8 * 60   # Less rest between two shifts is forbidden
+FULL_REST_MINUTES = 12 * 60  # Less rest is allowed but costs a rest gap penalty
+
+MORNING, EVENING, NIGHT = 'morning', 'evening', 'night'
+KINDS = (MORNING, EVENING, NIGHT)
+
+# Kind windows for the middle of a shift, in minutes: morning [06:00, 14:00), evening [14:00, 22:00), night otherwise
+MORNING_FROM = 6 * 60
+EVENING_FROM = 14 * 60
+NIGHT_FROM = 22 * 60
+
+# Name keywords for shifts without usable times (legacy data)
+NAME_KEYWORDS = ((NIGHT, ("לילה", "night")), (EVENING, ("ערב", "צהריים", "evening")), (MORNING, ("בוקר", "morning")))
+
+
+def parse_minutes(value) -> Optional[int]:
+    """'HH:MM' (or 'HH:MM:SS') to minutes after midnight; None when the value is missing or malformed."""
+    if not isinstance(value, str):
+        return None
+    parts = value.strip().split(":")
+    if len(parts) < 2 or not all(p.isdigit() for p in parts[:2]):
+        return None
+    hours, minutes = int(parts[0]), int(parts[1])
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return None
+    return hours * 60 + minutes
+
+
+def parse_span(start_time, end_time) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) in minutes from the shift day's midnight; end is past MINUTES_PER_DAY for shifts that
+    cross midnight. None when the times are missing, malformed or describe an empty shift.
+    """
+    start, end = parse_minutes(start_time), parse_minutes(end_time)
+    if start is None or end is None or start == end:
+        return None
+    return start, end if end > start else end + MINUTES_PER_DAY
+
+
+def shift_span(shift) -> Optional[Tuple[int, int]]:
+    return parse_span(getattr(shift, 'start_time', None), getattr(shift, 'end_time', None))
+
+
+def kind_of_span(span: Tuple[int, int]) -> str:
+    middle = (span[0] + span[1]) // 2 % MINUTES_PER_DAY
+    if MORNING_FROM <= middle < EVENING_FROM:
+        return MORNING
+    if EVENING_FROM <= middle < NIGHT_FROM:
+        return EVENING
+    return NIGHT
+
+
+def shift_kind(shift) -> Optional[str]:
+    """Kind of a single shift definition: by its times, or by name keywords when it has none."""
+    span = shift_span(shift)
+    if span is not None:
+        return kind_of_span(span)
+    name = (getattr(shift, 'name', None) or "").strip().lower()
+    for kind, keywords in NAME_KEYWORDS:
+        if any(keyword in name for keyword in keywords):
+            return kind
+    return None
+
+
+@dataclass(frozen=True)
+class ShiftTiming:
+    """
+    Precomputed timing of a location's shifts, indexed by position in the (start time ordered) shift list.
+    rest[a][b]: Minutes between the end of shift a on day d and the start of shift b on day d + 1
+        (None in positional mode)
+    overlap[a][b]: Shift a on day d runs into shift b on day d + 1
+    hard_pairs / soft_pairs: (a, b) pairs forbidden / penalized on consecutive days
+    kinds: Positions of the morning, evening and night shifts
+    after_sat_night_forbidden / after_sat_night_penalized / after_sat_noon_penalized: Sunday positions
+        ruled out or penalized by last week's Saturday night / noon shifts
+    """
+    timed: bool
+    rest: Tuple[Tuple[Optional[int], ...], ...]
+    overlap: Tuple[Tuple[bool, ...], ...]
+    hard_pairs: Tuple[Tuple[int, int], ...]
+    soft_pairs: Tuple[Tuple[int, int], ...]
+    kinds: Dict[str, Tuple[int, ...]]
+    after_sat_night_forbidden: Tuple[int, ...]
+    after_sat_night_penalized: Tuple[int, ...]
+    after_sat_noon_penalized: Tuple[int, ...]
+
+    def kind_of(self, position: int) -> Optional[str]:
+        for kind, positions in self.kinds.items():
+            if position in positions:
+                return kind
+        return None
+
+
+def shift_timing(shifts) -> ShiftTiming:
+    """Timing of a shift list; computed once per distinct set of times."""
+    return _timing_for(tuple((getattr(s, 'start_time', None), getattr(s, 'end_time', None)) for s in shifts))
+
+
+@lru_cache(maxsize=256)
+def _timing_for(times: Tuple[Tuple[str, str], ...]) -> ShiftTiming:
+    S = len(times)
+    spans = [parse_span(start, end) for start, end in times]
+    if not S or any(span is None for span in spans):
+        return _positional_timing(S)
+
+    rest = tuple(tuple(MINUTES_PER_DAY + spans[b][0] - spans[a][1] for b in range(S)) for a in range(S))
+    overlap = tuple(tuple(rest[a][b] < 0 for b in range(S)) for a in range(S))
+    hard = tuple((a, b) for a in range(S) for b in range(S) if rest[a][b] < MIN_REST_MINUTES)
+    soft = tuple((a, b) for a in range(S) for b in range(S) if MIN_REST_MINUTES <= rest[a][b] < FULL_REST_MINUTES)
+    kinds = {kind: tuple(s for s in range(S) if kind_of_span(spans[s]) == kind) for kind in KINDS}
+
+    def latest(kind):
+        # Last week's state only says "worked a night / noon shift": assume the one ending latest
+        positions = kinds[kind]
+        return max(positions, key=lambda s: spans[s][1]) if positions else None
+
+    night, noon = latest(NIGHT), latest(EVENING)
+    return ShiftTiming(
+        timed=True,
+        rest=rest,
+        overlap=overlap,
+        hard_pairs=hard,
+        soft_pairs=soft,
+        kinds=kinds,
+        after_sat_night_forbidden=tuple(b for a, b in hard if a == night),
+        after_sat_night_penalized=tuple(b for a, b in soft if a == night),
+        after_sat_noon_penalized=tuple(b for a, b in hard + soft if a == noon),
+    )
+
+
+def _positional_timing(S: int) -> ShiftTiming:
+    return ShiftTiming(
+        timed=False,
+        rest=tuple((None,) * S for _ in range(S)),
+        overlap=tuple((False,) * S for _ in range(S)),
+        hard_pairs=((S - 1, 0),) if S > 1 else (),
+        soft_pairs=((1, 0),) if S > 1 else (),
+        kinds={kind: (pos,) if pos < S else () for pos, kind in enumerate(KINDS)},
+        after_sat_night_forbidden=(0,) if S > 0 else (),
+        after_sat_night_penalized=(1,) if S > 1 else (),
+        after_sat_noon_penalized=(0,) if S > 0 else (),
+    )
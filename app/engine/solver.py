@@ -1,41 +1,120 @@
+import logging
+import time
+
 from ortools.sat.python import cp_model
 from app.engine.constraints_manager import ConstraintManager
+from app.engine.demand_index import DemandIndex
+from app.engine.domain_reduction import compute_pruned_slots
+from app.engine.repair import RepairRequest
+from app.engine.symmetry import find_interchangeable_classes, canonicalize_keys
+from app.engine.solver_profiles import SolverParams
+from app.engine.variable_tensor import ShiftVarTensor
+
+logger = logging.getLogger(__name__)
 
 
 class ShiftOptimizer:
-    def __init__(self, location_id, employees, shifts, demands, weights, weekly_constraints=None):
+    def __init__(self, location_id, employees, shifts, demands, weights, weekly_constraints=None,
+                 solver_params: SolverParams = None, employee_settings=None, employee_states=None,
+                 break_symmetry: bool = False, compact_penalties: bool = True, repair: RepairRequest = None):
+        """
+        :param employee_settings: Optional settings dict, used to prune slots before variables are created
+        :param employee_states: Optional historical states dict, used the same way
+        :param break_symmetry: Order the schedules of interchangeable employees (see symmetry.py).
+            Off by default: CP-SAT presolve already detects these orbits, and on uniform locations the extra
+            ordering constraints slowed the primal search down more than they tightened the bound.
+        :param compact_penalties: Half-reify the soft-constraint penalty indicators (see ConstraintManager)
+        :param repair: Repair a published week with as few changes as possible instead of scheduling
+            from scratch (see repair.py)
+        """
         self.location_id = location_id
         self.employees = [e for e in employees if e.is_active]
         self.shifts = shifts
         self.demands = demands
+        self.demand_index = DemandIndex(shifts, demands)
         self.weights = weights
         self.weekly_constraints = weekly_constraints or []  # Store constraints safely
+        if repair is not None:
+            self.weekly_constraints = repair.relax_weekly_constraints(self.weekly_constraints)
+            employee_settings = repair.relax_settings(employee_settings or {})
+        self.solver_params = solver_params  # None keeps the CP-SAT defaults (no time limit)
+        self.break_symmetry = break_symmetry
+        self.compact_penalties = compact_penalties
+        self.repair = repair
+        self.symmetry_classes = []
+        self.employee_settings = employee_settings or {}
+        self.employee_states = employee_states or {}
 
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
-        self.shift_vars = {}
+        self.hints = set()  # (emp_id, day, shift_id) keys expected to be 1 in a good solution
         self.status = None # Track solver status safely
+        self.model_built = False
+        self.model_stats = {}  # Per constraint family build stats (see ConstraintManager.stats)
+        self.penalty_expr = None
+        self.changes_expr = None  # Repair mode only: number of assignments changed from the published week
+
+        # Slots that can never be worked get a constant instead of a variable (domain reduction)
+        self.pruned = compute_pruned_slots(self.employees, self.shifts, self.weekly_constraints,
+                                           employee_settings, employee_states)
+        self.fixed_on = frozenset()
+        self._apply_repair_neighborhood()
+
+        # Created up front so callers can hand the variables to a solution callback before solve()
+        self._create_variables()
+
+    def _apply_repair_neighborhood(self):
+        """Repair mode: every slot outside the repair neighborhood becomes a constant (see repair.py)."""
+        if self.repair is None:
+            return
+        fixed_off, fixed_on = self.repair.fixed_slots(self.employees, self.shifts)
+        self.pruned = self.pruned | fixed_off
+        self.fixed_on = frozenset(fixed_on)
 
     def _create_variables(self):
-        """Initializes decision variables using DB-based IDs."""
-        for emp in self.employees:
-            for d in range(7):
-                for s_def in self.shifts:
-                    # Create a boolean variable: 1 if employee 'emp.id' works shift 's_def.id' on day 'd', else 0
-                    self.shift_vars[(emp.id, d, s_def.id)] = self.model.NewBoolVar(
-                        f'shift_e{emp.id}_d{d}_s{s_def.id}'
-                    )
+        """Initializes decision variables using DB-based IDs, stored as a dense (employee, day, shift) tensor."""
+        self.shift_vars = ShiftVarTensor.create(self.model, self.employees, 7, self.shifts, self.pruned,
+                                                self.fixed_on)
 
-    def solve(self, employee_settings_dict, employee_states_dict):
+    def set_hints(self, hinted_keys):
         """
-        Prepares and solves the model.
-        :param employee_settings_dict: Dict mapping emp_id to EmployeeSettings object
-        :param employee_states_dict: Dict mapping emp_id to historical state dict
+        Registers a warm-start schedule (e.g. last week's assignments shifted onto this week).
+        :param hinted_keys: Iterable of (emp_id, day, shift_id) tuples that were assigned.
         """
-        self._create_variables()
+        self.hints = set(hinted_keys)
+
+    def _add_hints(self):
+        """Feeds the warm-start schedule to CP-SAT as a (possibly partial or infeasible) solution hint."""
+        if not self.hints:
+            return
+        # Permute hinted schedules inside each symmetry class so the hint respects the ordering
+        hints = canonicalize_keys(self.hints, self.employees, self.symmetry_classes, 7,
+                                  [s.id for s in self.shifts])
+        for key, var in self.shift_vars.decision_items():
+            self.model.AddHint(var, 1 if key in hints else 0)
+
+    def build_model(self, employee_settings_dict, employee_states_dict):
+        """
+        Adds the constraints, objective and hints to the model (once; later calls are no-ops).
+        solve() calls this itself; call it directly to time model construction separately.
+        """
+        if self.model_built:
+            return
+        if self.repair is not None:
+            employee_settings_dict = self.repair.relax_settings(employee_settings_dict)
+        # Kept for explain_infeasibility()
+        self.employee_settings = employee_settings_dict
+        self.employee_states = employee_states_dict
+
+        if self.break_symmetry:
+            self.symmetry_classes = find_interchangeable_classes(
+                self.employees, employee_settings_dict, employee_states_dict, self.weekly_constraints
+            )
 
         manager = ConstraintManager(
-            self.model, self.shift_vars, self.employees, self.shifts, self.demands, self.weights
+            self.model, self.shift_vars, self.employees, self.shifts, self.demands, self.weights,
+            demand_index=self.demand_index, symmetry_classes=self.symmetry_classes,
+            compact_penalties=self.compact_penalties
         )
 
 
@@ -43,11 +122,120 @@ class ShiftOptimizer:
         objective_terms = manager.apply_all_constraints(employee_settings_dict, employee_states_dict,
                                                         self.weekly_constraints)
         # Set Objective: Minimize penalties (soft constraints violations)
-        self.model.Minimize(sum(objective_terms))
+        self.penalty_expr = cp_model.LinearExpr.Sum(objective_terms)
+        if self.repair is not None:
+            self.changes_expr = self.repair.changes_expr(self.shift_vars)
+            # Phase one of the lexicographic repair; solve() switches to the penalties afterwards
+            self.model.Minimize(self.changes_expr)
+        else:
+            self.model.Minimize(self.penalty_expr)
+        self._add_hints()
+        self.model_built = True
+
+        self.model_stats = {
+            family: {**entry, "seconds": round(entry["seconds"], 6)} for family, entry in manager.stats.items()
+        }
+        # Largest families first, so the expensive parts of big locations stand out in the logs
+        summary = ", ".join(
+            f"{family} {entry['seconds'] * 1000:.1f}ms/{entry['variables']}v/{entry['constraints']}c"
+            for family, entry in sorted(self.model_stats.items(), key=lambda item: -item[1]["seconds"])
+        )
+        logger.info(f"Model for location {self.location_id} built: {summary}")
+
+    def solve(self, employee_settings_dict, employee_states_dict, solution_callback=None):
+        """
+        Prepares and solves the model.
+        :param employee_settings_dict: Dict mapping emp_id to EmployeeSettings object
+        :param employee_states_dict: Dict mapping emp_id to historical state dict
+        :param solution_callback: Optional CpSolverSolutionCallback invoked on every improving solution
+        """
+        self.build_model(employee_settings_dict, employee_states_dict)
+
+        if self.solver_params:
+            self.solver_params.apply_to(self.solver)
+
+        if self.repair is not None:
+            return self._solve_repair(solution_callback)
+
+        status = self.solver.Solve(self.model, solution_callback)
+        return status
 
+    def _solve_repair(self, solution_callback=None):
+        """
+        Lexicographic repair: minimizes the changed assignments, then fixes that count and minimizes
+        the penalties, warm-started from the first phase. Both phases share the time limit.
+        If the days that lost a shift cannot be repaired on their own, the whole rest of the week is reopened.
+        """
+        start = time.perf_counter()
         status = self.solver.Solve(self.model)
+        if status == cp_model.INFEASIBLE and not self.repair.whole_week:
+            logger.info(f"Repair of location {self.location_id} needs more than the affected days; reopening the week")
+            self._rebuild_for_repair(self.repair.widened())
+            status = self.solver.Solve(self.model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return status
+        first_phase_optimal = status == cp_model.OPTIMAL
+
+        changes = int(self.solver.ObjectiveValue())
+        self.model.Add(self.changes_expr <= changes)
+        self.model.ClearHints()
+        for _, var in self.shift_vars.decision_items():
+            self.model.AddHint(var, self.solver.Value(var))
+        self.model.Minimize(self.penalty_expr)
+
+        if self.solver_params:
+            remaining = self.solver_params.max_time_in_seconds - (time.perf_counter() - start)
+            self.solver.parameters.max_time_in_seconds = max(0.1, remaining)
+
+        status = self.solver.Solve(self.model, solution_callback)
+        if status == cp_model.OPTIMAL and not first_phase_optimal:
+            # Penalties are optimal for a change count that was not proven minimal
+            return cp_model.FEASIBLE
         return status
 
+    def _rebuild_for_repair(self, repair: RepairRequest):
+        """Recreates the variables and the model for another repair neighborhood."""
+        self.repair = repair
+        self.pruned = compute_pruned_slots(self.employees, self.shifts, self.weekly_constraints,
+                                           self.employee_settings, self.employee_states)
+        self._apply_repair_neighborhood()
+        self.model = cp_model.CpModel()
+        self.model_built = False
+        self._create_variables()
+        self.build_model(self.employee_settings, self.employee_states)
+
+    def explain_infeasibility(self):
+        """
+        Explains an infeasible week with one extra solve.
+        Rebuilds the hard constraints on a fresh model (without pruning, so time-off blocks can be blamed),
+        guards every group with an assumption literal and returns the labels of a set of groups that
+        cannot all hold together. Returns an empty list when the week is not proven infeasible.
+        """
+        model = cp_model.CpModel()
+        shift_vars = ShiftVarTensor.create(model, self.employees, 7, self.shifts)
+        manager = ConstraintManager(
+            model, shift_vars, self.employees, self.shifts, self.demands, self.weights,
+            demand_index=self.demand_index, diagnose=True
+        )
+        manager._add_hard_constraints(self.employee_settings, self.employee_states, self.weekly_constraints)
+        model.AddAssumptions([literal for literal, _ in manager.guards.values()])
+
+        solver = cp_model.CpSolver()
+        if self.solver_params:
+            self.solver_params.apply_to(solver)
+        # Infeasible cores over assumptions are only reported by the single-worker search
+        solver.parameters.num_workers = 1
+
+        if solver.Solve(model) != cp_model.INFEASIBLE:
+            return []
+
+        labels = manager.guard_labels()
+        return [labels[index] for index in solver.SufficientAssumptionsForInfeasibility()]
+
+    def stop(self):
+        """Asks a running solve to stop; safe to call from another thread."""
+        self.solver.StopSearch()
+
     def get_results_as_dicts(self):
         """Returns the solution in a format ready for DB insertion."""
         assignments = []
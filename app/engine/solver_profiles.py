@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class SolverParams:
+    """
+    CP-SAT search parameters for a single solve.
+    Built either from a location's stored SolverProfile row or from BUILTIN_PROFILES.
+    """
+    max_time_in_seconds: float
+    num_workers: int = 0  # 0 lets CP-SAT use all available cores
+    relative_gap_limit: float = 0.0
+    random_seed: int = 0
+
+    def apply_to(self, solver):
+        """Copies these parameters onto a cp_model.CpSolver instance."""
+        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
+        solver.parameters.num_workers = self.num_workers
+        solver.parameters.relative_gap_limit = self.relative_gap_limit
+        solver.parameters.random_seed = self.random_seed
+
+    @classmethod
+    def from_profile(cls, profile) -> "SolverParams":
+        """Builds params from a SolverProfile DB row."""
+        return cls(
+            max_time_in_seconds=profile.max_time_in_seconds,
+            num_workers=profile.num_workers,
+            relative_gap_limit=profile.relative_gap_limit,
+            random_seed=profile.random_seed,
+        )
+
+
+# Fallback profiles, used when a location has no stored row with the requested name
+BUILTIN_PROFILES: Dict[str, SolverParams] = {
+    # Fast answer for the schedule screen: stop at 2s or within 1% of the bound
+    "interactive": SolverParams(max_time_in_seconds=2.0, num_workers=8, relative_gap_limit=0.01),
+    # Nightly runs: up to 10 minutes on every core, prove optimality if possible
+    "overnight": SolverParams(max_time_in_seconds=600.0, num_workers=0, relative_gap_limit=0.0),
+}
+
+# Used when a request names no profile. Before profiles existed every solve ran with CP-SAT's defaults
+# (no time limit, all cores, no gap), which could hold a web worker for minutes; requests that want
+# that search now ask for "overnight" or store their own profile under this name.
+DEFAULT_PROFILE = "interactive"
@@ -0,0 +1,61 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Settings fields the model reads; employees must agree on all of them to be interchangeable
+SETTINGS_FIELDS = (
+    'min_shifts_per_week', 'max_shifts_per_week', 'target_shifts',
+    'max_nights', 'min_nights', 'max_mornings', 'min_mornings', 'max_evenings', 'min_evenings',
+)
+
+# Lexicographic ordering is encoded as one weighted sum with power-of-two coefficients,
+# which must stay inside CP-SAT's 64-bit integer range
+MAX_LEX_LENGTH = 60
+
+
+def employee_signature(settings, state) -> Tuple:
+    """
+    Everything the model knows about an employee apart from their id.
+    Two employees with equal signatures (and no weekly constraints) can swap schedules freely.
+    """
+    settings_key = None if settings is None else tuple(getattr(settings, f, None) for f in SETTINGS_FIELDS)
+    state_key = (
+        getattr(state, 'history_streak', 0) or 0,
+        bool(getattr(state, 'worked_last_fri_night', False)),
+        bool(getattr(state, 'worked_last_sat_noon', False)),
+        bool(getattr(state, 'worked_last_sat_night', False)),
+    )
+    return settings_key, state_key
+
+
+def find_interchangeable_classes(employees, employee_settings: Dict, employee_states: Dict,
+                                 weekly_constraints: List[dict]) -> List[List[int]]:
+    """
+    Groups employees into equivalence classes by signature.
+    Employees with any weekly constraint are left out, since their requests tie them to specific slots.
+    Returns classes of two or more positions into 'employees', in employee order.
+    """
+    constrained: Set[int] = {c["employee_id"] for c in weekly_constraints or []}
+    classes: Dict[Tuple, List[int]] = {}
+    for e, emp in enumerate(employees):
+        if emp.id in constrained:
+            continue
+        signature = employee_signature(employee_settings.get(emp.id), employee_states.get(emp.id))
+        classes.setdefault(signature, []).append(e)
+    return [members for members in classes.values() if len(members) > 1]
+
+
+def canonicalize_keys(keys: Iterable[Tuple[int, int, int]], employees, classes: List[List[int]],
+                      num_days: int, shift_ids: List[int]) -> Set[Tuple[int, int, int]]:
+    """
+    Reassigns schedules within each class so they satisfy the symmetry-breaking order
+    (lexicographically non-increasing in (day, shift) order). Used to keep warm-start hints feasible.
+    """
+    keys = set(keys)
+    slots = [(d, s_id) for d in range(num_days) for s_id in shift_ids]
+    for members in classes:
+        emp_ids = [employees[e].id for e in members]
+        schedules = [tuple(1 if (emp_id, d, s_id) in keys else 0 for d, s_id in slots) for emp_id in emp_ids]
+        for emp_id in emp_ids:
+            keys -= {(emp_id, d, s_id) for d, s_id in slots}
+        for emp_id, schedule in zip(emp_ids, sorted(schedules, reverse=True)):
+            keys |= {(emp_id, d, s_id) for (d, s_id), bit in zip(slots, schedule) if bit}
+    return keys
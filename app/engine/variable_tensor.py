@@ -0,0 +1,103 @@
+from collections.abc import Mapping
+from typing import Dict, List, Set, Tuple
+
+
+class ShiftVarTensor(Mapping):
+    """
+    Decision variables for (employee, day, shift), stored in one flat list with dense integer indices.
+    Position (e, d, s) lives at flat[(e * num_days + d) * num_shifts + s].
+
+    The per-employee, per-(employee, day), per-(employee, shift) and per-(day, shift) slices that
+    ConstraintManager sums over are computed once here, so constraint families can pass them straight
+    to LinearExpr.Sum instead of rebuilding Python lists for every constraint.
+
+    It also behaves as a read-only mapping keyed by (emp_id, day, shift_id), like the dict it replaces.
+    Pruned slots hold a shared constant 0 instead of a decision variable, and 'fixed_on' slots
+    (frozen assignments, see repair.py) a shared constant 1.
+    """
+
+    def __init__(self, employee_ids: List[int], num_days: int, shift_ids: List[int], flat: List,
+                 pruned: Set[Tuple[int, int, int]] = frozenset(),
+                 fixed_on: Set[Tuple[int, int, int]] = frozenset()):
+        self.employee_ids = list(employee_ids)
+        self.shift_ids = list(shift_ids)
+        self.num_days = num_days
+        self.num_shifts = len(self.shift_ids)
+        self.flat = flat
+        self.pruned = frozenset(pruned)
+        self.fixed_on = frozenset(fixed_on)
+
+        self.emp_pos: Dict[int, int] = {emp_id: e for e, emp_id in enumerate(self.employee_ids)}
+        self.shift_pos: Dict[int, int] = {s_id: s for s, s_id in enumerate(self.shift_ids)}
+
+        D, S = num_days, self.num_shifts
+        E = len(self.employee_ids)
+        self.by_emp = [flat[e * D * S:(e + 1) * D * S] for e in range(E)]
+        self.by_emp_day = [[flat[(e * D + d) * S:(e * D + d + 1) * S] for d in range(D)] for e in range(E)]
+        self.by_emp_shift = [[flat[e * D * S + s:(e + 1) * D * S:S] for s in range(S)] for e in range(E)]
+        self.by_day_shift = [[flat[d * S + s::D * S] for s in range(S)] for d in range(D)]
+
+    @classmethod
+    def create(cls, model, employees, num_days: int, shifts,
+               pruned: Set[Tuple[int, int, int]] = frozenset(),
+               fixed_on: Set[Tuple[int, int, int]] = frozenset()) -> "ShiftVarTensor":
+        """
+        Creates one Boolean variable per (employee, day, shift), in tensor order.
+        Keys in 'pruned' (see domain_reduction) get the constant 0 instead, keys in 'fixed_on' the constant 1.
+        """
+        zero = model.NewConstant(0) if pruned else None
+        one = model.NewConstant(1) if fixed_on else None
+
+        def slot(emp_id, d, s_id):
+            if (emp_id, d, s_id) in pruned:
+                return zero
+            if (emp_id, d, s_id) in fixed_on:
+                return one
+            # 1 if employee 'emp_id' works shift 's_id' on day 'd', else 0
+            return model.NewBoolVar(f'shift_e{emp_id}_d{d}_s{s_id}')
+
+        flat = [slot(emp.id, d, s_def.id) for emp in employees for d in range(num_days) for s_def in shifts]
+        return cls([e.id for e in employees], num_days, [s.id for s in shifts], flat, pruned, fixed_on)
+
+    @classmethod
+    def from_dict(cls, shift_vars: Dict[Tuple[int, int, int], object], employees, num_days: int,
+                  shifts) -> "ShiftVarTensor":
+        """Wraps an existing {(emp_id, day, shift_id): var} dict (as built by the engine tests)."""
+        flat = [shift_vars[(emp.id, d, s_def.id)] for emp in employees for d in range(num_days) for s_def in shifts]
+        return cls([e.id for e in employees], num_days, [s.id for s in shifts], flat)
+
+    def decision_items(self):
+        """(key, var) pairs for the slots that are real decision variables (pruned and fixed slots skipped)."""
+        return ((key, var) for key, var in self.items() if key not in self.pruned and key not in self.fixed_on)
+
+    def var(self, e: int, d: int, s: int):
+        """Positional access by (employee index, day, shift index)."""
+        return self.flat[(e * self.num_days + d) * self.num_shifts + s]
+
+    # --- Mapping interface keyed by (emp_id, day, shift_id) ---
+
+    def __getitem__(self, key):
+        emp_id, d, shift_id = key
+        try:
+            e, s = self.emp_pos[emp_id], self.shift_pos[shift_id]
+        except KeyError:
+            raise KeyError(key)
+        if not 0 <= d < self.num_days:
+            raise KeyError(key)
+        return self.flat[(e * self.num_days + d) * self.num_shifts + s]
+
+    def __iter__(self):
+        for emp_id in self.employee_ids:
+            for d in range(self.num_days):
+                for shift_id in self.shift_ids:
+                    yield (emp_id, d, shift_id)
+
+    def __len__(self):
+        return len(self.flat)
+
+    def items(self):
+        # Keys are generated in the same (e, d, s) order as the flat list
+        return zip(iter(self), self.flat)
+
+    def values(self):
+        return iter(self.flat)
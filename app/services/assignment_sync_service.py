@@ -0,0 +1,246 @@
+"""
+Set-based application of a Smart Sync diff.
+
+The existing (employee_id, shift_id, date) keys of the range are read as plain tuples, the diff with
+the desired state is computed in Python, and it is applied with one multi-row
+INSERT ... ON CONFLICT DO NOTHING (on the uq_assignments_employee_date_shift key) and one
+DELETE ... WHERE (employee_id, shift_id, date) IN (...). Unchanged rows are never loaded as ORM
+objects and keep their ids.
+
+Patch saves (apply_assignment_patch) skip the diff: the client sends the added and removed keys of one
+week together with the week's version number (schedule_versions), so a save costs O(changes). Every
+save of a week, full or patch, bumps its version; a patch made against an older version is rejected
+with StaleScheduleVersion, as is a patch that no longer applies (adding a key that exists, removing
+one that does not). The versions of the weeks covering a date range also make up the range's ETag,
+used for conditional reads (If-None-Match) and conditional full syncs (If-Match).
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import delete, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core import models
+from app.services.history_state_service import refresh_week_states, week_start_of
+
+# (employee_id, shift_id, date)
+AssignmentKey = Tuple[int, int, date]
+
+# Rows per statement; keeps the bound parameters under the driver limits for very large syncs
+MAX_ROWS_PER_STATEMENT = 5000
+
+
+class StaleScheduleVersion(Exception):
+    """A patch made against an older version of the week, or that no longer applies to it."""
+
+    def __init__(self, message: str, current_version: int):
+        super().__init__(message)
+        self.current_version = current_version
+
+
+@dataclass
+class SyncResult:
+    added: int
+    removed: int
+    unchanged: int
+    versions: Dict[date, int]
+
+
+@dataclass
+class PatchResult:
+    added: int
+    removed: int
+    version: int
+
+
+def load_assignment_keys(db: Session, location_id: int, start_date: date, end_date: date) -> Set[AssignmentKey]:
+    A = models.Assignment
+    return {tuple(row) for row in db.execute(select(A.employee_id, A.shift_id, A.date).where(
+        A.location_id == location_id,
+        A.date >= start_date,
+        A.date <= end_date
+    ))}
+
+
+def insert_assignments(db: Session, location_id: int, keys: List[AssignmentKey]) -> int:
+    """Multi-row insert that skips keys already present. Returns the number of rows inserted."""
+    table = models.Assignment.__table__
+    stmt = _insert_skipping_conflicts(db, table, ["employee_id", "date", "shift_id"])
+    # One cached statement; the driver sends the rows as multi-row VALUES batches (insertmanyvalues).
+    # RETURNING counts the rows actually inserted, conflicts excluded
+    rows = [{"location_id": location_id, "employee_id": emp_id, "shift_id": shift_id, "date": day}
+            for emp_id, shift_id, day in keys]
+    return len(db.execute(stmt.returning(table.c.id), rows).all())
+
+
+def delete_assignments(db: Session, location_id: int, keys: List[AssignmentKey]) -> int:
+    """Deletes the location's assignments with the given keys. Returns the number of rows deleted."""
+    A = models.Assignment
+    deleted = 0
+    for chunk in _chunks(keys):
+        deleted += db.execute(
+            delete(A).where(
+                A.location_id == location_id,
+                tuple_(A.employee_id, A.shift_id, A.date).in_(chunk)
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+    return deleted
+
+
+def sync_assignments(db: Session, location_id: int, start_date: date, end_date: date,
+                     incoming: Iterable[AssignmentKey]) -> SyncResult:
+    """
+    Makes the location's assignments between start_date and end_date equal to 'incoming' and refreshes
+    the history of the employees and weeks that changed. The caller commits.
+    'added' and 'removed' count the keys of the diff, as the row-by-row sync did; an incoming key outside
+    the range that already exists is counted as added but not inserted again.
+    """
+    existing = load_assignment_keys(db, location_id, start_date, end_date)
+    incoming = set(incoming)
+    to_add = sorted(incoming - existing)
+    to_remove = sorted(existing - incoming)
+
+    if to_add:
+        insert_assignments(db, location_id, to_add)
+    if to_remove:
+        delete_assignments(db, location_id, to_remove)
+
+    changed = to_add + to_remove
+    versions = {}
+    if changed:
+        refresh_week_states(db, location_id, {k[0] for k in changed}, {k[2] for k in changed})
+        versions = bump_schedule_versions(db, location_id, {week_start_of(k[2]) for k in changed})
+    return SyncResult(added=len(to_add), removed=len(to_remove), unchanged=len(existing) - len(to_remove),
+                      versions=versions)
+
+
+def apply_assignment_patch(db: Session, location_id: int, week_start: date, base_version: int,
+                           add: Iterable[AssignmentKey], remove: Iterable[AssignmentKey]) -> PatchResult:
+    """
+    Applies explicit edits to one week, made against version 'base_version' of it. The caller commits,
+    or rolls back on StaleScheduleVersion (the version may already be bumped in the transaction).
+    Raises ValueError for malformed patches.
+    """
+    add, remove = list(add), list(remove)
+    if week_start_of(week_start) != week_start:
+        raise ValueError(f"{week_start} is not the first day of a week (Sunday)")
+    outside = [key for key in add + remove if not week_start <= key[2] < week_start + timedelta(days=7)]
+    if outside:
+        raise ValueError(f"Dates outside the week of {week_start}: {sorted({k[2].isoformat() for k in outside})}")
+    if len(set(add)) != len(add) or len(set(remove)) != len(remove) or set(add) & set(remove):
+        raise ValueError("Each assignment may be added or removed once per patch")
+
+    # Compare-and-set on the version first: concurrent saves of the week serialize on its row
+    _ensure_schedule_versions(db, location_id, [week_start])
+    V = models.ScheduleVersion
+    bumped = db.execute(update(V).where(
+        V.location_id == location_id,
+        V.week_start == week_start,
+        V.version == base_version
+    ).values(version=V.version + 1).execution_options(synchronize_session=False)).rowcount
+    if not bumped:
+        current = load_schedule_versions(db, location_id, [week_start])[week_start]
+        raise StaleScheduleVersion(
+            f"The week of {week_start} is at version {current}, the patch was made against {base_version}",
+            current
+        )
+
+    removed = delete_assignments(db, location_id, sorted(remove)) if remove else 0
+    if removed != len(remove):
+        raise StaleScheduleVersion("Some removed assignments are not in the schedule", base_version)
+    added = insert_assignments(db, location_id, sorted(add)) if add else 0
+    if added != len(add):
+        raise StaleScheduleVersion("Some added assignments are already in the schedule", base_version)
+
+    changed = add + remove
+    if changed:
+        refresh_week_states(db, location_id, {k[0] for k in changed}, {k[2] for k in changed})
+    return PatchResult(added=added, removed=removed, version=base_version + 1)
+
+
+def load_schedule_versions(db: Session, location_id: int, weeks: Iterable[date]) -> Dict[date, int]:
+    """Version of each week; 0 for weeks never saved."""
+    weeks = set(weeks)
+    V = models.ScheduleVersion
+    versions = dict.fromkeys(weeks, 0)
+    versions.update(db.execute(select(V.week_start, V.version).where(
+        V.location_id == location_id,
+        V.week_start.in_(weeks)
+    )).all())
+    return versions
+
+
+def bump_schedule_versions(db: Session, location_id: int, weeks: Iterable[date]) -> Dict[date, int]:
+    """Increments the version of each week. Returns the new versions."""
+    weeks = sorted(set(weeks))
+    _ensure_schedule_versions(db, location_id, weeks)
+    V = models.ScheduleVersion
+    db.execute(update(V).where(
+        V.location_id == location_id,
+        V.week_start.in_(weeks)
+    ).values(version=V.version + 1).execution_options(synchronize_session=False))
+    return load_schedule_versions(db, location_id, weeks)
+
+
+def weeks_between(start_date: date, end_date: date) -> List[date]:
+    """Sundays of the weeks overlapping [start_date, end_date]."""
+    weeks, week = [], week_start_of(start_date)
+    while week <= end_date:
+        weeks.append(week)
+        week += timedelta(days=7)
+    return weeks
+
+
+def schedule_etag(location_id: int, versions: Dict[date, int]) -> str:
+    """Strong ETag of a date range, from the versions of the weeks covering it."""
+    weeks = sorted(versions)
+    if not weeks:
+        return f'"{location_id}"'
+    return f'"{location_id}-{weeks[0].isoformat()}-{".".join(str(versions[w]) for w in weeks)}"'
+
+
+def load_schedule_etag(db: Session, location_id: int, start_date: date, end_date: date) -> str:
+    return schedule_etag(location_id, load_schedule_versions(db, location_id, weeks_between(start_date, end_date)))
+
+
+def lock_schedule_etag(db: Session, location_id: int, start_date: date, end_date: date) -> str:
+    """
+    ETag of the range, with the version rows of its weeks locked until the transaction ends
+    (SELECT ... FOR UPDATE), so a conditional save cannot interleave with another save of those weeks.
+    """
+    weeks = weeks_between(start_date, end_date)
+    _ensure_schedule_versions(db, location_id, weeks)
+    V = models.ScheduleVersion
+    versions = dict(db.execute(select(V.week_start, V.version).where(
+        V.location_id == location_id,
+        V.week_start.in_(weeks)
+    ).order_by(V.week_start).with_for_update()).all())
+    return schedule_etag(location_id, versions)
+
+
+def _ensure_schedule_versions(db: Session, location_id: int, weeks: List[date]) -> None:
+    """Creates the version rows (at version 0) of the weeks that have none yet."""
+    V = models.ScheduleVersion
+    existing = set(db.execute(select(V.week_start).where(
+        V.location_id == location_id,
+        V.week_start.in_(weeks)
+    )).scalars())
+    missing = [w for w in weeks if w not in existing]
+    if missing:
+        db.execute(_insert_skipping_conflicts(db, V.__table__, ["location_id", "week_start"]),
+                   [{"location_id": location_id, "week_start": w, "version": 0} for w in missing])
+
+
+def _insert_skipping_conflicts(db: Session, table, index_elements: List[str]):
+    """INSERT ... ON CONFLICT DO NOTHING where the dialect has it, a plain INSERT otherwise."""
+    dialect_insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        return insert(table)
+    return dialect_insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def _chunks(keys: List[AssignmentKey]):
+    for i in range(0, len(keys), MAX_ROWS_PER_STATEMENT):
+        yield keys[i:i + MAX_ROWS_PER_STATEMENT]
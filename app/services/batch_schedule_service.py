@@ -0,0 +1,362 @@
+"""
+Batch auto-generate across every location of a client or organization.
+
+All locations' inputs are loaded with one query per table (instead of one round of queries per location),
+then each location is solved in its own process. The machine is shared through a global CPU cap:
+the pool runs at most max_cpus solves at once and each solve gets max_cpus // processes CP-SAT workers,
+never more than its own solver profile asks for. Results come back as one report.
+
+The batch runs inside one HTTP request, so its worst-case solve time (every location using its whole
+time limit, max_cpus locations at a time) is capped at max_request_seconds; a larger batch is refused
+before anything is solved. Long profiles such as 'overnight' belong on the job queue, per location.
+"""
+import heapq
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ortools.sat.python import cp_model
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import models
+from app.engine.solver_profiles import SolverParams, BUILTIN_PROFILES, DEFAULT_PROFILE
+from app.engine.shift_timing import shift_kind
+from app.services.history_state_service import to_historical_state, week_start_of
+from app.services.solve_cache import compute_fingerprint, result_cache
+from app.services.streak_query import DEFAULT_LOOKBACK_DAYS, compute_history_rows, to_historical_states
+from app.services.weekly_schedule_service import (
+    ScheduleInputs,
+    build_optimizer,
+    build_schedule_result,
+    complete_employee_states,
+    parse_weekly_constraints
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest worst-case solve time a batch request may ask for (proxies and clients time out beyond this)
+MAX_BATCH_REQUEST_SECONDS = 120.0
+
+
+def resolve_batch_locations(db: Session, client_id: int = None, organization_id: int = None) -> List[models.Location]:
+    """
+    Returns the locations of a client or of every client in an organization (exactly one must be given).
+    """
+    if (client_id is None) == (organization_id is None):
+        raise ValueError("Provide exactly one of client_id or organization_id")
+
+    if client_id is not None:
+        if db.get(models.Client, client_id) is None:
+            raise ValueError(f"Client with ID {client_id} not found")
+        stmt = select(models.Location).where(models.Location.client_id == client_id)
+    else:
+        if db.get(models.Organization, organization_id) is None:
+            raise ValueError(f"Organization with ID {organization_id} not found")
+        stmt = select(models.Location).join(models.Client).where(models.Client.organization_id == organization_id)
+
+    return db.execute(stmt.order_by(models.Location.id)).scalars().all()
+
+
+def load_schedule_inputs_bulk(db: Session, locations: List[models.Location],
+                              start_date: date) -> Tuple[Dict[int, ScheduleInputs], Dict[int, list]]:
+    """
+    Loads the solver inputs of many locations with one query per table.
+    Returns the inputs and last week's hints, both keyed by location ID.
+    Locations without active employees get inputs with an empty employee list.
+    """
+    location_ids = [loc.id for loc in locations]
+    end_date = start_date + timedelta(days=6)
+    history_start = start_date - timedelta(days=7)
+
+    employees = db.execute(select(models.Employee).where(
+        models.Employee.location_id.in_(location_ids),
+        models.Employee.is_active == True
+    )).scalars().all()
+    emp_ids = [e.id for e in employees]
+
+    shifts = db.execute(select(models.ShiftDefinition).where(
+        models.ShiftDefinition.location_id.in_(location_ids)
+    ).order_by(models.ShiftDefinition.start_time)).scalars().all()
+
+    demands = db.execute(select(models.ShiftDemand).where(
+        models.ShiftDemand.shift_definition_id.in_([s.id for s in shifts])
+    )).scalars().all()
+
+    weights = db.execute(select(models.LocationWeights).where(
+        models.LocationWeights.location_id.in_(location_ids)
+    )).scalars().all()
+
+    settings = db.execute(select(models.EmployeeSettings).where(
+        models.EmployeeSettings.employee_id.in_(emp_ids)
+    )).scalars().all()
+
+    constraints = db.execute(select(models.WeeklyConstraint).where(
+        models.WeeklyConstraint.employee_id.in_(emp_ids),
+        models.WeeklyConstraint.date >= start_date,
+        models.WeeklyConstraint.date <= end_date
+    )).scalars().all()
+
+    # The lookback window's assignments of the active employees feed the streaks of the employees without
+    # a maintained week state (as calculate_historical_states does per location); last week's are the hints
+    history = db.execute(select(
+        models.Assignment.location_id, models.Assignment.employee_id, models.Assignment.date, models.Assignment.shift_id
+    ).where(
+        models.Assignment.location_id.in_(location_ids),
+        models.Assignment.employee_id.in_(emp_ids),
+        models.Assignment.date >= start_date - timedelta(days=DEFAULT_LOOKBACK_DAYS),
+        models.Assignment.date < start_date
+    )).all()
+
+    # Maintained week states of last week, preferred over the scan for the employees that have one
+    week_states: Optional[Dict[int, dict]] = None
+    if week_start_of(start_date) == start_date:
+        week_states = {loc_id: {} for loc_id in location_ids}
+        for row in db.execute(select(models.EmployeeWeekState).where(
+            models.EmployeeWeekState.location_id.in_(location_ids),
+            models.EmployeeWeekState.employee_id.in_(emp_ids),
+            models.EmployeeWeekState.week_start == history_start
+        )).scalars():
+            week_states[row.location_id][row.employee_id] = to_historical_state(row)
+
+    emp_location = {e.id: e.location_id for e in employees}
+    shift_location = {s.id: s.location_id for s in shifts}
+    by_location = {loc_id: {"employees": [], "shifts": [], "demands": [], "constraints": [], "history": []}
+                   for loc_id in location_ids}
+    for e in employees:
+        by_location[e.location_id]["employees"].append(e)
+    for s in shifts:
+        by_location[s.location_id]["shifts"].append(s)
+    for d in demands:
+        by_location[shift_location[d.shift_definition_id]]["demands"].append(d)
+    for c in constraints:
+        by_location[emp_location[c.employee_id]]["constraints"].append(c)
+    for location_id, employee_id, day, shift_id in history:
+        by_location[location_id]["history"].append((employee_id, day, shift_id))
+    kinds = {s.id: shift_kind(s) for s in shifts}
+    weights_by_location = {w.location_id: w for w in weights}
+    settings_by_employee = {s.employee_id: s for s in settings}
+
+    inputs, hints = {}, {}
+    for loc in locations:
+        rows = by_location[loc.id]
+        states = dict(week_states[loc.id]) if week_states is not None else {}
+        scanned = [w for w in rows["history"] if w[0] not in states]
+        states.update(to_historical_states(compute_history_rows(scanned, start_date, DEFAULT_LOOKBACK_DAYS, kinds)))
+        inputs[loc.id] = ScheduleInputs(
+            location=loc,
+            start_date=start_date,
+            employees=rows["employees"],
+            shifts=rows["shifts"],
+            demands=rows["demands"],
+            weights=weights_by_location.get(loc.id) or models.LocationWeights(location_id=loc.id),
+            employee_settings={e.id: settings_by_employee[e.id] for e in rows["employees"]
+                               if e.id in settings_by_employee},
+            weekly_constraints=parse_weekly_constraints(rows["constraints"], start_date),
+            employee_states=complete_employee_states(rows["employees"], states)
+        )
+        hints[loc.id] = [(emp_id, (day - history_start).days, shift_id)
+                         for emp_id, day, shift_id in rows["history"] if day >= history_start]
+    return inputs, hints
+
+
+def resolve_solver_params_bulk(db: Session, location_ids: List[int], profile_name: str = None) -> Dict[int, SolverParams]:
+    """
+    Resolves one named solver profile for many locations with a single query (see resolve_solver_params).
+    """
+    profile_name = profile_name or DEFAULT_PROFILE
+    stored = db.execute(select(models.SolverProfile).where(
+        models.SolverProfile.location_id.in_(location_ids),
+        models.SolverProfile.name == profile_name
+    )).scalars().all()
+    params = {p.location_id: SolverParams.from_profile(p) for p in stored}
+
+    for location_id in location_ids:
+        if location_id not in params:
+            if profile_name not in BUILTIN_PROFILES:
+                raise ValueError(f"Solver profile '{profile_name}' not found for location {location_id}")
+            params[location_id] = BUILTIN_PROFILES[profile_name]
+    return params
+
+
+def allocate_cpus(params: Dict[int, SolverParams], max_cpus: int,
+                  max_time_per_location: float = None) -> Tuple[int, Dict[int, SolverParams]]:
+    """
+    Splits a CPU cap between concurrent solves.
+    Returns the pool size and each location's params with num_workers (0 means 'all cores') capped to its share,
+    and the time limit capped to max_time_per_location when given.
+    """
+    processes = max(1, min(len(params), max_cpus))
+    share = max(1, max_cpus // processes)
+
+    capped = {}
+    for location_id, p in params.items():
+        workers = share if p.num_workers <= 0 else min(p.num_workers, share)
+        time_limit = p.max_time_in_seconds
+        if max_time_per_location is not None:
+            time_limit = min(time_limit, max_time_per_location)
+        capped[location_id] = replace(p, num_workers=workers, max_time_in_seconds=time_limit)
+    return processes, capped
+
+
+def estimate_batch_seconds(params: Dict[int, SolverParams], processes: int) -> float:
+    """
+    Worst-case solve time of a batch: the pool runs the locations in order on 'processes' slots,
+    each one using its whole time limit.
+    """
+    slots = [0.0] * max(1, processes)
+    for p in params.values():
+        heapq.heapreplace(slots, slots[0] + p.max_time_in_seconds)
+    return max(slots)
+
+
+def _transient_copy(row):
+    """Detached copy of an ORM row holding only its column values (safe to pickle into a worker process)."""
+    return type(row)(**{c.key: getattr(row, c.key) for c in row.__table__.columns})
+
+
+def _to_worker_inputs(inputs: ScheduleInputs) -> ScheduleInputs:
+    return ScheduleInputs(
+        location=_transient_copy(inputs.location),
+        start_date=inputs.start_date,
+        employees=[_transient_copy(e) for e in inputs.employees],
+        shifts=[_transient_copy(s) for s in inputs.shifts],
+        demands=[_transient_copy(d) for d in inputs.demands],
+        weights=_transient_copy(inputs.weights),
+        employee_settings={emp_id: _transient_copy(s) for emp_id, s in inputs.employee_settings.items()},
+        weekly_constraints=inputs.weekly_constraints,
+        employee_states=inputs.employee_states
+    )
+
+
+def solve_location(inputs: ScheduleInputs, solver_params: SolverParams, hints) -> dict:
+    """
+    Worker entry point: builds and solves one location and returns its result with build/solve timings.
+    """
+    build_start = time.perf_counter()
+    optimizer = build_optimizer(inputs, solver_params, hints)
+    optimizer.build_model(inputs.employee_settings, inputs.employee_states)
+    build_seconds = time.perf_counter() - build_start
+
+    solve_start = time.perf_counter()
+    status = optimizer.solve(inputs.employee_settings, inputs.employee_states)
+    solve_seconds = time.perf_counter() - solve_start
+
+    result = build_schedule_result(optimizer, status, inputs.location.id, inputs.start_date)
+    result["cacheable"] = status in (cp_model.OPTIMAL, cp_model.FEASIBLE, cp_model.INFEASIBLE)
+    result["build_seconds"] = round(build_seconds, 4)
+    result["solve_seconds"] = round(solve_seconds, 4)
+    return result
+
+
+def generate_batch_schedules(db: Session, start_date: date, client_id: int = None, organization_id: int = None,
+                             profile_name: str = None, warm_start: bool = True, use_cache: bool = True,
+                             max_cpus: Optional[int] = None, max_time_per_location: float = None,
+                             max_request_seconds: Optional[float] = MAX_BATCH_REQUEST_SECONDS) -> dict:
+    """
+    Auto-generates the week for every location of a client or organization, solving locations in parallel.
+    1. Resolve the locations and bulk-load their inputs and solver profiles
+    2. Serve unchanged locations from the result cache (keyed by the capped params a location is solved with)
+    3. Solve the rest in a process pool under the global CPU cap
+    4. Return one report with per-location status, objective, timings and draft
+    Raises ValueError when the worst-case solve time exceeds max_request_seconds (None = no cap).
+    """
+    batch_start = time.perf_counter()
+    max_cpus = max(1, max_cpus or os.cpu_count() or 1)
+
+    # --- 1. Bulk load ---
+    locations = resolve_batch_locations(db, client_id, organization_id)
+    load_start = time.perf_counter()
+    all_inputs, previous_week = load_schedule_inputs_bulk(db, locations, start_date)
+    params = resolve_solver_params_bulk(db, [loc.id for loc in locations], profile_name)
+    load_seconds = time.perf_counter() - load_start
+
+    reports: Dict[int, dict] = {}
+    staffed = [loc.id for loc in locations if all_inputs[loc.id].employees]
+    for loc in locations:
+        if loc.id not in staffed:
+            reports[loc.id] = {"status": "SKIPPED", "error": "No active employees found for this location"}
+
+    # --- 2. CPU and time budget of each location (fixed by the batch size, so it is stable across runs) ---
+    processes, capped_params = allocate_cpus({loc_id: params[loc_id] for loc_id in staffed}, max_cpus,
+                                             max_time_per_location)
+
+    # --- 3. Result cache ---
+    # Results are stored under the fingerprint of the params they were solved with: a solve cut short by the
+    # batch's CPU or time cap must not be served as a full solve of the profile. A full solve is reused, though.
+    pending: Dict[int, str] = {}
+    for loc_id in staffed:
+        inputs = all_inputs[loc_id]
+        hints = previous_week[loc_id] if warm_start else []
+        fingerprint = compute_fingerprint(inputs, capped_params[loc_id], hints)
+        cached = None
+        if use_cache:
+            cached = result_cache.get(fingerprint)
+            if cached is None and capped_params[loc_id] != params[loc_id]:
+                cached = result_cache.get(compute_fingerprint(inputs, params[loc_id], hints))
+        if cached is not None:
+            cached["cached"] = True
+            reports[loc_id] = cached
+        else:
+            pending[loc_id] = fingerprint
+
+    # --- 4. Parallel solve ---
+    processes = min(processes, max(1, len(pending)))
+    worst_case = estimate_batch_seconds({loc_id: capped_params[loc_id] for loc_id in pending}, processes)
+    if max_request_seconds is not None and worst_case > max_request_seconds:
+        rounds = -(-len(pending) // processes)
+        raise ValueError(
+            f"Solving {len(pending)} locations in {processes} processes may take up to {worst_case:.0f}s, "
+            f"over the {max_request_seconds:.0f}s limit of a batch request. Set max_time_per_location to at most "
+            f"{max_request_seconds / rounds:.0f}, raise max_cpus, or queue the locations one by one "
+            "(POST /api/assignments/auto-generate/{location_id}/jobs)."
+        )
+    if pending:
+        logger.info(f"Batch solving {len(pending)} of {len(locations)} locations in {processes} processes "
+                    f"(CPU cap {max_cpus})")
+        # 'spawn' keeps the API process's threads and DB connections out of the workers
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                pool.submit(solve_location, _to_worker_inputs(all_inputs[loc_id]), capped_params[loc_id],
+                            previous_week[loc_id] if warm_start else []): loc_id
+                for loc_id in pending
+            }
+            for future in as_completed(futures):
+                loc_id = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.exception(f"Batch solve failed for location {loc_id}")
+                    reports[loc_id] = {"status": "ERROR", "error": str(e)}
+                    continue
+                if result.pop("cacheable"):
+                    result_cache.put(pending[loc_id], result)
+                result["cached"] = False
+                reports[loc_id] = result
+
+    # --- 5. Aggregate ---
+    location_reports = []
+    for loc in locations:
+        report = reports[loc.id]
+        location_reports.append({"location_id": loc.id, "location_name": loc.name, **report})
+
+    summary: Dict[str, int] = {}
+    for report in location_reports:
+        summary[report["status"]] = summary.get(report["status"], 0) + 1
+
+    return {
+        "start_date": start_date.isoformat(),
+        "client_id": client_id,
+        "organization_id": organization_id,
+        "max_cpus": max_cpus,
+        "processes": processes if pending else 0,
+        "load_seconds": round(load_seconds, 4),
+        "total_seconds": round(time.perf_counter() - batch_start, 4),
+        "status_counts": summary,
+        "locations": location_reports
+    }
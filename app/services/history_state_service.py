@@ -0,0 +1,191 @@
+"""
+Incrementally maintained employee history (the employee_week_states table).
+
+The solver needs, per employee, the state at the end of the previous week: the current work streak,
+the last-weekend flags and how many shifts of each kind were worked. Instead of rescanning the previous
+week's assignments on every auto-generate, the assignments sync refreshes the rows of the weeks it
+touches, in the same transaction. A week's streak continues into earlier weeks when all 7 days were
+worked, so it is not capped at 7 days; when a refreshed streak changes, it is carried forward through
+the following fully worked weeks.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import models
+from app.engine.employee_history import EmployeeHistoricalState
+from app.engine.shift_timing import MORNING, EVENING, NIGHT
+from app.services.streak_query import location_shift_kinds
+
+WEEK = timedelta(days=7)
+
+# Columns refreshed from a week's assignments
+SUMMARY_FIELDS = ('days_worked', 'streak', 'worked_fri_night', 'worked_sat_noon', 'worked_sat_night',
+                  'mornings', 'evenings', 'nights')
+
+
+def week_start_of(day: date) -> date:
+    """The Sunday on or before 'day' (schedule weeks start on Sunday)."""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def summarize_week(week_start: date, worked: List[Tuple[date, int]], kinds: Dict[int, Optional[str]],
+                   previous_streak: int = 0) -> dict:
+    """
+    Summary of one employee's week from its (date, shift_id) assignments.
+    :param kinds: Kind of each shift of the location, by shift id
+    :param previous_streak: Streak at the end of the previous week, continued when every day was worked
+    """
+    summary = {field: 0 for field in SUMMARY_FIELDS}
+    summary.update(worked_fri_night=False, worked_sat_noon=False, worked_sat_night=False)
+
+    dates = set()
+    for day, shift_id in worked:
+        dates.add(day)
+        kind = kinds.get(shift_id)
+        if kind == MORNING:
+            summary['mornings'] += 1
+        elif kind == EVENING:
+            summary['evenings'] += 1
+        elif kind == NIGHT:
+            summary['nights'] += 1
+
+        if day.weekday() == 4 and kind == NIGHT:  # Friday
+            summary['worked_fri_night'] = True
+        elif day.weekday() == 5:  # Saturday
+            if kind == EVENING:
+                summary['worked_sat_noon'] = True
+            elif kind == NIGHT:
+                summary['worked_sat_night'] = True
+
+    trailing = 0
+    while trailing < 7 and week_start + timedelta(days=6 - trailing) in dates:
+        trailing += 1
+    summary['days_worked'] = len(dates)
+    summary['streak'] = 7 + previous_streak if trailing == 7 else trailing
+    return summary
+
+
+def refresh_week_states(db: Session, location_id: int, employee_ids: Iterable[int], days: Iterable[date]) -> int:
+    """
+    Recomputes the week states of the given employees for every week containing one of 'days', then
+    carries changed streaks forward. Call after the assignment changes are flushed; the caller commits.
+    Returns the number of rows written or deleted.
+    """
+    employee_ids = sorted(set(employee_ids))
+    weeks = sorted({week_start_of(d) for d in days})
+    if not employee_ids or not weeks:
+        return 0
+
+    # Plain (employee, date, shift) tuples; the shift kinds come from the location's shift definitions
+    assignments = db.execute(select(
+        models.Assignment.employee_id, models.Assignment.date, models.Assignment.shift_id
+    ).where(
+        models.Assignment.location_id == location_id,
+        models.Assignment.employee_id.in_(employee_ids),
+        models.Assignment.date >= weeks[0],
+        models.Assignment.date < weeks[-1] + WEEK
+    ))
+    worked: Dict[Tuple[int, date], list] = {}
+    for emp_id, day, shift_id in assignments:
+        worked.setdefault((emp_id, week_start_of(day)), []).append((day, shift_id))
+
+    # Rows of the refreshed weeks, of the weeks before them (for the streaks) and after them (carried streaks)
+    lookup_weeks = set(weeks) | {w - WEEK for w in weeks} | {w + WEEK for w in weeks}
+    states: Dict[Tuple[int, date], Optional[models.EmployeeWeekState]] = {
+        (emp_id, w): None for emp_id in employee_ids for w in lookup_weeks
+    }
+    for row in db.execute(select(models.EmployeeWeekState).where(
+        models.EmployeeWeekState.location_id == location_id,
+        models.EmployeeWeekState.employee_id.in_(employee_ids),
+        models.EmployeeWeekState.week_start.in_(lookup_weeks)
+    )).scalars():
+        states[(row.employee_id, row.week_start)] = row
+
+    def get_state(emp_id: int, week: date) -> Optional[models.EmployeeWeekState]:
+        if (emp_id, week) not in states:
+            states[(emp_id, week)] = db.execute(select(models.EmployeeWeekState).where(
+                models.EmployeeWeekState.location_id == location_id,
+                models.EmployeeWeekState.employee_id == emp_id,
+                models.EmployeeWeekState.week_start == week
+            )).scalar_one_or_none()
+        return states[(emp_id, week)]
+
+    kinds = location_shift_kinds(db, location_id)
+    written = 0
+    refreshed = set(weeks)
+    for emp_id in employee_ids:
+        for week in weeks:
+            previous = get_state(emp_id, week - WEEK)
+            summary = summarize_week(week, worked.get((emp_id, week), []), kinds, previous.streak if previous else 0)
+            row = get_state(emp_id, week)
+
+            if summary['days_worked'] == 0:
+                if row is not None:
+                    db.delete(row)
+                    states[(emp_id, week)] = None
+                    written += 1
+            elif row is None:
+                row = models.EmployeeWeekState(location_id=location_id, employee_id=emp_id, week_start=week, **summary)
+                db.add(row)
+                states[(emp_id, week)] = row
+                written += 1
+            elif any(getattr(row, field) != value for field, value in summary.items()):
+                for field, value in summary.items():
+                    setattr(row, field, value)
+                written += 1
+
+            # Carry the streak through the following fully worked weeks that are not refreshed anyway
+            streak = summary['streak']
+            following = week + WEEK
+            while following not in refreshed:
+                row = get_state(emp_id, following)
+                if row is None or row.days_worked < 7 or row.streak == 7 + streak:
+                    break
+                row.streak = streak = 7 + streak
+                written += 1
+                following += WEEK
+    return written
+
+
+def load_week_states(db: Session, location_id: int, start_date: date) -> Optional[Dict[int, EmployeeHistoricalState]]:
+    """
+    History of the week before start_date from employee_week_states, in one indexed lookup.
+    Only employees with a row for that week are returned. A missing row does not prove the employee was off:
+    rows are written per employee by the syncs, so assignments created any other way have none.
+    Returns None when start_date is not a Sunday (the table is keyed by schedule weeks).
+    """
+    if week_start_of(start_date) != start_date:
+        return None
+
+    rows = db.execute(select(models.EmployeeWeekState).where(
+        models.EmployeeWeekState.location_id == location_id,
+        models.EmployeeWeekState.week_start == start_date - WEEK
+    )).scalars().all()
+    return {row.employee_id: to_historical_state(row) for row in rows}
+
+
+def to_historical_state(row: models.EmployeeWeekState) -> EmployeeHistoricalState:
+    return EmployeeHistoricalState(
+        employee_id=row.employee_id,
+        history_streak=row.streak,
+        worked_last_fri_night=row.worked_fri_night,
+        worked_last_sat_noon=row.worked_sat_noon,
+        worked_last_sat_night=row.worked_sat_night
+    )
+
+
+def rebuild_week_states(db: Session, location_id: int) -> int:
+    """
+    Recomputes every week state of a location from its assignments (backfill or repair).
+    The caller commits. Returns the number of rows written.
+    """
+    db.query(models.EmployeeWeekState).filter(models.EmployeeWeekState.location_id == location_id).delete()
+    rows = db.execute(select(models.Assignment.employee_id, models.Assignment.date).where(
+        models.Assignment.location_id == location_id
+    )).all()
+    if not rows:
+        return 0
+    return refresh_week_states(db, location_id, {emp_id for emp_id, _ in rows}, {d for _, d in rows})
@@ -0,0 +1,197 @@
+"""
+Drag-and-drop scoring sessions: the DeltaScorer of each week being edited, kept between requests.
+
+Sessions live in the memory of the API process that opened them. The API must therefore run as a
+single process (as `python main.py` does), or behind a load balancer that routes every request of a
+location to the same process (sticky routing on the location_id path parameter); in that case set
+SCORING_STICKY_ROUTING=1. check_single_api_process refuses to start a multi-worker API otherwise.
+A moves request that reaches a process without the session (expired, closed, evicted or never opened
+there) fails with ScoringSessionNotFound, and the client reopens the session from its current grid.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core import schemas
+from app.engine.delta_scoring import DeltaScorer
+from app.engine.evaluator import ScheduleEvaluator
+from app.services.weekly_schedule_service import load_published_week, load_schedule_inputs
+
+# Editing sessions are small; drop the ones idle for more than an hour
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_MAX_IDLE_SECONDS = 3600.0
+
+
+class ScoringSessionNotFound(LookupError):
+    """The week has no scoring session in this process; the client must reopen it."""
+
+
+def check_single_api_process() -> None:
+    """
+    Raises RuntimeError when the API is configured with several worker processes (WEB_CONCURRENCY,
+    read by uvicorn and gunicorn) without sticky routing: scoring sessions would be split between them.
+    """
+    workers = int(os.getenv("WEB_CONCURRENCY") or 1)
+    if workers > 1 and os.getenv("SCORING_STICKY_ROUTING") != "1":
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={workers}, but scoring sessions are kept in the memory of each API process. "
+            "Run a single API process, or route each location to one process and set SCORING_STICKY_ROUTING=1."
+        )
+
+
+@dataclass
+class ScoringSession:
+    """Server-side score of one (location, week) being edited in the schedule grid."""
+    location_id: int
+    start_date: date
+    scorer: DeltaScorer
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def day_index(self, day: date) -> int:
+        index = (day - self.start_date).days
+        if not 0 <= index < self.scorer.num_days:
+            raise ValueError(f"{day} is outside the week starting {self.start_date}")
+        return index
+
+    def summary(self) -> dict:
+        scorer = self.scorer
+        return {
+            "location_id": self.location_id,
+            "start_date": self.start_date.isoformat(),
+            "feasible": scorer.total_violations == 0,
+            "total_penalty": scorer.total_penalty,
+            "penalties": dict(scorer.penalties),
+            "violations": dict(scorer.violations),
+            "assignments_count": sum(scorer.count),
+        }
+
+
+class ScoringSessionStore:
+    """
+    Thread-safe in-process registry of scoring sessions, one per (location_id, start_date).
+    Opening a session for a week that already has one replaces it. Idle sessions expire.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS):
+        self.max_sessions = max_sessions
+        self.max_idle_seconds = max_idle_seconds
+        self._sessions: "OrderedDict[Tuple[int, date], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, location_id: int, start_date: date) -> Optional[ScoringSession]:
+        key = (location_id, start_date)
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            touched_at, session = entry
+            if time.monotonic() - touched_at > self.max_idle_seconds:
+                del self._sessions[key]
+                return None
+            self._sessions[key] = (time.monotonic(), session)
+            self._sessions.move_to_end(key)
+            return session
+
+    def put(self, session: ScoringSession) -> None:
+        key = (session.location_id, session.start_date)
+        with self._lock:
+            self._sessions[key] = (time.monotonic(), session)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def close(self, location_id: int, start_date: date) -> bool:
+        with self._lock:
+            return self._sessions.pop((location_id, start_date), None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+scoring_sessions = ScoringSessionStore()
+
+
+def open_scoring_session(db: Session, location_id: int, start_date: date,
+                         assignments: Optional[List[schemas.AssignmentCreate]] = None) -> dict:
+    """
+    Starts (or restarts) the scoring session of a week from the given assignments, or from the
+    published week when none are given. Returns the full score of the starting point.
+    """
+    inputs = load_schedule_inputs(db, location_id, start_date)
+    evaluator = ScheduleEvaluator(
+        employees=inputs.employees,
+        shifts=inputs.shifts,
+        demands=inputs.demands,
+        weights=inputs.weights,
+        weekly_constraints=inputs.weekly_constraints,
+        employee_settings=inputs.employee_settings,
+        employee_states=inputs.employee_states
+    )
+    if assignments is None:
+        keys = load_published_week(db, location_id, start_date)
+    else:
+        keys = [(a.employee_id, (a.date - start_date).days, a.shift_id) for a in assignments]
+
+    session = ScoringSession(location_id, start_date, DeltaScorer(evaluator, keys))
+    scoring_sessions.put(session)
+    return session.summary()
+
+
+def apply_scoring_moves(location_id: int, start_date: date, moves: List[schemas.ScoringMove]) -> dict:
+    """
+    Applies moves to the week's open session, in order, and returns their combined delta
+    with the session's new score under "score".
+    Raises ScoringSessionNotFound when no session is open in this process and ValueError for a move
+    outside the week or location.
+    """
+    session = scoring_sessions.get(location_id, start_date)
+    if session is None:
+        raise ScoringSessionNotFound(
+            f"No scoring session is open for the week of {start_date} (it was closed, expired or opened on "
+            f"another server). Reopen it with POST /api/assignments/scoring/{location_id} and the current "
+            "assignments of the grid, then resend the edits."
+        )
+
+    with session.lock:
+        scorer = session.scorer
+        # Validate the whole batch first, so a bad move never leaves it half applied
+        days = []
+        for move in moves:
+            days.append(session.day_index(move.date))
+            if move.action == "move" and move.from_employee_id is None:
+                raise ValueError("A 'move' needs from_employee_id")
+            for emp_id in (move.employee_id, move.from_employee_id):
+                if emp_id is not None and emp_id not in scorer.evaluator.emp_pos:
+                    raise ValueError(f"Employee {emp_id} is not an active employee of this location")
+            if move.shift_id not in scorer.evaluator.shift_pos:
+                raise ValueError(f"Shift {move.shift_id} is not defined for this location")
+
+        delta = None
+        for move, day in zip(moves, days):
+            if move.action == "add":
+                step = scorer.add(move.employee_id, day, move.shift_id)
+            elif move.action == "remove":
+                step = scorer.remove(move.employee_id, day, move.shift_id)
+            else:
+                step = scorer.move(move.from_employee_id, move.employee_id, day, move.shift_id)
+            delta = step if delta is None else delta.merge(step)
+
+        result = delta.to_dict() if delta is not None else {"applied": False, "penalty_delta": 0}
+        # Current penalty of the employees the moves touched, for the grid's per-row badge
+        touched = {m.employee_id for m in moves} | {m.from_employee_id for m in moves if m.from_employee_id}
+        result["employee_penalties"] = {
+            emp_id: scorer.employee_penalties[scorer.evaluator.emp_pos[emp_id]]
+            for emp_id in touched if emp_id in scorer.evaluator.emp_pos
+        }
+        result["score"] = session.summary()
+        return result
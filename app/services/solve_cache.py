@@ -0,0 +1,89 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Iterable, Optional, Tuple
+
+from app.engine.solver_profiles import SolverParams
+
+# Keep a few hundred recent weeks per API process; entries also expire after an hour
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_AGE_SECONDS = 3600.0
+
+
+def _columns(row, exclude=()) -> dict:
+    """Column values of an ORM row (persisted or transient), keyed by column name."""
+    return {c.key: getattr(row, c.key) for c in row.__table__.columns if c.key not in exclude}
+
+
+def compute_fingerprint(inputs, solver_params: SolverParams, hints: Iterable[Tuple[int, int, int]] = ()) -> str:
+    """
+    Stable SHA-256 of everything that determines a solve: location, shifts, demands, weights,
+    employee settings, parsed weekly constraints, historical states, solver parameters and warm-start hints.
+    Any change to an underlying row changes the hash, so stale results are never served.
+    Hints do not change the model, but a time-limited search ends elsewhere when it starts elsewhere.
+    """
+    payload = {
+        "location_id": inputs.location.id,
+        "start_date": inputs.start_date,
+        "employees": sorted(e.id for e in inputs.employees),
+        "shifts": [_columns(s) for s in inputs.shifts],
+        "demands": sorted((_columns(d, exclude=("id",)) for d in inputs.demands),
+                          key=lambda d: json.dumps(d, sort_keys=True, default=str)),
+        "weights": _columns(inputs.weights, exclude=("id",)),
+        "settings": {emp_id: _columns(s, exclude=("id",)) for emp_id, s in sorted(inputs.employee_settings.items())},
+        "weekly_constraints": sorted(
+            (c["employee_id"], c["day_idx"], c["shift_id"], str(c["type"])) for c in inputs.weekly_constraints
+        ),
+        "states": {emp_id: asdict(state) for emp_id, state in sorted(inputs.employee_states.items())},
+        "solver_params": asdict(solver_params),
+        "hints": sorted(set(hints)),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class SolveResultCache:
+    """
+    Thread-safe in-process LRU of auto-generate results keyed by instance fingerprint.
+    Entries are evicted when the cache is full (least recently used first) or older than max_age_seconds.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at > self.max_age_seconds:
+                del self._entries[fingerprint]
+                return None
+            self._entries.move_to_end(fingerprint)
+            # Callers may decorate the result; never hand out the cached object itself
+            return copy.deepcopy(result)
+
+    def put(self, fingerprint: str, result: dict) -> None:
+        with self._lock:
+            self._entries[fingerprint] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+result_cache = SolveResultCache()
@@ -0,0 +1,176 @@
+"""
+Trailing work streaks and last-weekend flags computed in the database.
+
+The streak of an employee is the number of consecutive worked days ending the day before start_date.
+It is found with the gaps-and-islands technique: the distinct worked days are numbered newest first
+(row_number), and a day belongs to the trailing island exactly when its distance to the last history
+day equals its rank. Only one integer and three flags per employee leave the database, whatever
+the lookback, so streaks are not capped at 7 days.
+
+compute_history_rows is the same computation over (employee_id, date, shift_id) tuples in Python; it
+serves the callers that already hold the assignments (batch generation) and the tests, which pass
+load_history_rows in place of query_history_rows.
+"""
+from datetime import date, timedelta
+from typing import Callable, Collection, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Date, Integer, case, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.core import models
+from app.engine.employee_history import EmployeeHistoricalState
+from app.engine.shift_timing import EVENING, NIGHT, shift_kind
+
+DEFAULT_LOOKBACK_DAYS = 35
+
+
+class HistoryRow(NamedTuple):
+    employee_id: int
+    streak: int
+    worked_fri_night: bool
+    worked_sat_noon: bool
+    worked_sat_night: bool
+
+
+# (db, location_id, start_date, lookback_days, employee_ids=None) -> rows ordered by employee_id
+HistoryRowsQuery = Callable[..., List[HistoryRow]]
+
+
+def last_weekend(start_date: date) -> Tuple[date, date]:
+    """The Friday and Saturday of the 7 days before start_date."""
+    history_start = start_date - timedelta(days=7)
+    friday = history_start + timedelta(days=(4 - history_start.weekday()) % 7)
+    saturday = history_start + timedelta(days=(5 - history_start.weekday()) % 7)
+    return friday, saturday
+
+
+def location_shift_kinds(db: Session, location_id: int) -> Dict[int, Optional[str]]:
+    shifts = db.execute(select(models.ShiftDefinition).where(
+        models.ShiftDefinition.location_id == location_id
+    )).scalars().all()
+    return {s.id: shift_kind(s) for s in shifts}
+
+
+def _days_between(dialect: str, earlier, later):
+    """SQL expression for the number of days from 'earlier' to 'later' (both dates)."""
+    if dialect == 'sqlite':
+        # SQLite stores dates as ISO strings
+        return cast(func.julianday(later) - func.julianday(earlier), Integer)
+    return later - earlier
+
+
+def query_history_rows(db: Session, location_id: int, start_date: date, lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+                       employee_ids: Optional[Collection[int]] = None) -> List[HistoryRow]:
+    """
+    Streak and last-weekend flags of every active employee of the location (or of 'employee_ids' only) with
+    at least one assignment in the 'lookback_days' before start_date, computed with window functions in one query.
+    """
+    kinds = location_shift_kinds(db, location_id)
+    night_ids = [shift_id for shift_id, kind in kinds.items() if kind == NIGHT]
+    evening_ids = [shift_id for shift_id, kind in kinds.items() if kind == EVENING]
+    friday, saturday = last_weekend(start_date)
+    history_end = start_date - timedelta(days=1)
+    A = models.Assignment
+
+    def flag(day: date, shift_ids: List[int]):
+        return func.max(case(((A.date == day) & A.shift_id.in_(shift_ids), 1), else_=0))
+
+    # One row per worked day, with that day's weekend flags
+    worked_days = select(
+        A.employee_id,
+        A.date,
+        flag(friday, night_ids).label('fri_night'),
+        flag(saturday, evening_ids).label('sat_noon'),
+        flag(saturday, night_ids).label('sat_night'),
+    ).join(models.Employee, models.Employee.id == A.employee_id).where(
+        A.location_id == location_id,
+        models.Employee.is_active.is_(True),
+        A.date >= start_date - timedelta(days=lookback_days),
+        A.date <= history_end
+    )
+    if employee_ids is not None:
+        worked_days = worked_days.where(A.employee_id.in_(employee_ids))
+    days = worked_days.group_by(A.employee_id, A.date).subquery()
+
+    ranked = select(
+        days.c.employee_id,
+        days.c.fri_night,
+        days.c.sat_noon,
+        days.c.sat_night,
+        _days_between(db.get_bind().dialect.name, days.c.date, literal(history_end, Date)).label('gap'),
+        func.row_number().over(partition_by=days.c.employee_id, order_by=days.c.date.desc()).label('recency'),
+    ).subquery()
+
+    stmt = select(
+        ranked.c.employee_id,
+        func.sum(case((ranked.c.gap == ranked.c.recency - 1, 1), else_=0)),
+        func.max(ranked.c.fri_night),
+        func.max(ranked.c.sat_noon),
+        func.max(ranked.c.sat_night),
+    ).group_by(ranked.c.employee_id).order_by(ranked.c.employee_id)
+
+    return [HistoryRow(emp_id, int(streak), bool(fri_night), bool(sat_noon), bool(sat_night))
+            for emp_id, streak, fri_night, sat_noon, sat_night in db.execute(stmt)]
+
+
+def compute_history_rows(worked: Iterable[Tuple[int, date, int]], start_date: date,
+                         lookback_days: int, kinds: Dict[int, Optional[str]]) -> List[HistoryRow]:
+    """query_history_rows over (employee_id, date, shift_id) tuples already filtered to active employees."""
+    friday, saturday = last_weekend(start_date)
+    history_start = start_date - timedelta(days=lookback_days)
+    history_end = start_date - timedelta(days=1)
+
+    dates: Dict[int, set] = {}
+    flags: Dict[int, List[bool]] = {}
+    for emp_id, day, shift_id in worked:
+        if not history_start <= day <= history_end:
+            continue
+        dates.setdefault(emp_id, set()).add(day)
+        emp_flags = flags.setdefault(emp_id, [False, False, False])
+        kind = kinds.get(shift_id)
+        if day == friday and kind == NIGHT:
+            emp_flags[0] = True
+        elif day == saturday:
+            if kind == EVENING:
+                emp_flags[1] = True
+            elif kind == NIGHT:
+                emp_flags[2] = True
+
+    rows = []
+    for emp_id in sorted(dates):
+        streak = 0
+        while history_end - timedelta(days=streak) in dates[emp_id]:
+            streak += 1
+        rows.append(HistoryRow(emp_id, streak, *flags[emp_id]))
+    return rows
+
+
+def load_history_rows(db: Session, location_id: int, start_date: date, lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+                      employee_ids: Optional[Collection[int]] = None) -> List[HistoryRow]:
+    """In-memory equivalent of query_history_rows: loads the worked (employee, date, shift) tuples."""
+    A = models.Assignment
+    stmt = select(A.employee_id, A.date, A.shift_id).join(
+        models.Employee, models.Employee.id == A.employee_id
+    ).where(
+        A.location_id == location_id,
+        models.Employee.is_active.is_(True),
+        A.date >= start_date - timedelta(days=lookback_days),
+        A.date < start_date
+    )
+    if employee_ids is not None:
+        stmt = stmt.where(A.employee_id.in_(employee_ids))
+    worked = db.execute(stmt).all()
+    return compute_history_rows(worked, start_date, lookback_days, location_shift_kinds(db, location_id))
+
+
+def to_historical_states(rows: Iterable[HistoryRow]) -> Dict[int, EmployeeHistoricalState]:
+    return {
+        row.employee_id: EmployeeHistoricalState(
+            employee_id=row.employee_id,
+            history_streak=row.streak,
+            worked_last_fri_night=row.worked_fri_night,
+            worked_last_sat_noon=row.worked_sat_noon,
+            worked_last_sat_night=row.worked_sat_night
+        )
+        for row in rows
+    }
@@ -1,13 +1,25 @@
-from typing import Dict, Set, List
+from dataclasses import dataclass
+from typing import Dict, Set, List, Tuple
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from sqlalchemy import select
 from datetime import date, timedelta
 
-from app.core import models
+from app.core import models, schemas
+from app.core.enums import ScheduleMode
 from app.engine.solver import ShiftOptimizer
+from app.engine.greedy import GreedyScheduler, GreedyResult
+from app.engine.evaluator import ScheduleEvaluator
+from app.engine.repair import RepairRequest
+from app.engine.solver_profiles import SolverParams, BUILTIN_PROFILES, DEFAULT_PROFILE
+from app.engine.shift_timing import shift_kind
 from ortools.sat.python import cp_model
 from app.engine.employee_history import EmployeeHistoricalState # Updated file name
+from app.services.solve_cache import compute_fingerprint, result_cache
+from app.services.history_state_service import load_week_states
+from app.services.streak_query import (
+    DEFAULT_LOOKBACK_DAYS, HistoryRowsQuery, compute_history_rows, query_history_rows, to_historical_states
+)
 
 import logging
 # Initialize logger for this module
@@ -15,75 +27,85 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO) # Ensure basic config is set if not already configured in main.py
 
 
-def calculate_historical_states(db: Session, location_id: int, start_date: date) -> Dict[int, EmployeeHistoricalState]:
+def calculate_historical_states(db: Session, location_id: int, start_date: date,
+                                history_rows: HistoryRowsQuery = query_history_rows,
+                                lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> Dict[int, EmployeeHistoricalState]:
     """
     Calculates the historical state (streak, weekend shifts) for all employees
-    in a given location for the 7 days preceding the start_date.
+    in a given location from the days preceding the start_date.
+    Reads the maintained employee_week_states rows of that week; the active employees without a row
+    (off last week, or never synced) get their streaks computed over 'lookback_days' with 'history_rows'
+    (one SQL query by default, limited to them).
     """
-    history_start = start_date - timedelta(days=7)
-    history_end = start_date - timedelta(days=1)
+    stored = load_week_states(db, location_id, start_date)
+    if stored is None:
+        return to_historical_states(history_rows(db, location_id, start_date, lookback_days))
 
-    stmt = select(models.Assignment).options(
-        joinedload(models.Assignment.shift_def)
-    ).where(
-        models.Assignment.location_id == location_id,
-        models.Assignment.date >= history_start,
-        models.Assignment.date <= history_end
+    missing = db.execute(select(models.Employee.id).where(
+        models.Employee.location_id == location_id,
+        models.Employee.is_active.is_(True),
+        models.Employee.id.notin_(list(stored))
+    )).scalars().all()
+    if missing:
+        stored.update(to_historical_states(history_rows(db, location_id, start_date, lookback_days,
+                                                        employee_ids=missing)))
+    return stored
+
+
+def build_historical_states(assignments: List[models.Assignment], start_date: date) -> Dict[int, EmployeeHistoricalState]:
+    """
+    Builds the historical states from the previous week's assignments (with their shift_def loaded).
+    """
+    # Kind (morning / evening / night) of each shift definition, resolved once from its times
+    kinds: Dict[int, str] = {}
+    for a in assignments:
+        if a.shift_id not in kinds:
+            kinds[a.shift_id] = shift_kind(a.shift_def)
+    rows = compute_history_rows(((a.employee_id, a.date, a.shift_id) for a in assignments), start_date, 7, kinds)
+    return to_historical_states(rows)
+
+
+def resolve_solver_params(db: Session, location_id: int, profile_name: str = None) -> SolverParams:
+    """
+    Resolves a named solver profile for a location.
+    A stored SolverProfile row takes precedence over the built-in profile with the same name.
+    """
+    profile_name = profile_name or DEFAULT_PROFILE
+
+    stmt = select(models.SolverProfile).where(
+        models.SolverProfile.location_id == location_id,
+        models.SolverProfile.name == profile_name
     )
-    assignments = db.execute(stmt).scalars().all()
-
-    emp_assignments: Dict[int, List[models.Assignment]] = {}
-    for assignment in assignments:
-        emp_assignments.setdefault(assignment.employee_id, []).append(assignment)
-
-    states: Dict[int, EmployeeHistoricalState] = {}
-
-    for emp_id, shifts in emp_assignments.items():
-        worked_last_fri_night = False
-        worked_last_sat_noon = False
-        worked_last_sat_night = False
-        worked_dates: Set[date] = set()
-
-        for shift in shifts:
-            worked_dates.add(shift.date)
-            shift_name = shift.shift_def.name.strip()
-
-            if shift.date.weekday() == 4: # Friday
-                if "לילה" in shift_name:
-                    worked_last_fri_night = True
-            elif shift.date.weekday() == 5: # Saturday
-                if "ערב" in shift_name or "צהריים" in shift_name:
-                    worked_last_sat_noon = True
-                elif "לילה" in shift_name:
-                    worked_last_sat_night = True
-
-        streak = 0
-        current_check_date = history_end
-        while current_check_date >= history_start:
-            if current_check_date in worked_dates:
-                streak += 1
-                current_check_date -= timedelta(days=1)
-            else:
-                break
-
-        states[emp_id] = EmployeeHistoricalState(
-            employee_id=emp_id,
-            history_streak=streak,
-            worked_last_fri_night=worked_last_fri_night,
-            worked_last_sat_noon=worked_last_sat_noon,
-            worked_last_sat_night=worked_last_sat_night
-        )
+    profile = db.execute(stmt).scalar_one_or_none()
+    if profile:
+        return SolverParams.from_profile(profile)
 
-    return states
+    if profile_name in BUILTIN_PROFILES:
+        return BUILTIN_PROFILES[profile_name]
 
-def generate_weekly_schedule(db: Session, location_id: int, start_date: date):
+    raise ValueError(f"Solver profile '{profile_name}' not found for location {location_id}")
+
+
+@dataclass
+class ScheduleInputs:
     """
-    Orchestrates the schedule process:
-    1. Fetch data from DB
-    2. Run Solver
-    3. Save results to DB
+    Everything the engine needs to schedule one location for one week, loaded from the DB.
+    """
+    location: models.Location
+    start_date: date
+    employees: List[models.Employee]
+    shifts: List[models.ShiftDefinition]
+    demands: List[models.ShiftDemand]
+    weights: models.LocationWeights
+    employee_settings: Dict[int, models.EmployeeSettings]
+    weekly_constraints: List[dict]
+    employee_states: Dict[int, EmployeeHistoricalState]
+
+
+def load_schedule_inputs(db: Session, location_id: int, start_date: date) -> ScheduleInputs:
+    """
+    Fetches and prepares the solver inputs for a location's week starting at start_date.
     """
-    # --- 1. Fetch Data ---
     stmt_loc = select(models.Location).where(models.Location.id == location_id)
     location = db.execute(stmt_loc).scalar_one_or_none()
     if not location:
@@ -136,8 +158,29 @@ def generate_weekly_schedule(db: Session, location_id: int, start_date: date):
         models.WeeklyConstraint.date <= end_date
     )
     db_constraints = db.execute(stmt_constraints).scalars().all()
+    parsed_constraints = parse_weekly_constraints(db_constraints, start_date)
 
-    # Convert dates to day indexes (0-6) for OR-Tools
+    # --- Fetch and Build Employee States (Historical Data) ---
+    # Call the helper function to calculate states in-memory
+    calculated_states = calculate_historical_states(db, location_id, start_date)
+
+    return ScheduleInputs(
+        location=location,
+        start_date=start_date,
+        employees=employees,
+        shifts=shifts,
+        demands=demands,
+        weights=weights,
+        employee_settings=emp_settings_dict,
+        weekly_constraints=parsed_constraints,
+        employee_states=complete_employee_states(employees, calculated_states)
+    )
+
+
+def parse_weekly_constraints(db_constraints: List[models.WeeklyConstraint], start_date: date) -> List[dict]:
+    """
+    Converts WeeklyConstraint rows into the engine's format, with dates as day indexes (0-6) for OR-Tools.
+    """
     parsed_constraints = []
     for c in db_constraints:
         day_index = (c.date - start_date).days
@@ -151,11 +194,14 @@ def generate_weekly_schedule(db: Session, location_id: int, start_date: date):
                 # Ensure we capture the exact enum value (e.g., 'must_work', 'cannot_work')
                 "type": c.constraint_type
             })
+    return parsed_constraints
 
-    # --- Fetch and Build Employee States (Historical Data) ---
-    # Call the helper function to calculate states in-memory
-    calculated_states = calculate_historical_states(db, location_id, start_date)
 
+def complete_employee_states(employees: List[models.Employee],
+                             calculated_states: Dict[int, EmployeeHistoricalState]) -> Dict[int, EmployeeHistoricalState]:
+    """
+    Gives every employee a historical state: the calculated one if they worked last week, otherwise an empty one.
+    """
     employee_states_dict = {}
     for emp in employees:
         if emp.id in calculated_states:
@@ -164,22 +210,130 @@ def generate_weekly_schedule(db: Session, location_id: int, start_date: date):
         else:
             # Employee did not work last week, create default empty state
             employee_states_dict[emp.id] = EmployeeHistoricalState(employee_id=emp.id)
+    return employee_states_dict
+
+
+def load_previous_week_hints(db: Session, location_id: int, start_date: date) -> List[Tuple[int, int, int]]:
+    """
+    Loads last week's assignments and shifts them onto the new week's day indices.
+    Returns (employee_id, day_index, shift_id) tuples for use as solver hints.
+    """
+    prev_start = start_date - timedelta(days=7)
+    stmt = select(
+        models.Assignment.employee_id, models.Assignment.date, models.Assignment.shift_id
+    ).where(
+        models.Assignment.location_id == location_id,
+        models.Assignment.date >= prev_start,
+        models.Assignment.date < start_date
+    )
+    return [(emp_id, (d - prev_start).days, shift_id) for emp_id, d, shift_id in db.execute(stmt).all()]
+
+
+def draft_to_hints(draft: List[schemas.AssignmentCreate], start_date: date) -> List[Tuple[int, int, int]]:
+    """
+    Converts a client-side draft into (employee_id, day_index, shift_id) hints.
+    Drafts for another week are projected onto the target week by weekday offset.
+    """
+    return [(a.employee_id, (a.date - start_date).days % 7, a.shift_id) for a in draft]
+
+
+def resolve_hints(db: Session, location_id: int, start_date: date, draft: List[schemas.AssignmentCreate] = None,
+                  warm_start: bool = True) -> List[Tuple[int, int, int]]:
+    """
+    Picks the warm-start schedule: the client's draft if given, otherwise last week (unless disabled).
+    """
+    if draft:
+        return draft_to_hints(draft, start_date)
+    if warm_start:
+        return load_previous_week_hints(db, location_id, start_date)
+    return []
+
+
+def run_greedy(inputs: ScheduleInputs) -> GreedyResult:
+    """
+    Builds a draft with the greedy heuristic (milliseconds, no CP-SAT).
+    """
+    return GreedyScheduler(
+        employees=inputs.employees,
+        shifts=inputs.shifts,
+        demands=inputs.demands,
+        weekly_constraints=inputs.weekly_constraints,
+        employee_settings=inputs.employee_settings,
+        employee_states=inputs.employee_states
+    ).solve()
 
-    # --- 2. Run Engine ---
-    print(f"Starting optimization for {location.name} with {len(employees)} employees...")
 
+def build_greedy_result(greedy: GreedyResult, location_id: int, start_date: date) -> dict:
+    """
+    Converts a greedy draft into the same JSON shape as a solver result.
+    Slots the heuristic could not staff are listed under 'unfilled'.
+    """
+    unfilled = [
+        {**slot, "date": (start_date + timedelta(days=slot["day_index"])).isoformat()} for slot in greedy.unfilled
+    ]
+    return {
+        "status": "HEURISTIC",
+        "objective": None,
+        "assignments_count": len(greedy.assignments),
+        "unfilled": unfilled,
+        "draft_assignments": keys_to_draft(sorted(greedy.assignments, key=lambda k: (k[1], k[2], k[0])),
+                                           location_id, start_date)
+    }
+
+
+def build_optimizer(inputs: ScheduleInputs, solver_params: SolverParams, hints,
+                    repair: RepairRequest = None) -> ShiftOptimizer:
+    """
+    Builds a ready-to-solve optimizer from loaded inputs (in repair mode when 'repair' is given).
+    """
     optimizer = ShiftOptimizer(
-        location_id=location_id,
-        employees=employees,
-        shifts=shifts,
-        demands=demands,
-        weights=weights,
-        weekly_constraints=parsed_constraints
+        location_id=inputs.location.id,
+        employees=inputs.employees,
+        shifts=inputs.shifts,
+        demands=inputs.demands,
+        weights=inputs.weights,
+        weekly_constraints=inputs.weekly_constraints,
+        solver_params=solver_params,
+        employee_settings=inputs.employee_settings,
+        employee_states=inputs.employee_states,
+        repair=repair
     )
+    optimizer.set_hints(hints)
+    return optimizer
+
+
+def prepare_optimizer(db: Session, location_id: int, start_date: date, profile_name: str = None,
+                      draft: List[schemas.AssignmentCreate] = None,
+                      warm_start: bool = True) -> Tuple[ShiftOptimizer, ScheduleInputs]:
+    """
+    Loads the inputs and builds a ready-to-solve optimizer
+    (bounded by the selected solver profile, warm-started from a draft or last week).
+    """
+    inputs = load_schedule_inputs(db, location_id, start_date)
+    solver_params = resolve_solver_params(db, location_id, profile_name)
+    hints = resolve_hints(db, location_id, start_date, draft, warm_start)
+    return build_optimizer(inputs, solver_params, hints), inputs
 
-    status = optimizer.solve(emp_settings_dict, employee_states_dict)
 
-    # --- 3. Handle Results ---
+def keys_to_draft(keys, location_id: int, start_date: date) -> List[dict]:
+    """
+    Converts (employee_id, day_index, shift_id) keys into the draft assignment format sent to the frontend.
+    """
+    return [
+        {
+            "location_id": location_id,
+            "employee_id": emp_id,
+            "shift_id": shift_id,
+            "date": (start_date + timedelta(days=day_index)).isoformat()  # Convert date to YYYY-MM-DD string format
+        }
+        for emp_id, day_index, shift_id in keys
+    ]
+
+
+def build_schedule_result(optimizer: ShiftOptimizer, status, location_id: int, start_date: date) -> dict:
+    """
+    Converts a finished solve into the JSON-ready response returned to the frontend.
+    """
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
         results = optimizer.get_results_as_dicts()
         objective_val = optimizer.solver.ObjectiveValue()
@@ -189,26 +343,169 @@ def generate_weekly_schedule(db: Session, location_id: int, start_date: date):
         # ------------------------------------------------------------------
 
         # Build the draft array to send back to the frontend immediately
-        draft_assignments = []
-        for res in results:
-            assignment_date = start_date + timedelta(days=res["day_index"])
-            draft_assignments.append({
-                "location_id": location_id,
-                "employee_id": res["employee_id"],
-                "shift_id": res["shift_id"],
-                "date": assignment_date.isoformat()  # Convert date to YYYY-MM-DD string format
-            })
+        draft_assignments = keys_to_draft(
+            [(res["employee_id"], res["day_index"], res["shift_id"]) for res in results], location_id, start_date
+        )
 
         return {
             "status": "OPTIMAL" if status == cp_model.OPTIMAL else "FEASIBLE",
             "objective": objective_val,
             "assignments_count": len(results),
+            "hinted_assignments": len(optimizer.hints),
+            "model_stats": optimizer.model_stats,
             "draft_assignments": draft_assignments  # Send the draft array
         }
 
+    result = {
+        "status": "FAILED",
+        "objective": None,
+        "assignments_count": 0,
+        "model_stats": optimizer.model_stats
+    }
+    if status == cp_model.INFEASIBLE:
+        # Tell the scheduler which demands / employee rules clash instead of a bare FAILED
+        conflicts = optimizer.explain_infeasibility()
+        for conflict in conflicts:
+            if "day_index" in conflict:
+                conflict["date"] = (start_date + timedelta(days=conflict["day_index"])).isoformat()
+        result["conflicts"] = conflicts
+        logger.info(f"Schedule is infeasible; conflicting constraints: {conflicts}")
+    return result
+
+
+def generate_weekly_schedule(db: Session, location_id: int, start_date: date, profile_name: str = None,
+                             draft: List[schemas.AssignmentCreate] = None, warm_start: bool = True,
+                             use_cache: bool = True, mode: ScheduleMode = ScheduleMode.OPTIMIZE,
+                             greedy_hint: bool = False):
+    """
+    Orchestrates the schedule process:
+    1. Fetch data from DB (in instant mode, return the greedy draft right away) and pick the warm-start hints
+       (the greedy draft instead of last week when greedy_hint is set and no draft is given)
+    2. Return the cached result if these exact inputs and hints were solved recently
+    3. Otherwise build the optimizer and run the solver
+    4. Return the draft schedule (saving is done by the client through Smart Sync)
+    """
+    # --- 1. Fetch Data ---
+    inputs = load_schedule_inputs(db, location_id, start_date)
+    if mode == ScheduleMode.INSTANT:
+        result = build_greedy_result(run_greedy(inputs), location_id, start_date)
+        result["cached"] = False
+        return result
+    solver_params = resolve_solver_params(db, location_id, profile_name)
+
+    if greedy_hint and not draft:
+        hints = run_greedy(inputs).assignments
     else:
-        return {
-            "status": "FAILED",
-            "objective": None,
-            "assignments_count": 0
-        }
\ No newline at end of file
+        hints = resolve_hints(db, location_id, start_date, draft, warm_start)
+
+    # --- 2. Result cache (keyed by a hash of the inputs and hints, so any changed row or draft is a miss) ---
+    fingerprint = compute_fingerprint(inputs, solver_params, hints)
+    if use_cache:
+        cached = result_cache.get(fingerprint)
+        if cached is not None:
+            logger.info(f"Returning cached schedule for {inputs.location.name} ({fingerprint[:12]})")
+            cached["cached"] = True
+            return cached
+
+    # --- 3. Run Engine ---
+    optimizer = build_optimizer(inputs, solver_params, hints)
+    logger.info(f"Starting optimization for {inputs.location.name} with {len(inputs.employees)} employees "
+                f"({len(optimizer.hints)} hinted assignments, {len(optimizer.pruned)} slots pruned)...")
+    status = optimizer.solve(inputs.employee_settings, inputs.employee_states)
+
+    # --- 4. Handle Results ---
+    result = build_schedule_result(optimizer, status, location_id, start_date)
+    # Interrupted searches (UNKNOWN) are not worth replaying
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE, cp_model.INFEASIBLE):
+        result_cache.put(fingerprint, result)
+    result["cached"] = False
+    return result
+
+
+def load_published_week(db: Session, location_id: int, start_date: date) -> Set[Tuple[int, int, int]]:
+    """
+    Loads the saved assignments of a location's week as (employee_id, day_index, shift_id) keys.
+    """
+    stmt = select(
+        models.Assignment.employee_id, models.Assignment.date, models.Assignment.shift_id
+    ).where(
+        models.Assignment.location_id == location_id,
+        models.Assignment.date >= start_date,
+        models.Assignment.date <= start_date + timedelta(days=6)
+    )
+    return {(emp_id, (d - start_date).days, shift_id) for emp_id, d, shift_id in db.execute(stmt).all()}
+
+
+def repair_weekly_schedule(db: Session, location_id: int, start_date: date, employee_id: int, from_date: date,
+                           to_date: date = None, profile_name: str = None) -> dict:
+    """
+    Re-plans a published week after an employee drops out, changing as few assignments as possible:
+    1. Freeze the days before from_date exactly as published
+    2. Make the employee unavailable from from_date to to_date (default: the end of the week)
+    3. Minimize the changed assignments, then the usual penalties
+    4. Return the full draft plus the added/removed assignments (saving is done through Smart Sync)
+    """
+    from_day = (from_date - start_date).days
+    to_day = (to_date - start_date).days if to_date else 6
+    if not 0 <= from_day <= to_day <= 6:
+        raise ValueError("from_date and to_date must fall inside the week, with from_date <= to_date")
+
+    inputs = load_schedule_inputs(db, location_id, start_date)
+    solver_params = resolve_solver_params(db, location_id, profile_name)
+    published = load_published_week(db, location_id, start_date)
+    if not published:
+        raise ValueError("No published schedule to repair for this week")
+
+    unavailable = frozenset((employee_id, day) for day in range(from_day, to_day + 1))
+    repair = RepairRequest(published=frozenset(published), from_day=from_day, unavailable=unavailable)
+    # The published week without the dropped-out slots is the natural starting point
+    hints = [key for key in published if (key[0], key[1]) not in unavailable]
+
+    optimizer = build_optimizer(inputs, solver_params, hints, repair=repair)
+    logger.info(f"Repairing {inputs.location.name} from day {from_day} without employee {employee_id} "
+                f"({len(published)} published assignments)...")
+    status = optimizer.solve(inputs.employee_settings, inputs.employee_states)
+
+    result = build_schedule_result(optimizer, status, location_id, start_date)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        diff = repair.diff(
+            (res["employee_id"], res["day_index"], res["shift_id"]) for res in optimizer.get_results_as_dicts()
+        )
+        result["changed_assignments"] = len(diff["added"]) + len(diff["removed"])
+        result["added"] = keys_to_draft(diff["added"], location_id, start_date)
+        result["removed"] = keys_to_draft(diff["removed"], location_id, start_date)
+    return result
+
+
+def evaluate_weekly_schedule(db: Session, location_id: int, start_date: date,
+                             assignments: List[schemas.AssignmentCreate]) -> dict:
+    """
+    Scores a (possibly hand-edited) week without solving: hard-constraint violations with their details,
+    plus the penalty breakdown of the objective the solver would report for it.
+    """
+    inputs = load_schedule_inputs(db, location_id, start_date)
+    evaluator = ScheduleEvaluator(
+        employees=inputs.employees,
+        shifts=inputs.shifts,
+        demands=inputs.demands,
+        weights=inputs.weights,
+        weekly_constraints=inputs.weekly_constraints,
+        employee_settings=inputs.employee_settings,
+        employee_states=inputs.employee_states
+    )
+    keys = [(a.employee_id, (a.date - start_date).days, a.shift_id) for a in assignments]
+    x = evaluator.to_array(keys)
+    evaluation = evaluator.evaluate(x)
+
+    conflicts = evaluator.violation_details(x)
+    for conflict in conflicts:
+        if "day_index" in conflict:
+            conflict["date"] = (start_date + timedelta(days=conflict["day_index"])).isoformat()
+
+    result = evaluation.to_dict()
+    result["conflicts"] = conflicts
+    result["employee_penalties"] = {
+        emp.id: int(penalty) for emp, penalty in zip(evaluator.employees, evaluation.employee_penalties) if penalty
+    }
+    result["ignored_assignments"] = len(keys) - int(x.sum())
+    return result
@@ -0,0 +1,254 @@
+"""
+Job queue for background auto-generate runs.
+
+The API enqueues a job and returns its ID immediately; worker processes (app/tasks/worker.py)
+claim jobs, run the CP-SAT solve, and write progress and the final draft back to the queue.
+
+PostgresJobQueue is the production implementation. Claiming uses SELECT ... FOR UPDATE SKIP LOCKED,
+so any number of workers can poll the same table without claiming the same job twice.
+A running job holds a lease: its worker renews heartbeat_at while it solves. When a worker dies
+mid-solve, the lease expires after LEASE_SECONDS and the next claim picks the job up again (or
+cancels it, when a cancellation was requested in the meantime). Every claim counts as an attempt; a job
+abandoned after MAX_ATTEMPTS claims (e.g. one that crashes its worker every time) is marked FAILED.
+InMemoryJobQueue is an in-process stand-in with the same interface, used in tests.
+"""
+import itertools
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import models, schemas
+from app.core.database import SessionLocal
+from app.core.enums import JobStatus
+
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+# A running job whose worker has not renewed its heartbeat for this long is considered abandoned
+LEASE_SECONDS = 120
+
+# Claims after which an abandoned job is failed instead of handed to yet another worker
+MAX_ATTEMPTS = 3
+
+
+def abandoned_error(attempts: int) -> str:
+    return f"Abandoned by its worker on each of {attempts} attempts"
+
+
+class PostgresJobQueue:
+    """Job queue backed by the solver_jobs table."""
+
+    def __init__(self, session_factory: Callable[[], Session], lease_seconds: float = LEASE_SECONDS,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def enqueue(self, location_id: int, start_date: date, profile_name: str = None,
+                warm_start: bool = True, requested_by_id: int = None) -> schemas.SolverJobResponse:
+        with self.session_factory() as db:
+            job = models.SolverJob(
+                location_id=location_id,
+                start_date=start_date,
+                profile_name=profile_name,
+                warm_start=warm_start,
+                requested_by_id=requested_by_id,
+                status=JobStatus.QUEUED,
+                cancel_requested=False,
+                attempts=0,
+                solutions_found=0
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return schemas.SolverJobResponse.model_validate(job)
+
+    def get(self, job_id: int) -> Optional[schemas.SolverJobResponse]:
+        with self.session_factory() as db:
+            job = db.get(models.SolverJob, job_id)
+            return schemas.SolverJobResponse.model_validate(job) if job else None
+
+    def claim(self) -> Optional[schemas.SolverJobResponse]:
+        """
+        Atomically moves the oldest queued job, or running job with an expired lease, to RUNNING
+        and returns it (None if there is nothing to run). An expired job that already used its
+        max_attempts claims is marked FAILED instead.
+        """
+        with self.session_factory() as db:
+            now = datetime.utcnow()
+            Job = models.SolverJob
+            expired = and_(
+                Job.status == JobStatus.RUNNING,
+                func.coalesce(Job.heartbeat_at, Job.started_at) < now - timedelta(seconds=self.lease_seconds)
+            )
+            while True:
+                stmt = select(Job).where(
+                    or_(Job.status == JobStatus.QUEUED, expired)
+                ).order_by(Job.id).limit(1).with_for_update(skip_locked=True)
+
+                job = db.execute(stmt).scalar_one_or_none()
+                if not job:
+                    return None
+                if job.status == JobStatus.RUNNING and job.cancel_requested:
+                    # Abandoned after a cancel request: nothing left to run
+                    job.status = JobStatus.CANCELLED
+                    job.finished_at = now
+                    db.commit()
+                    continue
+                if job.status == JobStatus.RUNNING and job.attempts >= self.max_attempts:
+                    job.status = JobStatus.FAILED
+                    job.error = abandoned_error(job.attempts)
+                    job.finished_at = now
+                    db.commit()
+                    continue
+
+                job.status = JobStatus.RUNNING
+                job.attempts += 1
+                job.started_at = job.heartbeat_at = now
+                db.commit()
+                db.refresh(job)
+                return schemas.SolverJobResponse.model_validate(job)
+
+    def heartbeat(self, job_id: int) -> None:
+        """Renews the lease of a running job."""
+        self._update(job_id, heartbeat_at=datetime.utcnow())
+
+    def request_cancel(self, job_id: int) -> Optional[schemas.SolverJobResponse]:
+        """
+        Cancels a queued job immediately, or flags a running one so its worker stops the search.
+        Finished jobs are returned unchanged.
+        """
+        with self.session_factory() as db:
+            job = db.get(models.SolverJob, job_id, with_for_update=True)
+            if not job:
+                return None
+
+            if job.status == JobStatus.QUEUED:
+                job.status = JobStatus.CANCELLED
+                job.finished_at = datetime.utcnow()
+            elif job.status == JobStatus.RUNNING:
+                job.cancel_requested = True
+            db.commit()
+            db.refresh(job)
+            return schemas.SolverJobResponse.model_validate(job)
+
+    def is_cancel_requested(self, job_id: int) -> bool:
+        with self.session_factory() as db:
+            stmt = select(models.SolverJob.cancel_requested).where(models.SolverJob.id == job_id)
+            return bool(db.execute(stmt).scalar_one_or_none())
+
+    def report_progress(self, job_id: int, solutions_found: int, best_objective: float, best_bound: float) -> None:
+        self._update(job_id, solutions_found=solutions_found, best_objective=best_objective, best_bound=best_bound,
+                     heartbeat_at=datetime.utcnow())
+
+    def finish(self, job_id: int, status: JobStatus, result: dict = None, error: str = None) -> None:
+        self._update(job_id, status=status, result=result, error=error, finished_at=datetime.utcnow())
+
+    def _update(self, job_id: int, **fields) -> None:
+        with self.session_factory() as db:
+            job = db.get(models.SolverJob, job_id)
+            if not job:
+                return
+            for key, value in fields.items():
+                setattr(job, key, value)
+            db.commit()
+
+
+class InMemoryJobQueue:
+    """Thread-safe in-process stand-in for PostgresJobQueue (tests and local development)."""
+
+    def __init__(self, lease_seconds: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self._jobs: Dict[int, dict] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def enqueue(self, location_id: int, start_date: date, profile_name: str = None,
+                warm_start: bool = True, requested_by_id: int = None) -> schemas.SolverJobResponse:
+        with self._lock:
+            job_id = next(self._ids)
+            self._jobs[job_id] = {
+                "id": job_id,
+                "location_id": location_id,
+                "start_date": start_date,
+                "profile_name": profile_name,
+                "warm_start": warm_start,
+                "status": JobStatus.QUEUED,
+                "cancel_requested": False,
+                "attempts": 0,
+                "solutions_found": 0,
+                "created_at": datetime.utcnow()
+            }
+            return schemas.SolverJobResponse(**self._jobs[job_id])
+
+    def get(self, job_id: int) -> Optional[schemas.SolverJobResponse]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return schemas.SolverJobResponse(**job) if job else None
+
+    def claim(self) -> Optional[schemas.SolverJobResponse]:
+        with self._lock:
+            now = datetime.utcnow()
+            cutoff = now - timedelta(seconds=self.lease_seconds)
+            for job_id in sorted(self._jobs):
+                job = self._jobs[job_id]
+                expired = job["status"] == JobStatus.RUNNING and (job.get("heartbeat_at") or job["started_at"]) < cutoff
+                if expired and job["cancel_requested"]:
+                    job["status"] = JobStatus.CANCELLED
+                    job["finished_at"] = now
+                elif expired and job["attempts"] >= self.max_attempts:
+                    job["status"] = JobStatus.FAILED
+                    job["error"] = abandoned_error(job["attempts"])
+                    job["finished_at"] = now
+                elif job["status"] == JobStatus.QUEUED or expired:
+                    job["status"] = JobStatus.RUNNING
+                    job["attempts"] += 1
+                    job["started_at"] = job["heartbeat_at"] = now
+                    return schemas.SolverJobResponse(**job)
+            return None
+
+    def heartbeat(self, job_id: int) -> None:
+        self._update(job_id, heartbeat_at=datetime.utcnow())
+
+    def request_cancel(self, job_id: int) -> Optional[schemas.SolverJobResponse]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            if job["status"] == JobStatus.QUEUED:
+                job["status"] = JobStatus.CANCELLED
+                job["finished_at"] = datetime.utcnow()
+            elif job["status"] == JobStatus.RUNNING:
+                job["cancel_requested"] = True
+            return schemas.SolverJobResponse(**job)
+
+    def is_cancel_requested(self, job_id: int) -> bool:
+        with self._lock:
+            return bool(self._jobs.get(job_id, {}).get("cancel_requested"))
+
+    def report_progress(self, job_id: int, solutions_found: int, best_objective: float, best_bound: float) -> None:
+        self._update(job_id, solutions_found=solutions_found, best_objective=best_objective, best_bound=best_bound,
+                     heartbeat_at=datetime.utcnow())
+
+    def finish(self, job_id: int, status: JobStatus, result: dict = None, error: str = None) -> None:
+        self._update(job_id, status=status, result=result, error=error, finished_at=datetime.utcnow())
+
+    def _update(self, job_id: int, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+
+# Process-wide queue used by the API and by `python -m app.tasks.worker`
+default_queue = PostgresJobQueue(SessionLocal)
+
+
+def get_job_queue():
+    """
+    FastAPI dependency returning the job queue.
+    Tests override it with an InMemoryJobQueue.
+    """
+    return default_queue
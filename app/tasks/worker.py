@@ -0,0 +1,146 @@
+"""
+Auto-generate worker.
+
+Run one or more of these next to the API:
+    python -m app.tasks.worker
+
+Each worker claims queued jobs from the job queue, runs the CP-SAT solve, writes progress back
+to the job row (at most once per progress_interval, so a fast stream of solutions does not turn
+into a stream of UPDATEs), and stops the search early when a cancellation is requested. While it solves, the
+worker renews the job's lease (heartbeat) so that a job left behind by a crashed worker is claimed
+again once the lease expires.
+"""
+import logging
+import threading
+import time
+
+from ortools.sat.python import cp_model
+
+from app.core.database import SessionLocal
+from app.core.enums import JobStatus
+from app.core import schemas
+from app.engine.callbacks import SolutionProgressCallback
+from app.services.weekly_schedule_service import prepare_optimizer, build_schedule_result
+from app.tasks.job_queue import LEASE_SECONDS, default_queue
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of seconds between two progress writes of a running job
+PROGRESS_INTERVAL = 1.0
+
+
+def process_job(queue, job: schemas.SolverJobResponse, session_factory=SessionLocal,
+                cancel_poll_interval: float = 1.0, heartbeat_interval: float = LEASE_SECONDS / 4,
+                progress_interval: float = PROGRESS_INTERVAL) -> None:
+    """
+    Runs a single claimed job to completion and records its outcome on the queue.
+    Any error marks the job FAILED; the session is always closed.
+    """
+    db = session_factory()
+    try:
+        _solve_job(queue, job, db, cancel_poll_interval, heartbeat_interval, progress_interval)
+    except Exception as e:
+        logger.exception(f"Job {job.id} failed")
+        queue.finish(job.id, JobStatus.FAILED, error=str(e) or type(e).__name__)
+    finally:
+        db.close()
+
+
+def _solve_job(queue, job: schemas.SolverJobResponse, db, cancel_poll_interval: float,
+               heartbeat_interval: float, progress_interval: float) -> None:
+    try:
+        optimizer, inputs = prepare_optimizer(
+            db, job.location_id, job.start_date, profile_name=job.profile_name, warm_start=job.warm_start
+        )
+    except ValueError as e:
+        queue.finish(job.id, JobStatus.FAILED, error=str(e))
+        return
+
+    # Latest progress, and whether it still has to be written
+    progress_state = {"last": None, "pending": False, "written_at": None}
+
+    def write_progress():
+        last = progress_state["last"]
+        queue.report_progress(job.id, last["solutions_found"], last["objective"], last["bound"])
+        progress_state["pending"] = False
+        progress_state["written_at"] = time.monotonic()
+
+    def on_solution(progress: dict):
+        progress_state["last"] = progress
+        progress_state["pending"] = True
+        written_at = progress_state["written_at"]
+        if written_at is None or time.monotonic() - written_at >= progress_interval:
+            write_progress()
+
+    # Poll the cancel flag in the background so a cancel also interrupts a search with no solution yet,
+    # and renew the lease so the job is not handed to another worker mid-solve
+    done = threading.Event()
+
+    def watch_job():
+        stopped = False
+        last_heartbeat = time.monotonic()
+        while not done.wait(cancel_poll_interval):
+            try:
+                if not stopped and queue.is_cancel_requested(job.id):
+                    logger.info(f"Job {job.id}: cancellation requested, stopping search")
+                    optimizer.stop()
+                    stopped = True
+                if time.monotonic() - last_heartbeat >= heartbeat_interval:
+                    queue.heartbeat(job.id)
+                    last_heartbeat = time.monotonic()
+            except Exception:
+                logger.exception(f"Job {job.id}: could not poll the job")
+
+    watcher = threading.Thread(target=watch_job, daemon=True)
+    watcher.start()
+
+    try:
+        status = optimizer.solve(
+            inputs.employee_settings, inputs.employee_states,
+            solution_callback=SolutionProgressCallback(on_solution)
+        )
+        result = build_schedule_result(optimizer, status, job.location_id, job.start_date)
+    finally:
+        done.set()
+        watcher.join()
+
+    if progress_state["pending"]:
+        write_progress()
+
+    if queue.is_cancel_requested(job.id):
+        # Keep the best draft found before the stop so the work is not thrown away
+        queue.finish(job.id, JobStatus.CANCELLED, result=result)
+    elif status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        queue.finish(job.id, JobStatus.SUCCEEDED, result=result)
+    else:
+        queue.finish(job.id, JobStatus.FAILED, result=result, error="No feasible schedule found")
+
+
+def run_worker(queue=default_queue, session_factory=SessionLocal, idle_sleep: float = 1.0,
+               stop_event: threading.Event = None) -> None:
+    """
+    Claims and processes jobs until stop_event is set (forever when run as a script).
+    """
+    stop_event = stop_event or threading.Event()
+    logger.info("Auto-generate worker started")
+
+    while not stop_event.is_set():
+        job = queue.claim()
+        if job is None:
+            stop_event.wait(idle_sleep)
+            continue
+
+        logger.info(f"Job {job.id}: solving location {job.location_id} from {job.start_date}")
+        try:
+            process_job(queue, job, session_factory)
+        except Exception:
+            # e.g. the database went away while recording the outcome; the lease re-queues the job
+            logger.exception(f"Job {job.id}: could not record the outcome")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    run_worker()
@@ -10,19 +10,150 @@ export const getAssignments = async (locationId: number, startDate: string, endD
     return response.data;
 };
 
+// Poll a week: sends the ETag of the last read, so an unchanged schedule costs a 304 with no body.
+// Returns assignments = null when nothing changed; keep 'etag' for the next poll and for If-Match saves
+export const pollAssignments = async (
+    locationId: number,
+    startDate: string,
+    endDate: string,
+    etag?: string
+): Promise<{ assignments: Assignment[] | null; etag: string }> => {
+    const response = await apiClient.get('/api/assignments/', {
+        params: { location_id: locationId, start_date: startDate, end_date: endDate },
+        headers: etag ? { 'If-None-Match': etag } : {},
+        validateStatus: (status) => status === 200 || status === 304
+    });
+    return {
+        assignments: response.status === 304 ? null : response.data,
+        etag: response.headers['etag'] ?? etag ?? ''
+    };
+};
+
 // Trigger the OR-Tools engine to generate a new schedule
-export const generateAutoSchedule = async (locationId: number, startDate: string): Promise<any> => {
+// 'profile' selects a named solver budget (e.g. 'interactive', 'overnight'); omitted = server default
+// 'draft' (optional) warm-starts the solver; without it the server hints from last week's schedule
+export const generateAutoSchedule = async (
+    locationId: number,
+    startDate: string,
+    profile?: string,
+    draft?: Assignment[]
+): Promise<any> => {
+    const payload = draft ? draft.map(a => ({ employee_id: a.employee_id, shift_id: a.shift_id, date: a.date })) : null;
     // Note: start_date is passed as a query parameter as expected by the backend
-    const response = await apiClient.post(`/api/assignments/auto-generate/${locationId}`, null, {
+    const response = await apiClient.post(`/api/assignments/auto-generate/${locationId}`, payload, {
+        params: { start_date: startDate, profile }
+    });
+    return response.data;
+};
+
+// Stream improving drafts (Server-Sent Events) while the solver runs.
+// Uses fetch instead of EventSource so the JWT can be sent; call abort() on the returned controller to stop early.
+export const streamAutoSchedule = (
+    locationId: number,
+    startDate: string,
+    onEvent: (event: 'solution' | 'done' | 'error', data: any) => void,
+    profile?: string
+): AbortController => {
+    const controller = new AbortController();
+    const params = new URLSearchParams({ start_date: startDate });
+    if (profile) params.set('profile', profile);
+    const token = localStorage.getItem('access_token');
+
+    (async () => {
+        const response = await fetch(`/api/assignments/auto-generate/${locationId}/stream?${params}`, {
+            headers: token ? { Authorization: `Bearer ${token}` } : {},
+            signal: controller.signal,
+        });
+        if (!response.ok || !response.body) {
+            onEvent('error', { detail: `HTTP ${response.status}` });
+            return;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // SSE frames are separated by a blank line
+            let sep;
+            while ((sep = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+                const event = frame.match(/^event: (.*)$/m)?.[1] as 'solution' | 'done' | 'error';
+                const data = frame.match(/^data: (.*)$/m)?.[1];
+                if (event && data) onEvent(event, JSON.parse(data));
+            }
+        }
+    })().catch((err) => {
+        if (err.name !== 'AbortError') onEvent('error', { detail: String(err) });
+    });
+
+    return controller;
+};
+
+// Background auto-generate: queue a solve and get a job back immediately
+export const enqueueAutoScheduleJob = async (locationId: number, startDate: string, profile?: string): Promise<any> => {
+    const response = await apiClient.post(`/api/assignments/auto-generate/${locationId}/jobs`, null, {
+        params: { start_date: startDate, profile }
+    });
+    return response.data;
+};
+
+// Poll a background job (status, progress, and 'result' once finished)
+export const getAutoScheduleJob = async (jobId: number): Promise<any> => {
+    const response = await apiClient.get(`/api/assignments/jobs/${jobId}`);
+    return response.data;
+};
+
+// Cancel a background job; a running solve keeps its best draft so far
+export const cancelAutoScheduleJob = async (jobId: number): Promise<any> => {
+    const response = await apiClient.delete(`/api/assignments/jobs/${jobId}`);
+    return response.data;
+};
+
+// Current version of a week (0 = never saved); patch saves are made against it
+export const getWeekVersion = async (locationId: number, startDate: string): Promise<number> => {
+    const response = await apiClient.get(`/api/assignments/weeks/${locationId}/version`, {
+        params: { start_date: startDate }
+    });
+    return response.data.version;
+};
+
+// Patch save - send only the edits of one week (startDate = its Sunday) made against 'baseVersion'.
+// Rejected with 409 (detail.current_version) when the week was saved in between: reload and retry.
+export const patchWeekAssignments = async (
+    locationId: number,
+    startDate: string,
+    baseVersion: number,
+    add: Assignment[],
+    remove: Assignment[]
+): Promise<any> => {
+    const toKey = (a: Assignment) => ({ employee_id: a.employee_id, shift_id: a.shift_id, date: a.date });
+    const response = await apiClient.patch(`/api/assignments/weeks/${locationId}`, {
+        base_version: baseVersion,
+        add: add.map(toKey),
+        remove: remove.map(toKey)
+    }, {
         params: { start_date: startDate }
     });
     return response.data;
 };
 
 // Smart Sync - publish the board
-export const syncAssignments = async (locationId: number, startDate: string, endDate: string, assignments: any[]) => {
+// 'etag' (optional, from the last read) makes the save fail with 412 if someone else saved in between
+export const syncAssignments = async (
+    locationId: number,
+    startDate: string,
+    endDate: string,
+    assignments: any[],
+    etag?: string
+) => {
     const response = await apiClient.post('/api/assignments/', assignments, {
-        params: { location_id: locationId, start_date: startDate, end_date: endDate }
+        params: { location_id: locationId, start_date: startDate, end_date: endDate },
+        headers: etag ? { 'If-Match': etag } : {}
     });
     return response.data;
 };
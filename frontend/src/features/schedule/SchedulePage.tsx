@@ -177,7 +177,16 @@ export default function SchedulePage() {
             
             // 1. Tell backend to run the solver and GET the draft result
             const response = await generateAutoSchedule(selectedLocationId, startDateStr);
-            
+
+            // Infeasible week: list the clashing demands / employee rules returned by the engine
+            if (response.status === "FAILED") {
+                const conflicts = (response.conflicts || []).map((c: any) =>
+                    `- ${c.family}${c.employee_id ? ` (employee ${c.employee_id})` : ''}${c.date ? ` ${c.date}` : ''}`
+                );
+                alert(`No feasible schedule found.${conflicts.length ? `\nConflicting constraints:\n${conflicts.join('\n')}` : ''}`);
+                return;
+            }
+
             // 2. Extract the draft assignments and set them directly to the state (No DB fetch)
             // Ensure we handle the nested 'draft_assignments' key from the backend response
             const draftAssignments = response.draft_assignments || [];
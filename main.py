@@ -12,6 +12,7 @@ from fastapi.responses import FileResponse # To send index.html
 # Import DB settings and models to ensure tables are created on startup
 from app.core.database import engine
 from app.core.models import Base
+from app.services.scoring_sessions import check_single_api_process
 
 # Import Routers
 from app.api import endpoints_auth, endpoints_employees, endpoints_shift_definitions, endpoints_organizations, endpoints_clients, \
@@ -29,7 +30,9 @@ logging.basicConfig(
 # This handles startup and shutdown logic
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Action on startup: Create tables
+    # Action on startup: Refuse a multi-process setup that would split the in-memory scoring sessions
+    check_single_api_process()
+    # Create tables
     # This is where the magic happens before the app starts receiving requests
     Base.metadata.create_all(bind=engine)
     yield
@@ -66,6 +69,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],    # Allows all standard HTTP methods (GET, POST, etc.)
     allow_headers=["*"],    # Allows all headers
+    expose_headers=["ETag"],  # Lets the schedule screen read the version of a loaded week
 )
 
 # 5. Connect Routes ---
@@ -2,7 +2,7 @@
 
 import datetime
 from app.api.dependencies import get_current_user, get_current_admin_user
-from app.core.models import User, Organization, Client, Location, Employee, ShiftDefinition, Assignment
+from app.core.models import User, Organization, Client, Location, Employee, ShiftDefinition, Assignment, EmployeeWeekState
 from main import app
 
 
@@ -20,32 +20,46 @@ def override_get_current_admin_user():
 
 # --- Helper Setup Function ---
 
-def setup_assignment_dependencies(db_session):
+def setup_location(db_session, name="Assignment", num_employees=1, shift_name="Morning",
+                   start_time="07:00", end_time="15:00", staff_count=1):
     """
-    Creates the required hierarchy (Org -> Client -> Location -> Employee + Shift)
-    so we can test assignment creation properly.
-    Returns location_id, employee_id, and shift_id.
+    Creates the required hierarchy (Org -> Client -> Location -> Employees + Shift).
+    The location gets 'num_employees' active employees and one daily shift needing 'staff_count'
+    workers (no shift when shift_name is None).
+    Returns the location, the list of employees, and the shift.
     """
-    org = Organization(name="Assignment Org")
+    org = Organization(name=f"{name} Org")
     db_session.add(org)
     db_session.flush()
 
-    client_db = Client(name="Assignment Client", organization_id=org.id)
+    client_db = Client(name=f"{name} Client", organization_id=org.id)
     db_session.add(client_db)
     db_session.flush()
 
-    location = Location(name="Assignment Loc", client_id=client_db.id)
+    location = Location(name=f"{name} Loc", client_id=client_db.id)
     db_session.add(location)
     db_session.flush()
 
-    emp = Employee(name="Assignment Worker", location_id=location.id)
-    db_session.add(emp)
-    db_session.flush()
+    employees = [Employee(location_id=location.id, is_active=True) for _ in range(num_employees)]
+    db_session.add_all(employees)
 
-    shift = ShiftDefinition(location_id=location.id, shift_name="Morning")
-    db_session.add(shift)
+    shift = None
+    if shift_name is not None:
+        shift = ShiftDefinition(location_id=location.id, name=shift_name, start_time=start_time,
+                                end_time=end_time, default_staff_count=staff_count)
+        db_session.add(shift)
     db_session.commit()
 
+    return location, employees, shift
+
+
+def setup_assignment_dependencies(db_session):
+    """
+    Creates the required hierarchy (Org -> Client -> Location -> Employee + Shift)
+    so we can test assignment creation properly.
+    Returns location_id, employee_id, and shift_id.
+    """
+    location, (emp,), shift = setup_location(db_session)
     return location.id, emp.id, shift.id
 
 
@@ -162,4 +176,276 @@ def test_sync_weekly_assignments_smart_sync_logic(client, db_session):
     dates_in_db = [a.date for a in final_assignments]
     assert date_sunday in dates_in_db
     assert date_tuesday in dates_in_db
-    assert date_monday not in dates_in_db  # Monday should be gone
\ No newline at end of file
+    assert date_monday not in dates_in_db  # Monday should be gone
+
+def test_auto_generate_job_enqueue_poll_cancel(client, db_session):
+    """
+    Ensure auto-generate can be queued as a background job, polled, and cancelled.
+    """
+    from app.tasks.job_queue import InMemoryJobQueue, get_job_queue
+
+    queue = InMemoryJobQueue()
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+    app.dependency_overrides[get_job_queue] = lambda: queue
+
+    location, _, _ = setup_location(db_session, "Job", num_employees=0, shift_name=None)
+    loc_id = location.id
+
+    response = client.post(f"/api/assignments/auto-generate/{loc_id}/jobs?start_date=2023-10-01&profile=overnight")
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert job["profile_name"] == "overnight"
+
+    response = client.get(f"/api/assignments/jobs/{job['id']}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "queued"
+
+    response = client.delete(f"/api/assignments/jobs/{job['id']}")
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+
+
+def test_auto_generate_stream_emits_drafts(client, db_session):
+    """
+    Ensure the SSE endpoint streams at least one improving draft and a final 'done' event.
+    """
+    import json
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    location, _, _ = setup_location(db_session, "Stream", num_employees=3)
+
+    response = client.get(f"/api/assignments/auto-generate/{location.id}/stream?start_date=2023-10-01")
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    frames = [f for f in response.text.split("\n\n") if f.strip()]
+    events = [(f.split("\n")[0][len("event: "):], json.loads(f.split("\n")[1][len("data: "):])) for f in frames]
+
+    solutions = [data for event, data in events if event == "solution"]
+    assert len(solutions) >= 1
+    assert {"objective", "bound", "wall_time", "draft_assignments"} <= set(solutions[0])
+    assert len(solutions[-1]["draft_assignments"]) == 7
+
+    last_event, last_data = events[-1]
+    assert last_event == "done"
+    assert last_data["assignments_count"] == 7
+
+
+def test_auto_generate_infeasible_returns_conflicts(client, db_session):
+    """
+    Ensure an infeasible week returns the conflicting constraints instead of a bare FAILED status.
+    """
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    location, _, shift = setup_location(db_session, "Infeasible", staff_count=2)
+
+    response = client.post(f"/api/assignments/auto-generate/{location.id}?start_date=2023-10-01")
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "FAILED"
+    demand_conflicts = [c for c in data["conflicts"] if c["family"] == "demand"]
+    assert len(demand_conflicts) >= 1
+    assert demand_conflicts[0]["shift_id"] == shift.id
+    assert demand_conflicts[0]["required"] == 2
+    assert demand_conflicts[0]["date"].startswith("2023-10-0")
+
+
+def test_batch_auto_generate_requires_client_or_organization(client, db_session):
+    """
+    Ensure the batch endpoint rejects requests naming neither (or both) a client and an organization.
+    """
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    neither = client.post("/api/assignments/auto-generate-batch?start_date=2023-10-01")
+    both = client.post("/api/assignments/auto-generate-batch?start_date=2023-10-01&client_id=1&organization_id=1")
+    missing = client.post("/api/assignments/auto-generate-batch?start_date=2023-10-01&client_id=999")
+    app.dependency_overrides.clear()
+
+    assert neither.status_code == 400
+    assert both.status_code == 400
+    assert missing.status_code == 400
+    assert "not found" in missing.json()["detail"]
+
+
+def test_auto_generate_instant_mode_returns_greedy_draft(client, db_session):
+    """
+    Ensure mode=instant answers with a heuristic draft without running the solver.
+    """
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    location, _, _ = setup_location(db_session, "Instant", num_employees=3)
+
+    response = client.post(f"/api/assignments/auto-generate/{location.id}?start_date=2023-10-01&mode=instant")
+    hinted = client.post(f"/api/assignments/auto-generate/{location.id}?start_date=2023-10-01&greedy_hint=true"
+                         f"&use_cache=false")
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "HEURISTIC"
+    assert data["unfilled"] == []
+    assert len(data["draft_assignments"]) == 7
+    assert hinted.json()["hinted_assignments"] == 7
+
+
+def test_evaluate_scores_a_proposed_week(client, db_session):
+    """
+    Ensure /evaluate reports hard violations and the penalty breakdown of a manual week.
+    """
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    location, (employee,), shift = setup_location(db_session, "Eval")
+
+    # Only Sunday is staffed
+    body = [{"employee_id": employee.id, "shift_id": shift.id, "date": "2023-10-01"}]
+    response = client.post(f"/api/assignments/evaluate/{location.id}?start_date=2023-10-01", json=body)
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["feasible"] is False
+    assert data["violations"]["demand"] == 6
+    assert len(data["conflicts"]) == 6
+    assert data["ignored_assignments"] == 0
+
+
+def test_scoring_session_returns_move_deltas(client, db_session):
+    """
+    Ensure a scoring session scores grid edits incrementally and 404s once closed.
+    """
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    location, (first, second), shift = setup_location(db_session, "Scoring", num_employees=2)
+
+    url = f"/api/assignments/scoring/{location.id}"
+    params = "?start_date=2023-10-01"
+    opened = client.post(url + params, json=[])
+    added = client.post(url + "/moves" + params, json=[
+        {"action": "add", "employee_id": first.id, "shift_id": shift.id, "date": "2023-10-01"}
+    ])
+    dragged = client.post(url + "/moves" + params, json=[
+        {"action": "move", "from_employee_id": first.id, "employee_id": second.id, "shift_id": shift.id,
+         "date": "2023-10-01"}
+    ])
+    outside = client.post(url + "/moves" + params, json=[
+        {"action": "add", "employee_id": first.id, "shift_id": shift.id, "date": "2023-10-09"}
+    ])
+    closed = client.delete(url + params)
+    after_close = client.post(url + "/moves" + params, json=[])
+    app.dependency_overrides.clear()
+
+    assert opened.status_code == 200
+    assert opened.json()["violations"]["demand"] == 7
+    assert added.json()["violations"] == {"demand": -1}
+    assert added.json()["score"]["assignments_count"] == 1
+    assert dragged.json()["applied"] is True
+    assert dragged.json()["violations"] == {}
+    assert outside.status_code == 400
+    assert closed.status_code == 204
+    assert after_close.status_code == 404
+    assert "Reopen it with POST" in after_close.json()["detail"]
+
+
+def test_sync_refreshes_employee_week_states(client, db_session):
+    """
+    Ensure saving a week through Smart Sync updates the employee's stored history for that week.
+    """
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    location, (employee,), shift = setup_location(db_session, "Sync", shift_name="Evening",
+                                                  start_time="14:00", end_time="22:00")
+
+    url = f"/api/assignments/?location_id={location.id}&start_date=2023-10-01&end_date=2023-10-07"
+    body = [{"employee_id": employee.id, "shift_id": shift.id, "date": f"2023-10-0{d}"} for d in (5, 6, 7)]
+    first = client.post(url, json=body)
+    second = client.post(url, json=body[:2])
+    app.dependency_overrides.clear()
+
+    assert first.status_code == second.status_code == 200
+    state = db_session.query(EmployeeWeekState).filter_by(employee_id=employee.id).one()
+    assert state.week_start.isoformat() == "2023-10-01"
+    assert (state.days_worked, state.evenings, state.streak, state.worked_sat_noon) == (2, 2, 0, False)
+
+
+def test_patch_week_rejects_stale_versions(client, db_session):
+    """
+    Ensure patch saves apply against the current week version and are rejected with 409 once it moved on.
+    """
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    location, (employee,), shift = setup_location(db_session, "Patch")
+
+    url = f"/api/assignments/weeks/{location.id}?start_date=2023-10-01"
+    monday = {"employee_id": employee.id, "shift_id": shift.id, "date": "2023-10-02"}
+    tuesday = {**monday, "date": "2023-10-03"}
+    version = client.get(f"/api/assignments/weeks/{location.id}/version?start_date=2023-10-01")
+    first = client.patch(url, json={"base_version": 0, "add": [monday, tuesday]})
+    second = client.patch(url, json={"base_version": 1, "remove": [tuesday]})
+    stale = client.patch(url, json={"base_version": 1, "add": [tuesday]})
+    app.dependency_overrides.clear()
+
+    assert version.json()["version"] == 0
+    assert first.status_code == second.status_code == 200
+    assert (first.json()["added"], second.json()["removed"], second.json()["version"]) == (2, 1, 2)
+    assert stale.status_code == 409
+    assert stale.json()["detail"]["current_version"] == 2
+    assert [a.date.isoformat() for a in db_session.query(Assignment).all()] == ["2023-10-02"]
+
+
+def test_read_etag_and_conditional_sync(client, db_session):
+    """
+    Ensure reads answer 304 while the week is unchanged and syncs with a stale If-Match are rejected.
+    """
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+
+    location, (employee,), shift = setup_location(db_session, "ETag")
+
+    url = f"/api/assignments/?location_id={location.id}&start_date=2023-10-01&end_date=2023-10-07"
+    body = [{"employee_id": employee.id, "shift_id": shift.id, "date": "2023-10-02"}]
+    first_read = client.get(url)
+    etag = first_read.headers["ETag"]
+    poll = client.get(url, headers={"If-None-Match": etag})
+    saved = client.post(url, json=body, headers={"If-Match": etag})
+    stale = client.post(url, json=[], headers={"If-Match": etag})
+    changed_read = client.get(url, headers={"If-None-Match": etag})
+    app.dependency_overrides.clear()
+
+    assert first_read.status_code == 200 and first_read.json() == []
+    assert poll.status_code == 304 and poll.headers["ETag"] == etag
+    assert saved.status_code == 200 and saved.headers["ETag"] != etag
+    assert saved.json()["versions"] == {"2023-10-01": 1}
+    assert stale.status_code == 412 and stale.headers["ETag"] == saved.headers["ETag"]
+    assert changed_read.status_code == 200 and changed_read.headers["ETag"] == saved.headers["ETag"]
+    assert len(changed_read.json()) == 1
+
+
+def test_employee_reads_only_their_own_location(client, db_session):
+    """
+    Ensure an employee can read the schedule of the location they work at, but not another
+    location's, and a manager without the location cannot sync it.
+    """
+    own, (employee,), _ = setup_location(db_session, "Own", shift_name=None)
+    other, _, _ = setup_location(db_session, "Other", num_employees=0, shift_name=None)
+
+    week = "start_date=2023-10-01&end_date=2023-10-07"
+    app.dependency_overrides[get_current_user] = lambda: User(id=4, email="emp@test.com", role="employee",
+                                                              employee_id=employee.id, employee=employee)
+    own_read = client.get(f"/api/assignments/?location_id={own.id}&{week}")
+    other_read = client.get(f"/api/assignments/?location_id={other.id}&{week}")
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=3, email="manager@test.com", role="manager")
+    sync = client.post(f"/api/assignments/?location_id={own.id}&{week}", json=[])
+    app.dependency_overrides.clear()
+
+    assert own_read.status_code == 200
+    assert other_read.status_code == 403
+    assert sync.status_code == 403
+    assert sync.json()["detail"] == "Not authorized to modify the schedule for this location"
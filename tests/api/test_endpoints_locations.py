@@ -167,4 +167,37 @@ def test_update_location_weights_not_found(client, db_session):
     app.dependency_overrides.clear()
 
     assert response.status_code == 404
-    assert "not found" in response.json()["detail"].lower()
\ No newline at end of file
+    assert "not found" in response.json()["detail"].lower()
+
+def test_solver_profiles_deny_access_with_the_same_404(client, db_session):
+    """
+    Ensure reading and writing the solver profiles of a location the user may not manage both
+    answer 404, like a missing location, while an admin can write and read them back.
+    """
+    org = Organization(name="Profiles Org")
+    db_session.add(org)
+    db_session.flush()
+    client_db = Client(name="Profiles Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+    location = Location(name="Profiles Loc", client_id=client_db.id)
+    db_session.add(location)
+    db_session.commit()
+
+    url = f"/api/locations/{location.id}/solver-profiles"
+    profile = {"max_time_in_seconds": 5.0, "num_workers": 2, "relative_gap_limit": 0.0}
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=3, email="manager@test.com", role="manager")
+    denied_get = client.get(url)
+    denied_put = client.put(url + "/interactive", json=profile)
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="admin@test.com", role="admin")
+    missing_put = client.put("/api/locations/9999/solver-profiles/interactive", json=profile)
+    saved = client.put(url + "/interactive", json=profile)
+    listed = client.get(url)
+    app.dependency_overrides.clear()
+
+    assert denied_get.status_code == denied_put.status_code == missing_put.status_code == 404
+    assert denied_get.json()["detail"] == denied_put.json()["detail"] == "Location not found or access denied"
+    assert saved.status_code == 200
+    assert [p["name"] for p in listed.json()] == ["interactive"]
@@ -0,0 +1,130 @@
+"""
+Smart Sync benchmark: per-row ORM diff vs the set-based INSERT / DELETE.
+
+Fills a scratch SQLite database with a month of assignments for one location, then syncs a payload in
+which a share of the rows was moved to another shift (so as many rows are added as removed). Each
+run is rolled back, so every repeat starts from the same state. Both paths refresh the employee
+week states, as the endpoint does.
+
+    python -m tests.bench.bench_assignment_sync [--employees 50 200] [--days 28] [--changed 0.2] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+# app.core.database refuses to import without a DATABASE_URL; the benchmark uses its own engine
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import models
+from app.core.database import Base
+from app.services.assignment_sync_service import sync_assignments
+from app.services.history_state_service import refresh_week_states
+
+START_DATE = date(2024, 1, 7)  # A Sunday
+
+
+def fill(db: Session, num_employees: int, days: int, changed: float, seed: int = 0):
+    org = models.Organization(name="Bench Org")
+    db.add(org)
+    db.flush()
+    client = models.Client(name="Bench Client", organization_id=org.id)
+    db.add(client)
+    db.flush()
+    location = models.Location(name="Bench Loc", client_id=client.id)
+    db.add(location)
+    db.flush()
+    shifts = [models.ShiftDefinition(location_id=location.id, name=f"Shift {s}") for s in range(3)]
+    employees = [models.Employee(location_id=location.id, is_active=True) for _ in range(num_employees)]
+    db.add_all(shifts + employees)
+    db.flush()
+
+    rng = random.Random(seed)
+    existing, payload = [], []
+    for emp in employees:
+        for d in range(days):
+            day = START_DATE + timedelta(days=d)
+            shift = rng.randrange(3)
+            existing.append((emp.id, shifts[shift].id, day))
+            if rng.random() < changed:
+                shift = (shift + 1) % 3
+            payload.append((emp.id, shifts[shift].id, day))
+    db.execute(insert(models.Assignment), [
+        {"location_id": location.id, "employee_id": emp_id, "shift_id": shift_id, "date": day}
+        for emp_id, shift_id, day in existing
+    ])
+    db.commit()
+    return location.id, payload
+
+
+def sync_orm(db: Session, location_id: int, end_date: date, payload):
+    """The previous endpoint body: ORM rows, one db.add / db.delete per changed row."""
+    existing_map = {(a.employee_id, a.shift_id, a.date): a for a in db.execute(select(models.Assignment).where(
+        models.Assignment.location_id == location_id,
+        models.Assignment.date >= START_DATE,
+        models.Assignment.date <= end_date
+    )).scalars()}
+    incoming = set(payload)
+    changed = set()
+    for key in incoming - existing_map.keys():
+        db.add(models.Assignment(location_id=location_id, employee_id=key[0], shift_id=key[1], date=key[2]))
+        changed.add(key)
+    for key, row in existing_map.items():
+        if key not in incoming:
+            db.delete(row)
+            changed.add(key)
+    db.flush()
+    refresh_week_states(db, location_id, {k[0] for k in changed}, {k[2] for k in changed})
+
+
+def sync_set_based(db: Session, location_id: int, end_date: date, payload):
+    sync_assignments(db, location_id, START_DATE, end_date, payload)
+
+
+def measure(sync, engine, location_id: int, end_date: date, payload, repeat: int):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    best = float("inf")
+    for _ in range(repeat):
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", listener)
+        # Same session settings as app.core.database.SessionLocal
+        with Session(engine, autoflush=False) as db:
+            start = time.perf_counter()
+            sync(db, location_id, end_date, payload)
+            db.flush()
+            best = min(best, time.perf_counter() - start)
+            db.rollback()
+        event.remove(engine, "before_cursor_execute", listener)
+    return best, len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--changed", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'employees':>9} {'rows':>6} {'path':>5} {'time [ms]':>10} {'statements':>11}")
+    for n in args.employees:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{tmp}/bench.db")
+            Base.metadata.create_all(engine)
+            with Session(engine) as db:
+                location_id, payload = fill(db, n, args.days, args.changed)
+            end_date = START_DATE + timedelta(days=args.days - 1)
+            for name, sync in (("orm", sync_orm), ("set", sync_set_based)):
+                seconds, statements = measure(sync, engine, location_id, end_date, payload, args.repeat)
+                print(f"{n:>9} {len(payload):>6} {name:>5} {seconds * 1000:>10.1f} {statements:>11}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+History query benchmark: employee streaks over a year of assignments.
+
+Fills a scratch SQLite database with one location and a year of assignments, then times
+- "orm-7d": the previous path, ORM rows (with their shift definitions) of the last 7 days and a
+  Python loop per employee; streaks stop at 7 days,
+- "memory": the in-memory path over the whole lookback (plain tuples, Python streaks),
+- "sql": the gaps-and-islands window-function query over the whole lookback.
+
+    python -m tests.bench.bench_history_query [--employees 100 300] [--lookback 365] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+# app.core.database refuses to import without a DATABASE_URL; the benchmark uses its own engine
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core import models
+from app.core.database import Base
+from app.services.streak_query import load_history_rows, query_history_rows
+from app.services.weekly_schedule_service import build_historical_states
+
+START_DATE = date(2024, 1, 7)  # A Sunday
+
+
+def fill(db: Session, num_employees: int, days: int, seed: int = 0) -> int:
+    org = models.Organization(name="Bench Org")
+    db.add(org)
+    db.flush()
+    client = models.Client(name="Bench Client", organization_id=org.id)
+    db.add(client)
+    db.flush()
+    location = models.Location(name="Bench Loc", client_id=client.id)
+    db.add(location)
+    db.flush()
+    shifts = [
+        models.ShiftDefinition(location_id=location.id, name=name, start_time=start, end_time=end)
+        for name, start, end in (("Morning", "06:00", "14:00"), ("Evening", "14:00", "22:00"), ("Night", "22:00", "06:00"))
+    ]
+    employees = [models.Employee(location_id=location.id, is_active=True) for _ in range(num_employees)]
+    db.add_all(shifts + employees)
+    db.flush()
+
+    rng = random.Random(seed)
+    rows = [
+        {"location_id": location.id, "employee_id": emp.id, "shift_id": rng.choice(shifts).id,
+         "date": START_DATE - timedelta(days=n)}
+        for emp in employees for n in range(1, days + 1) if rng.random() < 0.75
+    ]
+    db.execute(insert(models.Assignment), rows)
+    db.commit()
+    return location.id
+
+
+def orm_seven_days(db: Session, location_id: int, start_date: date, lookback: int):
+    assignments = db.execute(select(models.Assignment).options(
+        joinedload(models.Assignment.shift_def)
+    ).where(
+        models.Assignment.location_id == location_id,
+        models.Assignment.date >= start_date - timedelta(days=7),
+        models.Assignment.date < start_date
+    )).scalars().all()
+    return build_historical_states(assignments, start_date)
+
+
+def measure(query, db: Session, location_id: int, lookback: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        db.expire_all()
+        start = time.perf_counter()
+        query(db, location_id, START_DATE, lookback)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--lookback", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'employees':>9} {'rows':>8} {'path':>7} {'time [ms]':>10}")
+    for n in args.employees:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{tmp}/bench.db")
+            Base.metadata.create_all(engine)
+            with Session(engine) as db:
+                location_id = fill(db, n, args.lookback)
+                total = db.query(models.Assignment).count()
+                for name, query in (("orm-7d", orm_seven_days), ("memory", load_history_rows),
+                                    ("sql", query_history_rows)):
+                    seconds = measure(query, db, location_id, args.lookback, args.repeat)
+                    print(f"{n:>9} {total:>8} {name:>7} {seconds * 1000:>10.1f}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Model build benchmark: dict-keyed variables with Python sum() vs the ShiftVarTensor + LinearExpr builder.
+
+Builds the variables and the hard constraints for a synthetic location and reports wall time and
+peak Python memory (tracemalloc) for each approach. Nothing is solved.
+
+    python -m tests.bench.bench_model_build [--employees 300] [--shifts 5] [--repeat 3]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+# app.core.database refuses to import without a DATABASE_URL; the benchmark never connects
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from ortools.sat.python import cp_model
+
+from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+from app.engine.constraints_manager import ConstraintManager
+from app.engine.employee_history import EmployeeHistoricalState
+from app.engine.variable_tensor import ShiftVarTensor
+
+NUM_DAYS = 7
+
+
+def make_instance(num_employees: int, num_shifts: int):
+    employees = [Employee(id=i, is_active=True) for i in range(1, num_employees + 1)]
+    staff = max(1, num_employees // (num_shifts * 2))
+    shifts = [ShiftDefinition(id=100 + s, name=f"Shift {s}", default_staff_count=staff) for s in range(num_shifts)]
+    settings = {
+        e.id: EmployeeSettings(employee_id=e.id, min_shifts_per_week=0, max_shifts_per_week=6)
+        for e in employees
+    }
+    states = {e.id: EmployeeHistoricalState(employee_id=e.id, history_streak=e.id % 4) for e in employees}
+    return employees, shifts, settings, states
+
+
+def build_dict(employees, shifts, settings, states):
+    """The previous builder: tuple-keyed dict, a fresh Python list and sum() per constraint."""
+    model = cp_model.CpModel()
+    shift_vars = {}
+    for emp in employees:
+        for d in range(NUM_DAYS):
+            for s_def in shifts:
+                shift_vars[(emp.id, d, s_def.id)] = model.NewBoolVar(f'shift_e{emp.id}_d{d}_s{s_def.id}')
+
+    for d in range(NUM_DAYS):
+        for s_def in shifts:
+            model.Add(sum(shift_vars[(emp.id, d, s_def.id)] for emp in employees) == s_def.default_staff_count)
+
+    for emp in employees:
+        for d in range(NUM_DAYS):
+            model.Add(sum(shift_vars[(emp.id, d, s.id)] for s in shifts) <= 1)
+
+    for emp in employees:
+        all_emp_shifts = [shift_vars[(emp.id, d, s.id)] for d in range(NUM_DAYS) for s in shifts]
+        model.Add(sum(all_emp_shifts) <= settings[emp.id].max_shifts_per_week)
+        model.Add(sum(all_emp_shifts) >= settings[emp.id].min_shifts_per_week)
+
+    for emp in employees:
+        for d in range(NUM_DAYS - 1):
+            model.Add(shift_vars[(emp.id, d, shifts[-1].id)] + shift_vars[(emp.id, d + 1, shifts[0].id)] <= 1)
+
+    for emp in employees:
+        work_days_vars = []
+        for d in range(NUM_DAYS):
+            is_working_day = model.NewBoolVar(f'working_day_e{emp.id}_d{d}')
+            model.Add(sum(shift_vars[(emp.id, d, s.id)] for s in shifts) > 0).OnlyEnforceIf(is_working_day)
+            model.Add(sum(shift_vars[(emp.id, d, s.id)] for s in shifts) == 0).OnlyEnforceIf(is_working_day.Not())
+            work_days_vars.append(is_working_day)
+        streak = states[emp.id].history_streak
+        if streak > 0:
+            model.Add(sum(work_days_vars[0:7 - streak]) < 7 - streak)
+        else:
+            model.Add(sum(work_days_vars) < 7)
+    return model
+
+
+def build_tensor(employees, shifts, settings, states):
+    """The current builder: ShiftVarTensor slices fed to ConstraintManager."""
+    model = cp_model.CpModel()
+    shift_vars = ShiftVarTensor.create(model, employees, NUM_DAYS, shifts)
+    manager = ConstraintManager(model, shift_vars, employees, shifts, [], LocationWeights(location_id=1))
+    manager._add_hard_constraints(settings, states, [])
+    return model
+
+
+def measure(builder, instance, repeat: int):
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        builder(*instance)
+        best_time = min(best_time, time.perf_counter() - start)
+
+    tracemalloc.start()
+    model = builder(*instance)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best_time, peak, len(model.Proto().constraints)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, nargs="+", default=[50, 150, 300])
+    parser.add_argument("--shifts", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'employees':>9} {'builder':>7} {'build [ms]':>11} {'peak [MiB]':>11} {'constraints':>12}")
+    for n in args.employees:
+        instance = make_instance(n, args.shifts)
+        for name, builder in (("dict", build_dict), ("tensor", build_tensor)):
+            seconds, peak, constraints = measure(builder, instance, args.repeat)
+            print(f"{n:>9} {name:>7} {seconds * 1000:>11.1f} {peak / 2 ** 20:>11.2f} {constraints:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compares the two penalty-indicator formulations of ConstraintManager:
+
+  full     b <=> AND(x...)   (AddBoolAnd.OnlyEnforceIf(b) + AddBoolOr.OnlyEnforceIf(~b))
+  compact  b >= AND(x...)    (one clause ~x1 v ~x2 v ... v b, valid because b is minimized)
+
+For every case both models are built from the same seeded instance and solved with one worker and a
+fixed seed, then presolve alone is timed with stop_after_presolve. Objectives must agree when both
+runs prove optimality.
+
+    python -m tests.bench.bench_penalty_formulation
+    python -m tests.bench.bench_penalty_formulation --cases small medium --time-limit 30
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from ortools.sat.python import cp_model
+
+from app.engine.solver import ShiftOptimizer
+from app.engine.solver_profiles import SolverParams
+from tests.bench.generator import generate_instance
+from tests.bench.run_benchmarks import STANDARD_SUITE
+
+
+def run_formulation(instance, compact: bool, time_limit: float, seed: int) -> dict:
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=instance.employees,
+        shifts=instance.shifts,
+        demands=instance.demands,
+        weights=instance.weights,
+        weekly_constraints=instance.weekly_constraints,
+        solver_params=SolverParams(max_time_in_seconds=time_limit, num_workers=1, random_seed=seed),
+        employee_settings=instance.employee_settings,
+        employee_states=instance.employee_states,
+        compact_penalties=compact,
+    )
+    optimizer.build_model(instance.employee_settings, instance.employee_states)
+    proto = optimizer.model.Proto()
+
+    presolve_solver = cp_model.CpSolver()
+    presolve_solver.parameters.num_workers = 1
+    presolve_solver.parameters.random_seed = seed
+    presolve_solver.parameters.stop_after_presolve = True
+    presolve_start = time.perf_counter()
+    presolve_solver.Solve(optimizer.model)
+    presolve_seconds = time.perf_counter() - presolve_start
+
+    solve_start = time.perf_counter()
+    status = optimizer.solve(instance.employee_settings, instance.employee_states)
+    solve_seconds = time.perf_counter() - solve_start
+
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "status": optimizer.solver.StatusName(status),
+        "objective": optimizer.solver.ObjectiveValue() if solved else None,
+        "constraints": len(proto.constraints),
+        "presolve_seconds": presolve_seconds,
+        "solve_seconds": solve_seconds,
+        "deterministic_time": optimizer.solver.ResponseProto().deterministic_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=["tiny", "small", "small_heavy_time_off", "medium"])
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    args = parser.parse_args()
+
+    print(f"{'case':<22} {'mode':<8} {'status':>9} {'objective':>10} {'cons':>7} "
+          f"{'presolve [s]':>13} {'solve [s]':>10} {'det. time':>10}")
+    for case in STANDARD_SUITE:
+        if case.name not in args.cases:
+            continue
+        instance = generate_instance(
+            case.num_employees, case.num_shifts, case.demand_variation, case.constraint_density,
+            case.history_fraction, case.seed, case.name
+        )
+        records = {}
+        for mode, compact in (("full", False), ("compact", True)):
+            r = records[mode] = run_formulation(instance, compact, args.time_limit, case.seed)
+            objective = "-" if r["objective"] is None else f"{r['objective']:.0f}"
+            print(f"{case.name:<22} {mode:<8} {r['status']:>9} {objective:>10} {r['constraints']:>7} "
+                  f"{r['presolve_seconds']:>13.3f} {r['solve_seconds']:>10.3f} {r['deterministic_time']:>10.3f}")
+        if all(r["status"] == "OPTIMAL" for r in records.values()):
+            assert records["full"]["objective"] == records["compact"]["objective"], case.name
+
+
+if __name__ == "__main__":
+    main()
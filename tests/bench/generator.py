@@ -0,0 +1,124 @@
+"""
+Seeded generator of synthetic scheduling instances for the engine benchmarks.
+
+The same (parameters, seed) always produces the same instance, so timings can be compared across commits.
+Instances are built from transient ORM objects, exactly as the service layer hands them to ShiftOptimizer.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from app.core.models import Employee, ShiftDefinition, ShiftDemand, LocationWeights, EmployeeSettings
+from app.engine.employee_history import EmployeeHistoricalState
+
+# Share of the staff working on an average day; keeps weekly load around 4 shifts per employee
+DAILY_UTILIZATION = 0.6
+
+
+@dataclass
+class SyntheticInstance:
+    name: str
+    seed: int
+    employees: List[Employee]
+    shifts: List[ShiftDefinition]
+    demands: List[ShiftDemand]
+    weights: LocationWeights
+    employee_settings: Dict[int, EmployeeSettings]
+    weekly_constraints: List[dict] = field(default_factory=list)
+    employee_states: Dict[int, EmployeeHistoricalState] = field(default_factory=dict)
+
+
+def generate_instance(num_employees: int, num_shifts: int, demand_variation: float = 0.2,
+                      constraint_density: float = 0.1, history_fraction: float = 0.5, seed: int = 0,
+                      name: str = None) -> SyntheticInstance:
+    """
+    Builds one location's week.
+    :param num_employees: Active employees (10 to 1000 across the suites)
+    :param num_shifts: Shift definitions per day (2 to 6), evenly spread over 24 hours from 07:00
+    :param demand_variation: Probability that a (weekday, shift) gets a ShiftDemand override
+    :param constraint_density: Probability that an (employee, day, shift) slot gets a weekly constraint
+    :param history_fraction: Share of employees with a non-empty history from the previous week
+    :param seed: Random seed; equal seeds give identical instances
+    """
+    rng = random.Random(seed)
+    name = name or f"e{num_employees}_s{num_shifts}_seed{seed}"
+
+    employees = [Employee(id=i, location_id=1, is_active=True) for i in range(1, num_employees + 1)]
+
+    hours = 24 // num_shifts
+    base_staff = max(1, round(num_employees * DAILY_UTILIZATION / num_shifts))
+    shifts = []
+    for s in range(num_shifts):
+        start = (7 + s * hours) % 24
+        end = (start + hours) % 24
+        shifts.append(ShiftDefinition(
+            id=100 + s, location_id=1, name=f"Shift {s + 1}",
+            start_time=f"{start:02d}:00", end_time=f"{end:02d}:00", default_staff_count=base_staff
+        ))
+
+    demands = []
+    for s_def in shifts:
+        for day in range(7):
+            if rng.random() < demand_variation:
+                swing = max(1, base_staff // 3)
+                demands.append(ShiftDemand(
+                    id=len(demands) + 1, shift_definition_id=s_def.id, day_of_week=day,
+                    required_employees=max(0, base_staff + rng.randint(-swing, swing))
+                ))
+
+    employee_settings = {}
+    for emp in employees:
+        min_shifts = rng.randint(2, 3)
+        max_shifts = rng.randint(5, 6)
+        employee_settings[emp.id] = EmployeeSettings(
+            employee_id=emp.id,
+            min_shifts_per_week=min_shifts,
+            max_shifts_per_week=max_shifts,
+            target_shifts=rng.randint(min_shifts + 1, max_shifts),
+            max_nights=rng.choice([None, 2, 3]),
+            min_mornings=rng.choice([None, 1]),
+            max_evenings=rng.choice([None, 2]),
+        )
+
+    weekly_constraints = []
+    for emp in employees:
+        must_work_used = False
+        for day in range(7):
+            for s_def in shifts:
+                if rng.random() >= constraint_density:
+                    continue
+                # Mostly time-off; at most one forced shift per employee, never on Sunday
+                # (it could clash with the rest rule after last Saturday night), so instances stay feasible
+                if not must_work_used and day > 0 and rng.random() < 0.05:
+                    must_work_used = True
+                    c_type = "must_work"
+                else:
+                    c_type = "cannot_work"
+                weekly_constraints.append({
+                    "employee_id": emp.id, "day_idx": day, "shift_id": s_def.id, "type": c_type
+                })
+
+    employee_states = {}
+    for emp in employees:
+        if rng.random() < history_fraction:
+            employee_states[emp.id] = EmployeeHistoricalState(
+                employee_id=emp.id,
+                history_streak=rng.randint(0, 5),
+                worked_last_fri_night=rng.random() < 0.3,
+                worked_last_sat_noon=rng.random() < 0.3,
+                worked_last_sat_night=rng.random() < 0.3,
+            )
+        else:
+            employee_states[emp.id] = EmployeeHistoricalState(employee_id=emp.id)
+
+    return SyntheticInstance(
+        name=name,
+        seed=seed,
+        employees=employees,
+        shifts=shifts,
+        demands=demands,
+        weights=LocationWeights(location_id=1),
+        employee_settings=employee_settings,
+        weekly_constraints=weekly_constraints,
+        employee_states=employee_states,
+    )
@@ -0,0 +1,142 @@
+"""
+End-to-end engine benchmark suite.
+
+Generates seeded synthetic locations (tests/bench/generator.py), runs ShiftOptimizer on each and writes
+one JSON record per case: model-build time, solve time, status, objective, bound, gap, variable and
+constraint counts, plus the per-constraint-family build stats.
+
+    python -m tests.bench.run_benchmarks                       # standard suite, results in bench_results.json
+    python -m tests.bench.run_benchmarks --suite full          # adds the 1000-employee case
+    python -m tests.bench.run_benchmarks --cases small medium --time-limit 5 --output /tmp/before.json
+
+CP-SAT with several workers is not deterministic in time; compare runs on the same machine and
+use --workers 1 when an exact replay is needed.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+
+# app.core.database refuses to import without a DATABASE_URL; the benchmark never connects
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import ortools
+from ortools.sat.python import cp_model
+
+from app.engine.solver import ShiftOptimizer
+from app.engine.solver_profiles import SolverParams
+from tests.bench.generator import generate_instance
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    name: str
+    num_employees: int
+    num_shifts: int
+    demand_variation: float = 0.2
+    constraint_density: float = 0.1
+    history_fraction: float = 0.5
+    seed: int = 0
+
+
+STANDARD_SUITE = [
+    BenchCase("tiny", 10, 2, seed=1),
+    BenchCase("small", 40, 3, seed=2),
+    BenchCase("small_heavy_time_off", 40, 3, constraint_density=0.35, seed=3),
+    BenchCase("medium", 120, 3, seed=4),
+    BenchCase("medium_many_shifts", 120, 6, seed=5),
+    BenchCase("large", 300, 4, demand_variation=0.5, seed=6),
+]
+FULL_SUITE = STANDARD_SUITE + [
+    BenchCase("huge", 1000, 5, seed=7),
+]
+SUITES = {"standard": STANDARD_SUITE, "full": FULL_SUITE}
+
+
+def run_case(case: BenchCase, time_limit: float, workers: int) -> dict:
+    """Builds and solves one case; returns its JSON-ready record."""
+    instance = generate_instance(
+        case.num_employees, case.num_shifts, case.demand_variation, case.constraint_density,
+        case.history_fraction, case.seed, case.name
+    )
+
+    build_start = time.perf_counter()
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=instance.employees,
+        shifts=instance.shifts,
+        demands=instance.demands,
+        weights=instance.weights,
+        weekly_constraints=instance.weekly_constraints,
+        solver_params=SolverParams(max_time_in_seconds=time_limit, num_workers=workers, random_seed=case.seed),
+        employee_settings=instance.employee_settings,
+        employee_states=instance.employee_states,
+    )
+    optimizer.build_model(instance.employee_settings, instance.employee_states)
+    build_seconds = time.perf_counter() - build_start
+
+    proto = optimizer.model.Proto()
+    solve_start = time.perf_counter()
+    status = optimizer.solve(instance.employee_settings, instance.employee_states)
+    solve_seconds = time.perf_counter() - solve_start
+
+    objective = bound = gap = None
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        objective = optimizer.solver.ObjectiveValue()
+        bound = optimizer.solver.BestObjectiveBound()
+        gap = abs(objective - bound) / max(1.0, abs(objective))
+
+    return {
+        **asdict(case),
+        "status": optimizer.solver.StatusName(status),
+        "build_seconds": round(build_seconds, 4),
+        "solve_seconds": round(solve_seconds, 4),
+        "objective": objective,
+        "best_bound": bound,
+        "gap": gap,
+        "num_variables": len(proto.variables),
+        "num_constraints": len(proto.constraints),
+        "num_weekly_constraints": len(instance.weekly_constraints),
+        "families": optimizer.model_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=sorted(SUITES), default="standard")
+    parser.add_argument("--cases", nargs="+", help="Only run the named cases from the suite")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="Solver time limit per case (seconds)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    cases = [c for c in SUITES[args.suite] if not args.cases or c.name in args.cases]
+    results = []
+    print(f"{'case':<22} {'status':>9} {'build [s]':>10} {'solve [s]':>10} {'objective':>10} "
+          f"{'gap':>7} {'vars':>7} {'cons':>7}")
+    for case in cases:
+        record = run_case(case, args.time_limit, args.workers)
+        results.append(record)
+        objective = "-" if record["objective"] is None else f"{record['objective']:.0f}"
+        gap = "-" if record["gap"] is None else f"{record['gap']:.1%}"
+        print(f"{case.name:<22} {record['status']:>9} {record['build_seconds']:>10.3f} "
+              f"{record['solve_seconds']:>10.3f} {objective:>10} {gap:>7} "
+              f"{record['num_variables']:>7} {record['num_constraints']:>7}")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "ortools_version": ortools.__version__,
+            "python_version": platform.python_version(),
+            "time_limit": args.time_limit,
+            "workers": args.workers,
+            "cases": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from tests.bench.generator import generate_instance
+from tests.bench.run_benchmarks import BenchCase, run_case
+
+
+def _snapshot(instance):
+    return (
+        [(s.id, s.start_time, s.default_staff_count) for s in instance.shifts],
+        [(d.shift_definition_id, d.day_of_week, d.required_employees) for d in instance.demands],
+        [(s.employee_id, s.min_shifts_per_week, s.max_shifts_per_week, s.target_shifts)
+         for s in instance.employee_settings.values()],
+        instance.weekly_constraints,
+        list(instance.employee_states.values()),
+    )
+
+
+def test_generator_is_deterministic():
+    """
+    Ensure equal seeds give identical instances and different seeds do not.
+    """
+    a = generate_instance(30, 4, demand_variation=0.5, constraint_density=0.2, seed=11)
+    b = generate_instance(30, 4, demand_variation=0.5, constraint_density=0.2, seed=11)
+    c = generate_instance(30, 4, demand_variation=0.5, constraint_density=0.2, seed=12)
+
+    assert _snapshot(a) == _snapshot(b)
+    assert _snapshot(a) != _snapshot(c)
+    assert len(a.employees) == 30
+    assert [s.start_time for s in a.shifts] == ["07:00", "13:00", "19:00", "01:00"]
+
+
+def test_run_case_records_metrics():
+    """
+    Ensure a benchmark run reports timings, objective and model size for a small case.
+    """
+    record = run_case(BenchCase("unit", 10, 2, seed=1), time_limit=5, workers=1)
+
+    assert record["status"] in ("OPTIMAL", "FEASIBLE")
+    assert record["build_seconds"] > 0
+    assert record["num_variables"] >= 10 * 7 * 2 - record["num_weekly_constraints"]
+    assert record["num_constraints"] > 0
+    assert record["gap"] is not None
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from app.engine.delta_scoring import DeltaScorer
+from app.engine.evaluator import ScheduleEvaluator
+from tests.bench.generator import generate_instance
+
+
+@pytest.mark.parametrize("num_employees,num_shifts", [(15, 3), (12, 6)])
+def test_delta_scorer_tracks_a_full_evaluation_under_random_moves(num_employees, num_shifts):
+    """
+    Ensure the running score after many add/remove/move edits equals a from-scratch evaluation.
+    """
+    instance = generate_instance(num_employees, num_shifts, seed=5)
+    evaluator = ScheduleEvaluator(instance.employees, instance.shifts, instance.demands, instance.weights,
+                                  instance.weekly_constraints, instance.employee_settings, instance.employee_states)
+    scorer = DeltaScorer(evaluator)
+    emp_ids = [emp.id for emp in evaluator.employees]
+    shift_ids = [s.id for s in evaluator.shifts]
+    rng = random.Random(7)
+
+    for _ in range(3000):
+        key = (rng.choice(emp_ids), rng.randrange(7), rng.choice(shift_ids))
+        before = scorer.total_penalty
+        if rng.random() < 0.2:
+            delta = scorer.move(key[0], rng.choice(emp_ids), key[1], key[2])
+        elif scorer.is_assigned(*key):
+            delta = scorer.remove(*key)
+        else:
+            delta = scorer.add(*key)
+        assert delta.total_penalty == before + delta.penalty_delta
+        assert sum(delta.penalties.values()) == delta.penalty_delta
+
+    full = evaluator.evaluate(evaluator.to_array(scorer.assignments()))
+    assert scorer.penalties == full.penalties
+    assert scorer.violations == full.violations
+    assert scorer.total_penalty == full.total_penalty
+    assert scorer.employee_penalties == full.employee_penalties.tolist()
+
+
+def test_delta_scorer_reports_the_changed_terms_only():
+    instance = generate_instance(6, 3, seed=2)
+    evaluator = ScheduleEvaluator(instance.employees, instance.shifts, instance.demands, instance.weights,
+                                  instance.weekly_constraints, instance.employee_settings, instance.employee_states)
+    scorer = DeltaScorer(evaluator)
+    emp_id, night = evaluator.employees[0].id, evaluator.shifts[2].id
+
+    scorer.add(emp_id, 2, night)
+    scorer.add(emp_id, 3, night)
+    delta = scorer.add(emp_id, 4, night)
+
+    assert delta.penalties["consecutive_nights"] == evaluator.weights["consecutive_nights"]
+    required = evaluator.required[4, 2]
+    assert delta.violations.get("demand", 0) == int(required != 1) - int(required != 0)
+    assert not scorer.add(emp_id, 4, night).applied  # Already assigned: no-op
@@ -0,0 +1,49 @@
+from app.engine.demand_index import DemandIndex
+from app.core.models import ShiftDefinition, ShiftDemand
+
+
+def _shifts():
+    return [
+        ShiftDefinition(id=10, name="Morning", default_staff_count=2),
+        ShiftDefinition(id=20, name="Evening", default_staff_count=1)
+    ]
+
+
+def test_defaults_and_overrides():
+    """
+    Ensure every slot starts at the shift's default and ShiftDemand rows override single weekdays.
+    """
+    demands = [ShiftDemand(shift_definition_id=10, day_of_week=5, required_employees=1)]
+    index = DemandIndex(_shifts(), demands, num_days=7)
+
+    assert index.required(0, 10) == 2
+    assert index.required(5, 10) == 1
+    assert index.required(5, 20) == 1
+    assert index.total_for_day(0) == 3
+    assert index.total_for_day(5) == 2
+
+
+def test_first_matching_demand_wins_and_unknown_rows_are_ignored():
+    """
+    Ensure duplicate rows keep the original 'first match' semantics,
+    and rows for other shifts or out-of-range days do not break the index.
+    """
+    demands = [
+        ShiftDemand(shift_definition_id=20, day_of_week=1, required_employees=4),
+        ShiftDemand(shift_definition_id=20, day_of_week=1, required_employees=9),
+        ShiftDemand(shift_definition_id=99, day_of_week=1, required_employees=3),
+        ShiftDemand(shift_definition_id=10, day_of_week=8, required_employees=3)
+    ]
+    index = DemandIndex(_shifts(), demands, num_days=7)
+
+    assert index.required(1, 20) == 4
+    assert index.matrix == [[2, 1], [2, 4], [2, 1], [2, 1], [2, 1], [2, 1], [2, 1]]
+
+
+def test_set_override():
+    """
+    Ensure a date-specific override can be layered on after construction.
+    """
+    index = DemandIndex(_shifts(), [], num_days=7)
+    index.set_override(3, 20, 0)
+    assert index.required(3, 20) == 0
@@ -0,0 +1,59 @@
+from ortools.sat.python import cp_model
+from app.engine.solver import ShiftOptimizer
+from app.engine.domain_reduction import compute_pruned_slots
+from app.engine.employee_history import EmployeeHistoricalState
+from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+
+
+def test_pruned_slots_from_constraints_history_and_settings():
+    """
+    Ensure cannot_work blocks, the Saturday-night history rule and zero-shift weeks are pruned,
+    while must_work requests and unknown slots are left alone.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True), Employee(id=3, is_active=True)]
+    shifts = [ShiftDefinition(id=10, name="Morning"), ShiftDefinition(id=11, name="Night")]
+    weekly_constraints = [
+        {"employee_id": 1, "day_idx": 3, "shift_id": 11, "type": "cannot_work"},
+        {"employee_id": 1, "day_idx": 4, "shift_id": 10, "type": "must_work"},
+        {"employee_id": 99, "day_idx": 0, "shift_id": 10, "type": "cannot_work"},
+    ]
+    states = {2: EmployeeHistoricalState(employee_id=2, worked_last_sat_night=True)}
+    settings = {3: EmployeeSettings(employee_id=3, min_shifts_per_week=0, max_shifts_per_week=0)}
+
+    pruned = compute_pruned_slots(employees, shifts, weekly_constraints, settings, states)
+
+    assert (1, 3, 11) in pruned
+    assert (1, 4, 10) not in pruned
+    assert (2, 0, 10) in pruned
+    assert all((3, d, s.id) in pruned for d in range(7) for s in shifts)
+    assert len(pruned) == 1 + 1 + 14
+
+
+def test_optimizer_builds_fewer_variables_for_time_off():
+    """
+    Ensure pruned slots get no decision variable and stay unassigned in the solution.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1)]
+    weekly_constraints = [
+        {"employee_id": 1, "day_idx": d, "shift_id": 1, "type": "cannot_work"} for d in range(3)
+    ]
+
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1),
+        weekly_constraints=weekly_constraints
+    )
+    status = optimizer.solve({}, {})
+
+    assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    # 14 slots, 3 pruned to a single shared constant
+    assert len(optimizer.shift_vars) == 14
+    assert sum(1 for _ in optimizer.shift_vars.decision_items()) == 11
+
+    assigned = {(r["employee_id"], r["day_index"]) for r in optimizer.get_results_as_dicts()}
+    assert {(2, 0), (2, 1), (2, 2)} <= assigned
+    assert not {(1, 0), (1, 1), (1, 2)} & assigned
@@ -0,0 +1,109 @@
+import numpy as np
+from ortools.sat.python import cp_model
+
+from app.engine.evaluator import ScheduleEvaluator
+from app.engine.solver import ShiftOptimizer
+from app.engine.solver_profiles import SolverParams
+from app.engine.employee_history import EmployeeHistoricalState
+from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+from tests.bench.generator import generate_instance
+
+
+def make_evaluator(instance):
+    return ScheduleEvaluator(instance.employees, instance.shifts, instance.demands, instance.weights,
+                             instance.weekly_constraints, instance.employee_settings, instance.employee_states)
+
+
+def test_evaluator_matches_the_optimal_cp_sat_objective():
+    """
+    Ensure an optimal CP-SAT week scores as feasible with the solver's objective value.
+    """
+    instance = generate_instance(12, 3, seed=11)
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=instance.employees,
+        shifts=instance.shifts,
+        demands=instance.demands,
+        weights=instance.weights,
+        weekly_constraints=instance.weekly_constraints,
+        solver_params=SolverParams(max_time_in_seconds=30, num_workers=8),
+        employee_settings=instance.employee_settings,
+        employee_states=instance.employee_states,
+    )
+    assert optimizer.solve(instance.employee_settings, instance.employee_states) == cp_model.OPTIMAL
+
+    evaluator = make_evaluator(instance)
+    x = evaluator.to_array((r["employee_id"], r["day_index"], r["shift_id"])
+                           for r in optimizer.get_results_as_dicts())
+    evaluation = evaluator.evaluate(x)
+
+    assert evaluation.feasible
+    assert evaluation.total_penalty == optimizer.solver.ObjectiveValue()
+    assert sum(evaluation.penalties.values()) == evaluation.total_penalty
+    assert evaluation.employee_penalties.sum() == evaluation.total_penalty
+    assert evaluator.violation_details(x) == []
+
+
+def test_evaluator_reports_violations_and_penalty_terms():
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1),
+              ShiftDefinition(id=2, name="Evening", default_staff_count=0),
+              ShiftDefinition(id=3, name="Night", default_staff_count=1)]
+    settings = {1: EmployeeSettings(employee_id=1, min_shifts_per_week=0, max_shifts_per_week=7, target_shifts=7)}
+    states = {2: EmployeeHistoricalState(employee_id=2, worked_last_fri_night=True, worked_last_sat_night=True)}
+    constraints = [{"employee_id": 1, "day_idx": 6, "shift_id": 1, "type": "cannot_work"}]
+    evaluator = ScheduleEvaluator(employees, shifts, [], LocationWeights(location_id=1, consecutive_nights=100,
+                                                                         rest_gap=40, target_shifts=10),
+                                  constraints, settings, states)
+
+    # Employee 1 works every morning (streak + cannot_work on Saturday), employee 2 every night
+    keys = [(1, d, 1) for d in range(7)] + [(2, d, 3) for d in range(7)]
+    x = evaluator.to_array(keys)
+    evaluation = evaluator.evaluate(x)
+
+    assert not evaluation.feasible
+    assert evaluation.violations["cannot_work"] == 1
+    assert evaluation.violations["streak"] == 2
+    assert evaluation.violations["back_to_back"] == 0
+    assert evaluation.violations["demand"] == 0
+    # 5 in-week night triples + the Friday/Saturday carry-over on Sunday
+    assert evaluation.penalties["consecutive_nights"] == 6 * 100
+    assert evaluation.penalties["target_shifts"] == 0
+    families = {d["family"] for d in evaluator.violation_details(x)}
+    assert families == {"cannot_work", "max_work_streak"}
+
+    # A batch scores each schedule independently
+    batch = np.stack([x, np.zeros_like(x)])
+    scored = evaluator.evaluate(batch)
+    assert scored.total_penalty[0] == evaluation.total_penalty
+    assert scored.violations["demand"][1] == 14
+    assert scored.penalties["target_shifts"][1] == 7 * 10
+
+
+def test_history_streak_of_seven_or_more_forbids_sunday():
+    """
+    Ensure an employee coming off a streak of 7+ days cannot work on Sunday, in CP-SAT and in the evaluator.
+    """
+    employees = [Employee(id=i, is_active=True) for i in range(1, 4)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1)]
+    states = {1: EmployeeHistoricalState(employee_id=1, history_streak=7),
+              2: EmployeeHistoricalState(employee_id=2, history_streak=9)}
+    weights = LocationWeights(location_id=1)
+
+    must_work = [{"employee_id": 2, "day_idx": 0, "shift_id": 1, "type": "must_work"}]
+    optimizer = ShiftOptimizer(location_id=1, employees=employees, shifts=shifts, demands=[], weights=weights,
+                               weekly_constraints=must_work, solver_params=SolverParams(max_time_in_seconds=10),
+                               employee_states=states)
+    assert optimizer.solve({}, states) == cp_model.INFEASIBLE
+
+    # Without the forced Sunday, employee 3 covers it
+    optimizer = ShiftOptimizer(location_id=1, employees=employees, shifts=shifts, demands=[], weights=weights,
+                               solver_params=SolverParams(max_time_in_seconds=10), employee_states=states)
+    assert optimizer.solve({}, states) == cp_model.OPTIMAL
+    assert [r["employee_id"] for r in optimizer.get_results_as_dicts() if r["day_index"] == 0] == [3]
+
+    evaluator = ScheduleEvaluator(employees, shifts, [], weights, [], {}, states)
+    evaluation = evaluator.evaluate(evaluator.to_array([(1, 0, 1)] + [(3, d, 1) for d in range(1, 7)]))
+    assert evaluation.violations["streak"] == 1
+    details = evaluator.violation_details(evaluator.to_array([(2, 0, 1)] + [(3, d, 1) for d in range(1, 7)]))
+    assert details == [{"family": "max_work_streak", "employee_id": 2}]
@@ -0,0 +1,71 @@
+import time
+
+from app.engine.greedy import GreedyScheduler
+from app.engine.employee_history import EmployeeHistoricalState
+from app.core.models import Employee, ShiftDefinition, EmployeeSettings
+from tests.bench.generator import generate_instance
+
+
+def test_greedy_fills_demand_without_breaking_hard_rules():
+    """
+    Ensure the draft staffs every slot it can while respecting cannot_work, must_work,
+    the daily limit, back-to-back, the weekly maximum and last week's Saturday night.
+    """
+    employees = [Employee(id=i, is_active=True) for i in range(1, 6)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1),
+              ShiftDefinition(id=2, name="Evening", default_staff_count=1),
+              ShiftDefinition(id=3, name="Night", default_staff_count=1)]
+    settings = {e.id: EmployeeSettings(employee_id=e.id, min_shifts_per_week=2, max_shifts_per_week=5)
+                for e in employees}
+    states = {1: EmployeeHistoricalState(employee_id=1, worked_last_sat_night=True)}
+    constraints = [{"employee_id": 2, "day_idx": 3, "shift_id": 2, "type": "cannot_work"},
+                   {"employee_id": 3, "day_idx": 4, "shift_id": 3, "type": "must_work"}]
+
+    result = GreedyScheduler(employees, shifts, [], constraints, settings, states).solve()
+    keys = result.assignments
+
+    assert result.unfilled == []
+    assert len(keys) == 21
+    assert (2, 3, 2) not in keys
+    assert (3, 4, 3) in keys
+    assert (1, 0, 1) not in keys
+    for emp in employees:
+        days = [d for e, d, _ in keys if e == emp.id]
+        assert len(days) == len(set(days)) <= 5
+        for d in range(6):
+            assert not ((emp.id, d, 3) in keys and (emp.id, d + 1, 1) in keys)
+
+
+def test_greedy_reports_unfilled_slots():
+    employees = [Employee(id=1, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=2)]
+
+    result = GreedyScheduler(employees, shifts, []).solve()
+
+    assert len(result.assignments) == 6  # max work streak
+    assert sum(slot["missing"] for slot in result.unfilled) == 14 - 6
+
+
+def test_greedy_is_instant_for_500_employees():
+    instance = generate_instance(500, 4, seed=3)
+    scheduler = GreedyScheduler(instance.employees, instance.shifts, instance.demands, instance.weekly_constraints,
+                                instance.employee_settings, instance.employee_states)
+
+    start = time.perf_counter()
+    result = scheduler.solve()
+    assert time.perf_counter() - start < 1.0
+    assert result.unfilled == []
+
+
+def test_greedy_keeps_sunday_off_after_a_long_streak():
+    """
+    Ensure employees coming off a streak of 7+ days are not drafted on Sunday.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1)]
+    states = {1: EmployeeHistoricalState(employee_id=1, history_streak=8)}
+
+    keys = GreedyScheduler(employees, shifts, [], [], {}, states).solve().assignments
+
+    assert (1, 0, 1) not in keys
+    assert (2, 0, 1) in keys
@@ -0,0 +1,73 @@
+from ortools.sat.python import cp_model
+from app.engine.solver import ShiftOptimizer
+from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+
+
+def test_explains_blocked_demand():
+    """
+    Ensure an unstaffable shift is explained by the demand and the time-off blocks that cause it.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1)]
+    weekly_constraints = [
+        {"employee_id": 1, "day_idx": 2, "shift_id": 1, "type": "cannot_work"},
+        {"employee_id": 2, "day_idx": 2, "shift_id": 1, "type": "cannot_work"},
+    ]
+
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1),
+        weekly_constraints=weekly_constraints
+    )
+    status = optimizer.solve({}, {})
+    assert status == cp_model.INFEASIBLE
+
+    conflicts = optimizer.explain_infeasibility()
+
+    assert {"family": "demand", "day_index": 2, "shift_id": 1, "required": 1} in conflicts
+    assert {"family": "cannot_work", "employee_id": 1, "day_index": 2, "shift_id": 1} in conflicts
+    assert {"family": "cannot_work", "employee_id": 2, "day_index": 2, "shift_id": 1} in conflicts
+    assert all(c["family"] != "demand" or c["day_index"] == 2 for c in conflicts)
+
+
+def test_explains_weekly_minimum():
+    """
+    Ensure a weekly minimum that exceeds the available shifts is reported against that employee.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1)]
+    settings = {1: EmployeeSettings(employee_id=1, min_shifts_per_week=5, max_shifts_per_week=6),
+                2: EmployeeSettings(employee_id=2, min_shifts_per_week=5, max_shifts_per_week=6)}
+
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1)
+    )
+    assert optimizer.solve(settings, {}) == cp_model.INFEASIBLE
+
+    families = {c["family"] for c in optimizer.explain_infeasibility()}
+    assert "weekly_shift_limits" in families
+    assert "demand" in families
+
+
+def test_no_explanation_for_feasible_week():
+    """
+    Ensure a feasible week produces no conflicts.
+    """
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=[Employee(id=1, is_active=True)],
+        shifts=[ShiftDefinition(id=1, name="Morning", default_staff_count=1)],
+        demands=[],
+        weights=LocationWeights(location_id=1)
+    )
+    # Seven mornings in a row breaks the streak rule, so lower the demand on one day
+    optimizer.demand_index.set_override(6, 1, 0)
+    assert optimizer.solve({}, {}) in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    assert optimizer.explain_infeasibility() == []
@@ -0,0 +1,41 @@
+from app.engine.solver import ShiftOptimizer
+from app.engine.employee_history import EmployeeHistoricalState
+from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+
+
+def test_family_stats_account_for_the_whole_model():
+    """
+    Ensure every constraint and every non-decision variable is attributed to exactly one family.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True), Employee(id=3, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1),
+              ShiftDefinition(id=2, name="Evening", default_staff_count=1),
+              ShiftDefinition(id=3, name="Night", default_staff_count=0)]
+    settings = {e.id: EmployeeSettings(employee_id=e.id, min_shifts_per_week=1, max_shifts_per_week=6,
+                                       max_nights=1, min_mornings=1) for e in employees}
+    states = {1: EmployeeHistoricalState(employee_id=1, worked_last_sat_night=True, worked_last_fri_night=True)}
+
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1)
+    )
+    optimizer.build_model(settings, states)
+    stats = optimizer.model_stats
+    proto = optimizer.model.Proto()
+
+    assert {"demand", "daily_limit", "weekly_limits", "back_to_back", "history_back_to_back", "streak",
+            "rest_gap", "history_rest_gap", "target_shifts", "shift_type_quotas", "consecutive_nights"} <= set(stats)
+    assert sum(entry["constraints"] for entry in stats.values()) == len(proto.constraints)
+    assert sum(entry["variables"] for entry in stats.values()) == len(proto.variables) - len(optimizer.shift_vars)
+
+    assert stats["demand"]["constraints"] == 7 * 3
+    assert stats["daily_limit"]["constraints"] == 3 * 7
+    assert stats["rest_gap"]["variables"] == 3 * 6
+    assert stats["rest_gap"]["objective_terms"] == 3 * 6
+    assert stats["target_shifts"]["objective_terms"] == 3
+    assert stats["shift_type_quotas"]["objective_terms"] == 3 * 2
+    assert stats["demand"]["objective_terms"] == 0
+    assert all(entry["seconds"] >= 0 for entry in stats.values())
@@ -0,0 +1,46 @@
+from ortools.sat.python import cp_model
+
+from app.engine.solver import ShiftOptimizer
+from app.engine.solver_profiles import SolverParams
+from app.engine.employee_history import EmployeeHistoricalState
+from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+
+
+def solve_week(compact_penalties: bool):
+    """
+    Three employees covering a morning and a night every day, so night streaks and rest gaps
+    cannot all be avoided and the penalties end up in the optimum.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True), Employee(id=3, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1),
+              ShiftDefinition(id=2, name="Evening", default_staff_count=0),
+              ShiftDefinition(id=3, name="Night", default_staff_count=1)]
+    settings = {e.id: EmployeeSettings(employee_id=e.id, min_shifts_per_week=0, max_shifts_per_week=7)
+                for e in employees}
+    states = {1: EmployeeHistoricalState(employee_id=1, worked_last_fri_night=True, worked_last_sat_night=True)}
+
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1),
+        solver_params=SolverParams(max_time_in_seconds=10, num_workers=1),
+        compact_penalties=compact_penalties,
+    )
+    status = optimizer.solve(settings, states)
+    return optimizer, status
+
+
+def test_compact_penalties_keep_the_optimum_with_fewer_constraints():
+    full, full_status = solve_week(compact_penalties=False)
+    compact, compact_status = solve_week(compact_penalties=True)
+
+    assert full_status == compact_status == cp_model.OPTIMAL
+    assert compact.solver.ObjectiveValue() == full.solver.ObjectiveValue()
+    assert full.solver.ObjectiveValue() > 0
+
+    full_stats, compact_stats = full.model_stats, compact.model_stats
+    assert compact_stats["consecutive_nights"]["constraints"] * 2 == full_stats["consecutive_nights"]["constraints"]
+    assert compact_stats["rest_gap"]["constraints"] * 2 == full_stats["rest_gap"]["constraints"]
+    assert len(compact.model.Proto().constraints) < len(full.model.Proto().constraints)
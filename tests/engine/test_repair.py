@@ -0,0 +1,94 @@
+from ortools.sat.python import cp_model
+
+from app.engine.repair import RepairRequest
+from app.engine.solver import ShiftOptimizer
+from app.engine.solver_profiles import SolverParams
+from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+
+
+def make_optimizer(repair=None):
+    employees = [Employee(id=i, is_active=True) for i in range(1, 6)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1),
+              ShiftDefinition(id=2, name="Evening", default_staff_count=1),
+              ShiftDefinition(id=3, name="Night", default_staff_count=1)]
+    settings = {e.id: EmployeeSettings(employee_id=e.id, min_shifts_per_week=0, max_shifts_per_week=6)
+                for e in employees}
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1),
+        solver_params=SolverParams(max_time_in_seconds=10, num_workers=1),
+        employee_settings=settings,
+        repair=repair,
+    )
+    return optimizer, settings
+
+
+def assigned_keys(optimizer):
+    return {(r["employee_id"], r["day_index"], r["shift_id"]) for r in optimizer.get_results_as_dicts()}
+
+
+def test_repair_freezes_past_days_and_only_replaces_the_dropped_shifts():
+    """
+    Ensure a mid-week drop-out keeps the past as published, frees the employee
+    and changes no more assignments than needed to cover the freed shifts.
+    """
+    full, settings = make_optimizer()
+    assert full.solve(settings, {}) == cp_model.OPTIMAL
+    published = assigned_keys(full)
+
+    # Pick an employee with shifts on and after Tuesday (day 2)
+    sick = next(e for e, d, _ in sorted(published) if d >= 2)
+    dropped = {k for k in published if k[0] == sick and k[1] >= 2}
+    repair = RepairRequest(published=frozenset(published), from_day=2,
+                           unavailable=frozenset((sick, d) for d in range(2, 7)))
+
+    optimizer, settings = make_optimizer(repair)
+    status = optimizer.solve(settings, {})
+    assert status == cp_model.OPTIMAL
+    repaired = assigned_keys(optimizer)
+
+    assert {k for k in repaired if k[1] < 2} == {k for k in published if k[1] < 2}
+    assert not any(e == sick and d >= 2 for e, d, _ in repaired)
+    diff = repair.diff(repaired)
+    assert set(diff["removed"]) >= dropped
+    # Every dropped shift needs exactly one replacement (demand is fixed), nothing else has to move
+    assert len(diff["added"]) == len(dropped)
+    assert optimizer.solver.Value(optimizer.changes_expr) == 2 * len(dropped)
+
+
+def test_repair_reopens_the_week_when_the_affected_day_cannot_be_covered_alone():
+    """
+    Ensure a drop-out whose shift can only be covered through a swap on another day is still repaired.
+    B and C are at their weekly maximum and D cannot work Tuesday, so D must take one of B's days first.
+    """
+    employees = [Employee(id=i, is_active=True) for i in (1, 2, 3, 4)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1)]
+    settings = {1: EmployeeSettings(employee_id=1, min_shifts_per_week=0, max_shifts_per_week=6),
+                2: EmployeeSettings(employee_id=2, min_shifts_per_week=0, max_shifts_per_week=2),
+                3: EmployeeSettings(employee_id=3, min_shifts_per_week=0, max_shifts_per_week=2),
+                4: EmployeeSettings(employee_id=4, min_shifts_per_week=0, max_shifts_per_week=3)}
+    published = frozenset({(1, 0, 1), (1, 1, 1), (1, 2, 1), (2, 3, 1), (2, 4, 1), (3, 5, 1), (3, 6, 1)})
+    repair = RepairRequest(published=published, from_day=2, unavailable=frozenset((1, d) for d in range(2, 7)))
+    assert repair.open_days() == {2}
+
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1),
+        weekly_constraints=[{"employee_id": 4, "day_idx": 2, "shift_id": 1, "type": "cannot_work"}],
+        solver_params=SolverParams(max_time_in_seconds=10, num_workers=1),
+        employee_settings=settings,
+        repair=repair,
+    )
+    assert optimizer.solve(settings, {}) == cp_model.OPTIMAL
+    assert optimizer.repair.whole_week
+
+    repaired = assigned_keys(optimizer)
+    assert {(1, 0, 1), (1, 1, 1)} <= repaired
+    assert any(e == 4 for e, _, _ in repaired)
+    assert optimizer.solver.Value(optimizer.changes_expr) == 4
@@ -0,0 +1,89 @@
+import datetime
+from types import SimpleNamespace
+
+from ortools.sat.python import cp_model
+
+from app.core.models import Employee, ShiftDefinition, LocationWeights
+from app.engine.constraints_manager import ConstraintManager
+from app.engine.demand_index import DemandIndex
+from app.engine.shift_timing import MORNING, EVENING, NIGHT, shift_timing
+from app.engine.variable_tensor import ShiftVarTensor
+from app.services.weekly_schedule_service import build_historical_states
+
+
+def timed_shifts(*spans):
+    return [ShiftDefinition(id=i + 1, name=f"Shift {i + 1}", start_time=start, end_time=end, default_staff_count=0)
+            for i, (start, end) in enumerate(spans)]
+
+
+def test_rest_matrix_handles_shifts_crossing_midnight():
+    """
+    Ensure rest minutes, overlaps, rest rules and kinds follow the shift times, not the list order.
+    """
+    # Deliberately not in chronological order: night, morning, evening
+    timing = shift_timing(timed_shifts(("22:00", "06:00"), ("06:00", "14:00"), ("14:00", "22:00")))
+
+    assert timing.timed
+    assert timing.rest[0][1] == 0          # Night, then morning the next day
+    assert timing.rest[2][1] == 8 * 60      # Evening, then morning
+    assert timing.rest[0][2] == 8 * 60      # Night, then evening
+    assert timing.rest[1][1] == 16 * 60
+    assert timing.hard_pairs == ((0, 1),)
+    assert set(timing.soft_pairs) == {(0, 2), (2, 1)}
+    assert timing.kinds == {MORNING: (1,), EVENING: (2,), NIGHT: (0,)}
+    assert timing.after_sat_night_forbidden == (1,)
+    assert timing.after_sat_night_penalized == (2,)
+
+    overlapping = shift_timing(timed_shifts(("20:00", "08:00"), ("07:00", "15:00")))
+    assert overlapping.overlap[0][1] and (0, 1) in overlapping.hard_pairs
+
+
+def test_shifts_without_times_keep_the_positional_rules():
+    timing = shift_timing([ShiftDefinition(id=i, name=f"S{i}") for i in range(3)])
+
+    assert not timing.timed
+    assert timing.hard_pairs == ((2, 0),)
+    assert timing.soft_pairs == ((1, 0),)
+    assert timing.kinds == {MORNING: (0,), EVENING: (1,), NIGHT: (2,)}
+
+
+def test_six_shift_location_forbids_only_the_short_rest_pairs():
+    """
+    Ensure the model takes its back-to-back rule from the matrix: with six 4-hour shifts, working
+    23:00-03:00 rules out 03:00-07:00 the next day, while the last-then-first positional pair is allowed.
+    """
+    shifts = timed_shifts(("03:00", "07:00"), ("07:00", "11:00"), ("11:00", "15:00"),
+                          ("15:00", "19:00"), ("19:00", "23:00"), ("23:00", "03:00"))
+    employees = [Employee(id=1, is_active=True)]
+
+    def feasible(fixed):
+        # The only demand is the two slots under test, so the demand rule assigns the employee to both
+        demand_index = DemandIndex(shifts, [], 2)
+        for d, shift_id in fixed:
+            demand_index.set_override(d, shift_id, 1)
+        model = cp_model.CpModel()
+        shift_vars = ShiftVarTensor.create(model, employees, 2, shifts)
+        manager = ConstraintManager(model, shift_vars, employees, shifts, [], LocationWeights(location_id=1),
+                                    num_days=2, demand_index=demand_index)
+        manager._add_hard_constraints({}, {}, [])
+        return cp_model.CpSolver().Solve(model) != cp_model.INFEASIBLE
+
+    assert not feasible([(0, 6), (1, 1)])   # 23:00-03:00, then 03:00-07:00: no rest
+    assert feasible([(0, 1), (1, 6)])       # Positions 0 and 5, but a full day apart
+
+
+def test_history_flags_use_shift_times_instead_of_names():
+    saturday = datetime.date(2023, 9, 30)
+    night = SimpleNamespace(name="Shift C", start_time="22:00", end_time="06:00")
+    noon = SimpleNamespace(name="Shift B", start_time="12:00", end_time="20:00")
+    assignments = [
+        SimpleNamespace(employee_id=1, shift_id=3, shift_def=night, date=saturday),
+        SimpleNamespace(employee_id=2, shift_id=2, shift_def=noon, date=saturday),
+        SimpleNamespace(employee_id=1, shift_id=3, shift_def=night, date=saturday - datetime.timedelta(days=1)),
+    ]
+
+    states = build_historical_states(assignments, datetime.date(2023, 10, 1))
+
+    assert states[1].worked_last_sat_night and states[1].worked_last_fri_night
+    assert states[1].history_streak == 2
+    assert states[2].worked_last_sat_noon and not states[2].worked_last_sat_night
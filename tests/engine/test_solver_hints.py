@@ -0,0 +1,45 @@
+from ortools.sat.python import cp_model
+from app.engine.solver import ShiftOptimizer
+from app.core.models import Employee, ShiftDefinition, LocationWeights
+
+
+def _build_optimizer():
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True)]
+    shifts = [
+        ShiftDefinition(id=1, name="Morning", default_staff_count=1),
+        ShiftDefinition(id=2, name="Evening", default_staff_count=0)
+    ]
+    return ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1)
+    )
+
+
+def test_hints_cover_every_decision_variable():
+    """
+    Ensure a warm-start schedule is written into the model as a full 0/1 hint.
+    """
+    optimizer = _build_optimizer()
+    hinted = {(1, d, 1) for d in range(4)} | {(2, d, 1) for d in range(4, 7)}
+    optimizer.set_hints(hinted)
+
+    status = optimizer.solve({}, {})
+    assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+    hint = optimizer.model.Proto().solution_hint
+    assert len(hint.vars) == len(optimizer.shift_vars)
+    hinted_values = dict(zip(hint.vars, hint.values))
+    for key, var in optimizer.shift_vars.items():
+        assert hinted_values[var.Index()] == (1 if key in hinted else 0)
+
+
+def test_no_hints_by_default():
+    """
+    Ensure a cold solve leaves the model without a solution hint.
+    """
+    optimizer = _build_optimizer()
+    optimizer.solve({}, {})
+    assert len(optimizer.model.Proto().solution_hint.vars) == 0
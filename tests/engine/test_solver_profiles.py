@@ -0,0 +1,55 @@
+from ortools.sat.python import cp_model
+from app.engine.solver import ShiftOptimizer
+from app.engine.solver_profiles import SolverParams, BUILTIN_PROFILES, DEFAULT_PROFILE
+from app.core.models import Employee, ShiftDefinition, LocationWeights, SolverProfile
+from app.services.weekly_schedule_service import resolve_solver_params
+
+
+def test_params_applied_to_cp_sat():
+    """
+    Ensure a profile's parameters are copied onto the CP-SAT solver before solving.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=1)]
+    params = SolverParams(max_time_in_seconds=3.5, num_workers=2, relative_gap_limit=0.05, random_seed=7)
+
+    optimizer = ShiftOptimizer(
+        location_id=1,
+        employees=employees,
+        shifts=shifts,
+        demands=[],
+        weights=LocationWeights(location_id=1),
+        solver_params=params
+    )
+    status = optimizer.solve({}, {})
+
+    assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    assert optimizer.solver.parameters.max_time_in_seconds == 3.5
+    assert optimizer.solver.parameters.num_workers == 2
+    assert optimizer.solver.parameters.relative_gap_limit == 0.05
+    assert optimizer.solver.parameters.random_seed == 7
+
+
+def test_builtin_profiles():
+    """
+    Ensure the built-in profiles keep the interactive budget short and the overnight one on all cores.
+    """
+    assert BUILTIN_PROFILES["interactive"].max_time_in_seconds == 2.0
+    assert BUILTIN_PROFILES["interactive"].num_workers == 8
+    assert BUILTIN_PROFILES["interactive"].relative_gap_limit == 0.01
+    assert BUILTIN_PROFILES["overnight"].max_time_in_seconds == 600.0
+    assert BUILTIN_PROFILES["overnight"].num_workers == 0
+
+
+def test_requests_without_a_profile_use_the_interactive_budget(db_session):
+    """
+    Ensure a request naming no profile gets the interactive budget instead of an unbounded search,
+    unless the location stores its own profile under the default name.
+    """
+    assert DEFAULT_PROFILE == "interactive"
+    assert resolve_solver_params(db_session, 1) == BUILTIN_PROFILES["interactive"]
+
+    db_session.add(SolverProfile(location_id=1, name=DEFAULT_PROFILE, max_time_in_seconds=30.0, num_workers=4,
+                                 relative_gap_limit=0.0, random_seed=0))
+    db_session.commit()
+    assert resolve_solver_params(db_session, 1) == SolverParams(max_time_in_seconds=30.0, num_workers=4)
@@ -0,0 +1,66 @@
+from ortools.sat.python import cp_model
+from app.engine.solver import ShiftOptimizer
+from app.engine.symmetry import find_interchangeable_classes, canonicalize_keys
+from app.engine.employee_history import EmployeeHistoricalState
+from app.core.models import Employee, ShiftDefinition, LocationWeights, EmployeeSettings
+
+
+def test_interchangeable_classes():
+    """
+    Ensure employees are grouped only when settings and history match and they have no weekly constraints.
+    """
+    employees = [Employee(id=i, is_active=True) for i in range(1, 7)]
+    settings = {
+        1: EmployeeSettings(employee_id=1, min_shifts_per_week=2, max_shifts_per_week=5),
+        2: EmployeeSettings(employee_id=2, min_shifts_per_week=2, max_shifts_per_week=5),
+        3: EmployeeSettings(employee_id=3, min_shifts_per_week=2, max_shifts_per_week=5),
+        4: EmployeeSettings(employee_id=4, min_shifts_per_week=1, max_shifts_per_week=5),
+    }
+    states = {3: EmployeeHistoricalState(employee_id=3, history_streak=2),
+              5: EmployeeHistoricalState(employee_id=5)}
+    weekly_constraints = [{"employee_id": 2, "day_idx": 0, "shift_id": 1, "type": "must_work"}]
+
+    classes = find_interchangeable_classes(employees, settings, states, weekly_constraints)
+
+    # 1 and 2 differ by 2's request, 3 by history, 4 by settings; 5 and 6 have no settings and a clean history
+    assert classes == [[4, 5]]
+
+
+def test_canonicalize_keys_orders_schedules():
+    """
+    Ensure hinted schedules are permuted inside a class into non-increasing lexicographic order.
+    """
+    employees = [Employee(id=1, is_active=True), Employee(id=2, is_active=True), Employee(id=3, is_active=True)]
+    keys = {(1, 3, 10), (2, 0, 10), (3, 1, 10), (3, 2, 10)}
+
+    canonical = canonicalize_keys(keys, employees, [[0, 1]], 7, [10])
+
+    assert canonical == {(1, 0, 10), (2, 3, 10), (3, 1, 10), (3, 2, 10)}
+
+
+def test_symmetry_breaking_keeps_optimum():
+    """
+    Ensure ordering interchangeable employees does not change the optimal objective.
+    """
+    employees = [Employee(id=i, is_active=True) for i in range(1, 7)]
+    shifts = [ShiftDefinition(id=1, name="Morning", default_staff_count=2),
+              ShiftDefinition(id=2, name="Evening", default_staff_count=1)]
+    settings = {e.id: EmployeeSettings(employee_id=e.id, min_shifts_per_week=1, max_shifts_per_week=5,
+                                       target_shifts=4, max_mornings=3) for e in employees}
+
+    objectives = []
+    for break_symmetry in (False, True):
+        optimizer = ShiftOptimizer(
+            location_id=1,
+            employees=employees,
+            shifts=shifts,
+            demands=[],
+            weights=LocationWeights(location_id=1),
+            break_symmetry=break_symmetry
+        )
+        status = optimizer.solve(settings, {})
+        assert status == cp_model.OPTIMAL
+        objectives.append(optimizer.solver.ObjectiveValue())
+
+    assert optimizer.symmetry_classes == [[0, 1, 2, 3, 4, 5]]
+    assert objectives[0] == objectives[1]
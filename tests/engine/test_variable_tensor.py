@@ -0,0 +1,45 @@
+from ortools.sat.python import cp_model
+from app.engine.variable_tensor import ShiftVarTensor
+from app.core.models import Employee, ShiftDefinition
+
+
+def _tensor():
+    model = cp_model.CpModel()
+    employees = [Employee(id=10, is_active=True), Employee(id=20, is_active=True)]
+    shifts = [ShiftDefinition(id=1, name="Morning"), ShiftDefinition(id=2, name="Evening"),
+              ShiftDefinition(id=3, name="Night")]
+    return ShiftVarTensor.create(model, employees, 7, shifts)
+
+
+def test_tensor_keys_and_slices():
+    """
+    Ensure the tensor is keyed like the old dict and every slice holds the expected variables.
+    """
+    tensor = _tensor()
+
+    assert len(tensor) == 2 * 7 * 3
+    assert list(tensor)[:4] == [(10, 0, 1), (10, 0, 2), (10, 0, 3), (10, 1, 1)]
+    assert tensor[(20, 4, 2)].Name() == "shift_e20_d4_s2"
+    assert (20, 7, 2) not in tensor
+    assert (30, 0, 1) not in tensor
+
+    assert tensor.by_emp[1] == [tensor[(20, d, s)] for d in range(7) for s in (1, 2, 3)]
+    assert tensor.by_emp_day[0][3] == [tensor[(10, 3, s)] for s in (1, 2, 3)]
+    assert tensor.by_emp_shift[1][2] == [tensor[(20, d, 3)] for d in range(7)]
+    assert tensor.by_day_shift[5][0] == [tensor[(10, 5, 1)], tensor[(20, 5, 1)]]
+    assert [k for k, _ in tensor.items()] == list(tensor)
+
+
+def test_from_dict_preserves_variables():
+    """
+    Ensure wrapping a dict keeps the same variable objects in tensor order.
+    """
+    model = cp_model.CpModel()
+    employees = [Employee(id=1, is_active=True)]
+    shifts = [ShiftDefinition(id=5, name="Morning"), ShiftDefinition(id=6, name="Night")]
+    shift_vars = {(1, d, s.id): model.NewBoolVar(f"x_{d}_{s.id}") for d in range(7) for s in shifts}
+
+    tensor = ShiftVarTensor.from_dict(shift_vars, employees, 7, shifts)
+
+    assert dict(tensor.items()) == shift_vars
+    assert tensor.var(0, 2, 1) is shift_vars[(1, 2, 6)]
@@ -0,0 +1,117 @@
+import datetime
+
+import pytest
+from sqlalchemy import event, select
+
+from app.core.models import Organization, Client, Location, Employee, ShiftDefinition, Assignment
+from app.services.assignment_sync_service import (
+    StaleScheduleVersion, apply_assignment_patch, load_schedule_versions, sync_assignments
+)
+
+SUNDAY = datetime.date(2023, 10, 1)
+
+
+def make_location(db_session, num_employees=4):
+    org = Organization(name="Sync Org")
+    db_session.add(org)
+    db_session.flush()
+    client_db = Client(name="Sync Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+    location = Location(name="Sync Loc", client_id=client_db.id)
+    db_session.add(location)
+    db_session.flush()
+    employees = [Employee(location_id=location.id, is_active=True) for _ in range(num_employees)]
+    shifts = [ShiftDefinition(location_id=location.id, name=f"Shift {s}", start_time=start, end_time=end)
+              for s, (start, end) in enumerate((("06:00", "14:00"), ("14:00", "22:00")))]
+    db_session.add_all(employees + shifts)
+    db_session.commit()
+    return location, employees, shifts
+
+
+def test_sync_applies_diff_with_one_statement_each(db_session):
+    """
+    Ensure the diff is written with a single INSERT and a single DELETE, and unchanged rows keep their ids.
+    """
+    location, employees, shifts = make_location(db_session)
+    end = SUNDAY + datetime.timedelta(days=27)
+    month = {(emp.id, shift.id, SUNDAY + datetime.timedelta(days=d))
+             for emp in employees for d in range(28) for shift in shifts if (emp.id + d + shift.id) % 3 == 0}
+    first = sync_assignments(db_session, location.id, SUNDAY, end, month)
+    db_session.commit()
+    assert (first.added, first.removed, first.unchanged) == (len(month), 0, 0)
+    ids = dict(db_session.execute(select(Assignment.date, Assignment.id).where(
+        Assignment.employee_id == employees[0].id, Assignment.shift_id == shifts[0].id)).all())
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement.split()[0].upper())
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        removed = {key for key in month if key[0] != employees[0].id and key[2].day % 2}
+        added = {(emp.id, shifts[1].id, end) for emp in employees} - month
+        second = sync_assignments(db_session, location.id, SUNDAY, end, list(month - removed | added) + list(added))
+        db_session.commit()
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    assert (second.added, second.removed, second.unchanged) == (len(added), len(removed), len(month - removed))
+    assert statements.count("INSERT") == 1 and statements.count("DELETE") == 1
+    keys = set(db_session.execute(select(Assignment.employee_id, Assignment.shift_id, Assignment.date)).all())
+    assert keys == month - removed | added
+    assert ids == dict(db_session.execute(select(Assignment.date, Assignment.id).where(
+        Assignment.employee_id == employees[0].id, Assignment.shift_id == shifts[0].id)).all())
+
+
+def test_sync_skips_keys_existing_outside_the_range(db_session):
+    """
+    Ensure a payload row outside the synced range that already exists is not inserted twice
+    (it still counts as added, as with the row-by-row sync).
+    """
+    location, (employee, *_), (shift, _) = make_location(db_session)
+    before = SUNDAY - datetime.timedelta(days=1)
+    db_session.add(Assignment(location_id=location.id, employee_id=employee.id, shift_id=shift.id, date=before))
+    db_session.commit()
+
+    result = sync_assignments(db_session, location.id, SUNDAY, SUNDAY + datetime.timedelta(days=6),
+                              [(employee.id, shift.id, before), (employee.id, shift.id, SUNDAY)])
+    db_session.commit()
+    assert (result.added, result.removed, result.unchanged) == (2, 0, 0)
+    assert db_session.query(Assignment).count() == 2
+
+
+def test_patch_applies_against_current_version_only(db_session):
+    """
+    Ensure a patch bumps the week version, and stale or no longer applicable patches change nothing.
+    """
+    location, (first, second, *_), (morning, evening) = make_location(db_session)
+    monday = SUNDAY + datetime.timedelta(days=1)
+    sync = sync_assignments(db_session, location.id, SUNDAY, SUNDAY + datetime.timedelta(days=6),
+                            [(first.id, morning.id, monday)])
+    db_session.commit()
+    assert sync.versions == {SUNDAY: 1}
+
+    moved = apply_assignment_patch(db_session, location.id, SUNDAY, 1,
+                                   add=[(second.id, morning.id, monday)], remove=[(first.id, morning.id, monday)])
+    db_session.commit()
+    assert (moved.added, moved.removed, moved.version) == (1, 1, 2)
+
+    with pytest.raises(StaleScheduleVersion) as stale:
+        apply_assignment_patch(db_session, location.id, SUNDAY, 1, add=[(first.id, evening.id, monday)], remove=[])
+    db_session.rollback()
+    assert stale.value.current_version == 2
+
+    with pytest.raises(StaleScheduleVersion):
+        apply_assignment_patch(db_session, location.id, SUNDAY, 2, add=[(first.id, evening.id, monday)],
+                               remove=[(first.id, morning.id, monday)])
+    db_session.rollback()
+
+    with pytest.raises(ValueError):
+        saturday_before = SUNDAY - datetime.timedelta(days=1)
+        apply_assignment_patch(db_session, location.id, SUNDAY, 2, add=[(first.id, evening.id, saturday_before)],
+                               remove=[])
+    db_session.rollback()
+
+    keys = set(db_session.execute(select(Assignment.employee_id, Assignment.shift_id, Assignment.date)).all())
+    assert keys == {(second.id, morning.id, monday)}
+    assert load_schedule_versions(db_session, location.id, [SUNDAY, SUNDAY + datetime.timedelta(days=7)]) == \
+        {SUNDAY: 2, SUNDAY + datetime.timedelta(days=7): 0}
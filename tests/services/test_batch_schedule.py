@@ -0,0 +1,164 @@
+import datetime
+
+import pytest
+
+from app.core.models import Organization, Client, Location, Employee, ShiftDefinition, Assignment, EmployeeWeekState
+from app.engine.solver_profiles import SolverParams
+from app.services.batch_schedule_service import (
+    allocate_cpus, estimate_batch_seconds, generate_batch_schedules, load_schedule_inputs_bulk
+)
+from app.services.solve_cache import result_cache
+from app.services.weekly_schedule_service import calculate_historical_states, generate_weekly_schedule
+
+
+# --- Helper Setup Function ---
+
+def setup_client(db_session):
+    """
+    Creates Org -> Client with two staffed locations (one daily shift needing one worker)
+    and one location without employees. Returns the client.
+    """
+    org = Organization(name="Batch Org")
+    db_session.add(org)
+    db_session.flush()
+    client_db = Client(name="Batch Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+
+    for name, staffed in (("Gate 1", True), ("Gate 2", True), ("Closed Gate", False)):
+        location = Location(name=name, client_id=client_db.id)
+        db_session.add(location)
+        db_session.flush()
+        db_session.add(ShiftDefinition(location_id=location.id, name="Morning", start_time="07:00",
+                                       end_time="15:00", default_staff_count=1))
+        if staffed:
+            for _ in range(3):
+                db_session.add(Employee(location_id=location.id, is_active=True))
+    db_session.commit()
+    return client_db
+
+
+# --- Tests ---
+
+def test_allocate_cpus_splits_the_cap_between_locations():
+    params = {1: SolverParams(max_time_in_seconds=2.0, num_workers=8),
+              2: SolverParams(max_time_in_seconds=600.0, num_workers=0),
+              3: SolverParams(max_time_in_seconds=2.0, num_workers=1)}
+
+    processes, capped = allocate_cpus(params, max_cpus=6, max_time_per_location=30.0)
+    assert processes == 3
+    assert capped[1].num_workers == 2
+    assert capped[2].num_workers == 2  # 'all cores' becomes the location's share
+    assert capped[3].num_workers == 1
+    assert capped[1].max_time_in_seconds == 2.0
+    assert capped[2].max_time_in_seconds == 30.0
+
+    processes, capped = allocate_cpus(params, max_cpus=2)
+    assert processes == 2
+    assert all(p.num_workers == 1 for p in capped.values())
+
+
+def test_batch_solves_every_location_of_a_client(db_session):
+    """
+    Ensure each staffed location gets its own draft, empty locations are reported,
+    and a repeated batch is served from the cache.
+    """
+    result_cache.clear()
+    client_db = setup_client(db_session)
+    start_date = datetime.date(2023, 10, 1)
+
+    # Last week's history must stay with its own location
+    gate_1 = db_session.query(Location).filter_by(name="Gate 1").one()
+    gate_1_emp = db_session.query(Employee).filter_by(location_id=gate_1.id).first()
+    gate_1_shift = db_session.query(ShiftDefinition).filter_by(location_id=gate_1.id).one()
+    db_session.add(Assignment(location_id=gate_1.id, employee_id=gate_1_emp.id, shift_id=gate_1_shift.id,
+                              date=start_date - datetime.timedelta(days=1)))
+    db_session.commit()
+
+    report = generate_batch_schedules(db_session, start_date, client_id=client_db.id, max_cpus=2)
+
+    assert report["processes"] == 2
+    assert report["status_counts"] == {"OPTIMAL": 2, "SKIPPED": 1}
+    by_name = {r["location_name"]: r for r in report["locations"]}
+    for name in ("Gate 1", "Gate 2"):
+        location_report = by_name[name]
+        assert location_report["assignments_count"] == 7
+        assert location_report["cached"] is False
+        assert location_report["solve_seconds"] >= 0
+        assert {a["location_id"] for a in location_report["draft_assignments"]} == {location_report["location_id"]}
+    assert by_name["Gate 1"]["hinted_assignments"] == 1
+    assert by_name["Gate 2"]["hinted_assignments"] == 0
+
+    again = generate_batch_schedules(db_session, start_date, organization_id=client_db.organization_id, max_cpus=2)
+    assert again["processes"] == 0
+    assert all(r["cached"] for r in again["locations"] if r["status"] == "OPTIMAL")
+
+
+def test_batch_refuses_a_budget_longer_than_a_request(db_session):
+    """
+    Ensure a batch whose worst-case solve time exceeds the request limit is refused before solving,
+    and accepted once max_time_per_location brings it under.
+    """
+    result_cache.clear()
+    client_db = setup_client(db_session)
+    start_date = datetime.date(2023, 10, 1)
+
+    assert estimate_batch_seconds({1: SolverParams(max_time_in_seconds=600.0),
+                                   2: SolverParams(max_time_in_seconds=2.0),
+                                   3: SolverParams(max_time_in_seconds=2.0)}, processes=2) == 600.0
+
+    with pytest.raises(ValueError, match="max_time_per_location"):
+        generate_batch_schedules(db_session, start_date, client_id=client_db.id, profile_name="overnight",
+                                 max_cpus=1)
+
+    report = generate_batch_schedules(db_session, start_date, client_id=client_db.id, profile_name="overnight",
+                                      max_cpus=1, max_time_per_location=5.0)
+    assert report["status_counts"] == {"OPTIMAL": 2, "SKIPPED": 1}
+
+
+def test_capped_batch_results_are_not_served_as_full_solves(db_session):
+    """
+    Ensure a batch solve cut short by its CPU / time cap is cached under its own budget,
+    so a single-location auto-generate with the full profile still solves.
+    """
+    result_cache.clear()
+    client_db = setup_client(db_session)
+    start_date = datetime.date(2023, 10, 1)
+    gate_1 = db_session.query(Location).filter_by(name="Gate 1").one()
+
+    generate_batch_schedules(db_session, start_date, client_id=client_db.id, max_cpus=1, max_time_per_location=1.0)
+    assert generate_weekly_schedule(db_session, gate_1.id, start_date)["cached"] is False
+
+    # A full solve is reused by a capped batch
+    again = generate_batch_schedules(db_session, start_date, client_id=client_db.id, max_cpus=1,
+                                     max_time_per_location=1.0)
+    by_name = {r["location_name"]: r for r in again["locations"]}
+    assert by_name["Gate 1"]["cached"] is True
+
+
+def test_batch_history_matches_the_single_location_path(db_session):
+    """
+    Ensure batch inputs read the same history as a single-location run: stored week states first,
+    and the lookback scan (longer than a week) for the employees without one.
+    """
+    setup_client(db_session)
+    start_date = datetime.date(2023, 10, 1)
+    gate_1 = db_session.query(Location).filter_by(name="Gate 1").one()
+    synced, unsynced, _ = db_session.query(Employee).filter_by(location_id=gate_1.id).all()
+    shift = db_session.query(ShiftDefinition).filter_by(location_id=gate_1.id).one()
+
+    db_session.add(EmployeeWeekState(location_id=gate_1.id, employee_id=synced.id,
+                                     week_start=start_date - datetime.timedelta(days=7), days_worked=7, streak=9))
+    for back in range(1, 11):
+        db_session.add(Assignment(location_id=gate_1.id, employee_id=unsynced.id, shift_id=shift.id,
+                                  date=start_date - datetime.timedelta(days=back)))
+    db_session.commit()
+
+    inputs, hints = load_schedule_inputs_bulk(db_session, [gate_1], start_date)
+    states = inputs[gate_1.id].employee_states
+
+    assert states[synced.id].history_streak == 9
+    assert states[unsynced.id].history_streak == 10
+    single = calculate_historical_states(db_session, gate_1.id, start_date)
+    assert {e: states[e].history_streak for e in single} == {e: s.history_streak for e, s in single.items()}
+    assert len(hints[gate_1.id]) == 7
@@ -0,0 +1,96 @@
+import datetime
+
+from app.core.models import Organization, Client, Location, Employee, ShiftDefinition, Assignment, EmployeeWeekState
+from app.core.rebuild_week_states import rebuild_all_week_states
+from app.services.history_state_service import load_week_states, rebuild_week_states, refresh_week_states
+from app.services.weekly_schedule_service import calculate_historical_states
+
+SUNDAY = datetime.date(2023, 10, 1)
+
+
+def make_location(db_session):
+    org = Organization(name="History Org")
+    db_session.add(org)
+    db_session.flush()
+    client_db = Client(name="History Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+    location = Location(name="History Loc", client_id=client_db.id)
+    db_session.add(location)
+    db_session.flush()
+    employee = Employee(location_id=location.id, is_active=True)
+    night = ShiftDefinition(location_id=location.id, name="Shift N", start_time="22:00", end_time="06:00",
+                            default_staff_count=1)
+    db_session.add_all([employee, night])
+    db_session.commit()
+    return location, employee, night
+
+
+def test_week_states_carry_streaks_across_weeks(db_session):
+    """
+    Ensure the stored streak is not capped at 7 days and is carried forward when an earlier week changes.
+    """
+    location, employee, night = make_location(db_session)
+    # Nights from Thursday two weeks back up to last Saturday: 10 days in a row
+    days = [SUNDAY - datetime.timedelta(days=n) for n in range(1, 11)]
+    for day in days:
+        db_session.add(Assignment(location_id=location.id, employee_id=employee.id, shift_id=night.id, date=day))
+    db_session.flush()
+    refresh_week_states(db_session, location.id, [employee.id], days)
+    db_session.commit()
+
+    states = load_week_states(db_session, location.id, SUNDAY)
+    assert states[employee.id].history_streak == 10
+    assert states[employee.id].worked_last_fri_night and states[employee.id].worked_last_sat_night
+    assert calculate_historical_states(db_session, location.id, SUNDAY)[employee.id].history_streak == 10
+    last_week = db_session.query(EmployeeWeekState).filter_by(week_start=SUNDAY - datetime.timedelta(days=7)).one()
+    assert (last_week.days_worked, last_week.nights, last_week.mornings) == (7, 7, 0)
+
+    # Dropping the earliest night shortens the streak of the following, fully worked week
+    earliest = db_session.query(Assignment).filter_by(date=days[-1]).one()
+    db_session.delete(earliest)
+    db_session.flush()
+    refresh_week_states(db_session, location.id, [employee.id], [days[-1]])
+    db_session.commit()
+    assert load_week_states(db_session, location.id, SUNDAY)[employee.id].history_streak == 9
+
+    # A full rebuild gives the same rows
+    rebuild_week_states(db_session, location.id)
+    db_session.commit()
+    assert load_week_states(db_session, location.id, SUNDAY)[employee.id].history_streak == 9
+    # ... as does the backfill command over all locations
+    rebuild_all_week_states(db_session)
+    assert load_week_states(db_session, location.id, SUNDAY)[employee.id].history_streak == 9
+
+
+def test_unsynced_or_unaligned_weeks_fall_back_to_the_assignment_scan(db_session):
+    location, employee, night = make_location(db_session)
+    db_session.add(Assignment(location_id=location.id, employee_id=employee.id, shift_id=night.id,
+                              date=SUNDAY - datetime.timedelta(days=1)))
+    db_session.commit()
+
+    assert load_week_states(db_session, location.id, SUNDAY) == {}
+    assert load_week_states(db_session, location.id, SUNDAY + datetime.timedelta(days=1)) is None
+    assert calculate_historical_states(db_session, location.id, SUNDAY)[employee.id].worked_last_sat_night
+
+
+def test_employees_without_a_week_state_fall_back_to_the_scan(db_session):
+    """
+    Ensure one synced employee does not hide the history of the location's employees that have no row.
+    """
+    location, employee, night = make_location(db_session)
+    synced = Employee(location_id=location.id, is_active=True)
+    db_session.add(synced)
+    db_session.flush()
+    # 'employee' worked last Saturday night before the table existed; 'synced' went through a sync
+    for emp, day in ((employee, SUNDAY - datetime.timedelta(days=1)), (synced, SUNDAY - datetime.timedelta(days=2))):
+        db_session.add(Assignment(location_id=location.id, employee_id=emp.id, shift_id=night.id, date=day))
+    db_session.flush()
+    refresh_week_states(db_session, location.id, [synced.id], [SUNDAY - datetime.timedelta(days=2)])
+    db_session.commit()
+
+    assert set(load_week_states(db_session, location.id, SUNDAY)) == {synced.id}
+    states = calculate_historical_states(db_session, location.id, SUNDAY)
+    assert states[employee.id].worked_last_sat_night
+    assert states[employee.id].history_streak == 1
+    assert states[synced.id].worked_last_fri_night
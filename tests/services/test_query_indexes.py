@@ -0,0 +1,99 @@
+import datetime
+import random
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.core.enums import ConstraintType
+from app.core.models import Organization, Client, Location, Employee, ShiftDefinition, Assignment, WeeklyConstraint
+
+START = datetime.date(2023, 7, 2)
+NUM_LOCATIONS, EMPLOYEES_PER_LOCATION, NUM_DAYS = 10, 40, 90
+
+
+@pytest.fixture
+def populated(db_session):
+    """About 36k assignments and 7k constraints over 10 locations and 90 days, with fresh planner statistics."""
+    org = Organization(name="Index Org")
+    db_session.add(org)
+    db_session.flush()
+    client_db = Client(name="Index Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+
+    rng = random.Random(3)
+    assignments, constraints = [], []
+    for n in range(NUM_LOCATIONS):
+        location = Location(name=f"Index Loc {n}", client_id=client_db.id)
+        db_session.add(location)
+        db_session.flush()
+        shifts = [ShiftDefinition(location_id=location.id, name=f"Shift {s}") for s in range(3)]
+        employees = [Employee(location_id=location.id, is_active=True) for _ in range(EMPLOYEES_PER_LOCATION)]
+        db_session.add_all(shifts + employees)
+        db_session.flush()
+        for emp in employees:
+            for d in range(NUM_DAYS):
+                day = START + datetime.timedelta(days=d)
+                assignments.append({"location_id": location.id, "employee_id": emp.id, "date": day,
+                                    "shift_id": rng.choice(shifts).id})
+                if rng.random() < 0.2:
+                    constraints.append({"employee_id": emp.id, "date": day, "shift_id": rng.choice(shifts).id,
+                                        "constraint_type": ConstraintType.CANNOT_WORK})
+    db_session.execute(insert(Assignment), assignments)
+    db_session.execute(insert(WeeklyConstraint), constraints)
+    db_session.commit()
+    db_session.execute(text("ANALYZE"))
+    db_session.commit()
+    location_id = db_session.execute(select(Location.id).order_by(Location.id.desc())).scalars().first()
+    employee_ids = db_session.execute(select(Employee.id).where(Employee.location_id == location_id)).scalars().all()
+    return location_id, employee_ids
+
+
+def query_plan(db_session, stmt) -> str:
+    sql = str(stmt.compile(dialect=db_session.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    if db_session.get_bind().dialect.name == "sqlite":
+        return "\n".join(row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    return "\n".join(row[0] for row in db_session.execute(text(f"EXPLAIN {sql}")))
+
+
+def test_week_queries_use_composite_indexes(populated, db_session):
+    """
+    Ensure the hot range queries are answered from the composite indexes rather than a table scan.
+    """
+    location_id, employee_ids = populated
+    week_start, week_end = START + datetime.timedelta(days=28), START + datetime.timedelta(days=34)
+
+    week = select(Assignment).where(
+        Assignment.location_id == location_id,
+        Assignment.date >= week_start,
+        Assignment.date <= week_end
+    )
+    assert "ix_assignments_location_date" in query_plan(db_session, week)
+
+    history = select(Assignment.employee_id, Assignment.date).where(
+        Assignment.location_id == location_id,
+        Assignment.employee_id.in_(employee_ids[:5]),
+        Assignment.date >= week_start,
+        Assignment.date <= week_end
+    )
+    assert "ix_assignments_location_employee_date" in query_plan(db_session, history)
+
+    constraints = select(WeeklyConstraint).where(
+        WeeklyConstraint.employee_id.in_(employee_ids),
+        WeeklyConstraint.date >= week_start,
+        WeeklyConstraint.date <= week_end
+    )
+    assert "ix_weekly_constraints_employee_date" in query_plan(db_session, constraints)
+
+
+def test_assignment_key_is_unique(populated, db_session):
+    """
+    Ensure a second assignment of the same employee, shift and date is rejected.
+    """
+    existing = db_session.execute(select(Assignment).limit(1)).scalar_one()
+    db_session.add(Assignment(location_id=existing.location_id, employee_id=existing.employee_id,
+                              shift_id=existing.shift_id, date=existing.date))
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+    db_session.rollback()
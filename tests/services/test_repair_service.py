@@ -0,0 +1,52 @@
+import datetime
+
+import pytest
+
+from app.core.models import Organization, Client, Location, Employee, ShiftDefinition, Assignment
+from app.services.weekly_schedule_service import generate_weekly_schedule, repair_weekly_schedule
+
+
+def test_repair_replaces_only_the_sick_employees_shifts(db_session):
+    """
+    Ensure a repair of a saved week keeps Sunday-Monday, frees the employee from Tuesday on
+    and reports the replacement as added/removed assignments.
+    """
+    org = Organization(name="Repair Org")
+    db_session.add(org)
+    db_session.flush()
+    client_db = Client(name="Repair Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+    location = Location(name="Repair Loc", client_id=client_db.id)
+    db_session.add(location)
+    db_session.flush()
+    for _ in range(4):
+        db_session.add(Employee(location_id=location.id, is_active=True))
+    db_session.add(ShiftDefinition(location_id=location.id, name="Morning", start_time="07:00",
+                                   end_time="15:00", default_staff_count=1))
+    db_session.commit()
+
+    start_date = datetime.date(2023, 10, 1)
+    tuesday = start_date + datetime.timedelta(days=2)
+    with pytest.raises(ValueError):
+        repair_weekly_schedule(db_session, location.id, start_date, 1, tuesday)
+
+    draft = generate_weekly_schedule(db_session, location.id, start_date, use_cache=False)["draft_assignments"]
+    for a in draft:
+        db_session.add(Assignment(location_id=location.id, employee_id=a["employee_id"], shift_id=a["shift_id"],
+                                  date=datetime.date.fromisoformat(a["date"])))
+    db_session.commit()
+    sick = next(a["employee_id"] for a in draft if a["date"] >= tuesday.isoformat())
+    sick_shifts = [a for a in draft if a["employee_id"] == sick and a["date"] >= tuesday.isoformat()]
+
+    result = repair_weekly_schedule(db_session, location.id, start_date, sick, tuesday)
+
+    assert result["status"] == "OPTIMAL"
+    assert result["assignments_count"] == 7
+    assert sorted(result["removed"], key=lambda a: a["date"]) == sorted(sick_shifts, key=lambda a: a["date"])
+    assert len(result["added"]) == len(sick_shifts)
+    assert result["changed_assignments"] == 2 * len(sick_shifts)
+
+    def before_tuesday(assignments):
+        return {(a["employee_id"], a["shift_id"], a["date"]) for a in assignments if a["date"] < tuesday.isoformat()}
+    assert before_tuesday(result["draft_assignments"]) == before_tuesday(draft)
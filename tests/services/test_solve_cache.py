@@ -0,0 +1,97 @@
+import datetime
+
+from app.core.models import Organization, Client, Location, Employee, ShiftDefinition
+from app.core.schemas import AssignmentCreate
+from app.services.solve_cache import SolveResultCache, result_cache
+from app.services.weekly_schedule_service import generate_weekly_schedule
+
+
+# --- Helper Setup Function ---
+
+def setup_location(db_session):
+    """
+    Creates Org -> Client -> Location with three employees and one daily shift needing one worker.
+    Returns the location and the shift.
+    """
+    org = Organization(name="Cache Org")
+    db_session.add(org)
+    db_session.flush()
+    client_db = Client(name="Cache Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+    location = Location(name="Cache Loc", client_id=client_db.id)
+    db_session.add(location)
+    db_session.flush()
+    for _ in range(3):
+        db_session.add(Employee(location_id=location.id, is_active=True))
+    shift = ShiftDefinition(location_id=location.id, name="Morning", start_time="07:00", end_time="15:00",
+                            default_staff_count=1)
+    db_session.add(shift)
+    db_session.commit()
+    return location, shift
+
+
+# --- Tests ---
+
+def test_cache_evicts_least_recently_used_and_expired():
+    cache = SolveResultCache(max_entries=2, max_age_seconds=60)
+    cache.put("a", {"status": "OPTIMAL"})
+    cache.put("b", {"status": "FEASIBLE"})
+    assert cache.get("a") == {"status": "OPTIMAL"}  # 'a' is now the most recent
+
+    cache.put("c", {"status": "OPTIMAL"})
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    # Callers get copies, so decorating a result does not leak into the cache
+    cache.get("a")["cached"] = True
+    assert cache.get("a") == {"status": "OPTIMAL"}
+
+    expired = SolveResultCache(max_age_seconds=0)
+    expired.put("a", {"status": "OPTIMAL"})
+    assert expired.get("a") is None
+
+
+def test_repeat_request_served_from_cache_until_inputs_change(db_session):
+    """
+    Ensure unchanged inputs hit the cache and any changed row (here a shift's staffing) misses it.
+    """
+    result_cache.clear()
+    location, shift = setup_location(db_session)
+    start_date = datetime.date(2023, 10, 1)
+
+    first = generate_weekly_schedule(db_session, location.id, start_date)
+    second = generate_weekly_schedule(db_session, location.id, start_date)
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["draft_assignments"] == first["draft_assignments"]
+
+    # Another profile is another instance
+    assert generate_weekly_schedule(db_session, location.id, start_date, profile_name="overnight")["cached"] is False
+
+    shift.default_staff_count = 2
+    db_session.commit()
+    third = generate_weekly_schedule(db_session, location.id, start_date)
+    assert third["cached"] is False
+    assert third["assignments_count"] == 14
+
+    assert generate_weekly_schedule(db_session, location.id, start_date, use_cache=False)["cached"] is False
+
+
+def test_drafts_and_greedy_hints_are_part_of_the_cache_key(db_session):
+    """
+    Ensure a request warm-started from a draft or from the greedy draft is not served a result
+    solved from other hints, while repeating it still hits the cache.
+    """
+    result_cache.clear()
+    location, shift = setup_location(db_session)
+    start_date = datetime.date(2023, 10, 1)
+    employee = db_session.query(Employee).filter_by(location_id=location.id).first()
+    draft = [AssignmentCreate(employee_id=employee.id, shift_id=shift.id, date=start_date)]
+
+    assert generate_weekly_schedule(db_session, location.id, start_date)["cached"] is False
+    with_draft = generate_weekly_schedule(db_session, location.id, start_date, draft=draft)
+    assert with_draft["cached"] is False
+    assert with_draft["hinted_assignments"] == 1
+    assert generate_weekly_schedule(db_session, location.id, start_date, draft=draft)["cached"] is True
+    assert generate_weekly_schedule(db_session, location.id, start_date, greedy_hint=True)["cached"] is False
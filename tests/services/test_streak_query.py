@@ -0,0 +1,75 @@
+import datetime
+import random
+
+import pytest
+
+from app.core.models import Organization, Client, Location, Employee, ShiftDefinition, Assignment
+from app.services.streak_query import HistoryRow, load_history_rows, query_history_rows
+from app.services.weekly_schedule_service import calculate_historical_states
+
+SUNDAY = datetime.date(2023, 10, 1)
+
+
+def make_location(db_session, num_employees=3):
+    org = Organization(name="Streak Org")
+    db_session.add(org)
+    db_session.flush()
+    client_db = Client(name="Streak Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+    location = Location(name="Streak Loc", client_id=client_db.id)
+    db_session.add(location)
+    db_session.flush()
+    employees = [Employee(location_id=location.id, is_active=True) for _ in range(num_employees)]
+    shifts = [
+        ShiftDefinition(location_id=location.id, name="Shift M", start_time="06:00", end_time="14:00"),
+        ShiftDefinition(location_id=location.id, name="Shift E", start_time="14:00", end_time="22:00"),
+        ShiftDefinition(location_id=location.id, name="Shift N", start_time="22:00", end_time="06:00"),
+    ]
+    db_session.add_all(employees + shifts)
+    db_session.commit()
+    return location, employees, shifts
+
+
+def test_streak_query_counts_past_seven_days(db_session):
+    """
+    Ensure the SQL streak is not capped at 7 days, stops at the first gap, and skips inactive employees.
+    """
+    location, (long_runner, broken, inactive), (morning, evening, night) = make_location(db_session)
+    inactive.is_active = False
+    for n in range(1, 11):
+        day = SUNDAY - datetime.timedelta(days=n)
+        db_session.add(Assignment(location_id=location.id, employee_id=long_runner.id, date=day,
+                                  shift_id=night.id if n <= 2 else morning.id))
+        db_session.add(Assignment(location_id=location.id, employee_id=inactive.id, date=day, shift_id=morning.id))
+        if n != 4:
+            db_session.add(Assignment(location_id=location.id, employee_id=broken.id, date=day,
+                                      shift_id=evening.id))
+    db_session.commit()
+
+    expected = [HistoryRow(long_runner.id, 10, True, False, True), HistoryRow(broken.id, 3, False, True, False)]
+    assert query_history_rows(db_session, location.id, SUNDAY) == expected
+    assert load_history_rows(db_session, location.id, SUNDAY) == expected
+    # The lookback bounds the streak
+    assert query_history_rows(db_session, location.id, SUNDAY, lookback_days=5)[0].streak == 5
+    assert calculate_historical_states(db_session, location.id, SUNDAY)[long_runner.id].history_streak == 10
+
+
+@pytest.mark.parametrize("start_date", [SUNDAY, SUNDAY + datetime.timedelta(days=3)])
+def test_streak_query_matches_in_memory_path(db_session, start_date):
+    """
+    Ensure the window-function query and the in-memory path agree on random histories.
+    """
+    location, employees, shifts = make_location(db_session, num_employees=12)
+    rng = random.Random(7)
+    for emp in employees:
+        density = rng.choice([0.5, 0.9, 1.0])
+        for n in range(1, 60):
+            if rng.random() < density:
+                db_session.add(Assignment(location_id=location.id, employee_id=emp.id, shift_id=rng.choice(shifts).id,
+                                          date=start_date - datetime.timedelta(days=n)))
+    db_session.commit()
+
+    for lookback in (7, 21, 90):
+        assert query_history_rows(db_session, location.id, start_date, lookback) == \
+            load_history_rows(db_session, location.id, start_date, lookback)
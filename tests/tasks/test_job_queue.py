@@ -0,0 +1,182 @@
+import datetime
+
+from app.core.enums import JobStatus
+from app.core.models import Organization, Client, Location, Employee, ShiftDefinition
+from app.tasks.job_queue import InMemoryJobQueue
+from app.tasks.worker import process_job
+
+
+# --- Helper Setup Function ---
+
+def setup_location(db_session, num_employees=3):
+    """
+    Creates Org -> Client -> Location with a single daily shift needing one worker.
+    Returns the location id.
+    """
+    org = Organization(name="Queue Org")
+    db_session.add(org)
+    db_session.flush()
+
+    client_db = Client(name="Queue Client", organization_id=org.id)
+    db_session.add(client_db)
+    db_session.flush()
+
+    location = Location(name="Queue Loc", client_id=client_db.id)
+    db_session.add(location)
+    db_session.flush()
+
+    for _ in range(num_employees):
+        db_session.add(Employee(location_id=location.id, is_active=True))
+
+    db_session.add(ShiftDefinition(
+        location_id=location.id, name="Morning", start_time="07:00", end_time="15:00", default_staff_count=1
+    ))
+    db_session.commit()
+    return location.id
+
+
+# --- Tests ---
+
+def test_in_memory_queue_lifecycle():
+    """
+    Ensure jobs are claimed in FIFO order exactly once, and cancellation follows the job state.
+    """
+    queue = InMemoryJobQueue()
+    first = queue.enqueue(1, datetime.date(2026, 1, 4))
+    second = queue.enqueue(1, datetime.date(2026, 1, 11))
+
+    claimed = queue.claim()
+    assert claimed.id == first.id
+    assert claimed.status == JobStatus.RUNNING
+
+    # A queued job is cancelled immediately
+    assert queue.request_cancel(second.id).status == JobStatus.CANCELLED
+    assert queue.claim() is None
+
+    # A running job is only flagged; the worker finishes it
+    running = queue.request_cancel(first.id)
+    assert running.status == JobStatus.RUNNING
+    assert queue.is_cancel_requested(first.id)
+
+
+def test_process_job_stores_draft(db_session):
+    """
+    Ensure a worker solves a claimed job and stores the draft and progress on it.
+    """
+    loc_id = setup_location(db_session)
+    queue = InMemoryJobQueue()
+    job = queue.enqueue(loc_id, datetime.date(2026, 1, 4), warm_start=False)
+
+    process_job(queue, queue.claim(), session_factory=lambda: db_session)
+
+    finished = queue.get(job.id)
+    assert finished.status == JobStatus.SUCCEEDED
+    assert finished.solutions_found >= 1
+    assert finished.result["assignments_count"] == 7
+    assert len(finished.result["draft_assignments"]) == 7
+
+
+def test_process_job_unknown_location_fails(db_session):
+    """
+    Ensure input errors are recorded on the job instead of crashing the worker.
+    """
+    queue = InMemoryJobQueue()
+    job = queue.enqueue(999, datetime.date(2026, 1, 4))
+    process_job(queue, queue.claim(), session_factory=lambda: db_session)
+
+    failed = queue.get(job.id)
+    assert failed.status == JobStatus.FAILED
+    assert "not found" in failed.error
+
+
+def test_expired_lease_is_claimed_again():
+    """
+    Ensure a running job whose worker stopped renewing its lease is handed to the next worker,
+    and one cancelled in the meantime is closed instead.
+    """
+    queue = InMemoryJobQueue(lease_seconds=60)
+    job = queue.enqueue(1, datetime.date(2026, 1, 4))
+    cancelled = queue.enqueue(1, datetime.date(2026, 1, 11))
+    queue.claim()
+    queue.claim()
+    queue.request_cancel(cancelled.id)
+
+    # Leases still valid: nothing to claim
+    assert queue.claim() is None
+
+    stale = datetime.datetime.utcnow() - datetime.timedelta(seconds=120)
+    queue._update(job.id, heartbeat_at=stale)
+    queue._update(cancelled.id, heartbeat_at=stale)
+
+    reclaimed = queue.claim()
+    assert reclaimed.id == job.id
+    assert reclaimed.status == JobStatus.RUNNING
+    assert queue.claim() is None
+    assert queue.get(cancelled.id).status == JobStatus.CANCELLED
+
+
+def test_process_job_unexpected_error_fails(db_session, monkeypatch):
+    """
+    Ensure any error while preparing the solve marks the job FAILED and closes the session.
+    """
+    def broken_prepare(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr("app.tasks.worker.prepare_optimizer", broken_prepare)
+    closed = []
+    monkeypatch.setattr(db_session, "close", lambda: closed.append(True))
+
+    queue = InMemoryJobQueue()
+    job = queue.enqueue(1, datetime.date(2026, 1, 4))
+    process_job(queue, queue.claim(), session_factory=lambda: db_session)
+
+    failed = queue.get(job.id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "database went away"
+    assert closed
+
+
+def test_job_abandoned_too_often_fails():
+    """
+    Ensure every claim counts as an attempt and a job abandoned after max_attempts claims is failed
+    instead of handed to another worker.
+    """
+    queue = InMemoryJobQueue(lease_seconds=60, max_attempts=2)
+    job = queue.enqueue(1, datetime.date(2026, 1, 4))
+    stale = datetime.datetime.utcnow() - datetime.timedelta(seconds=120)
+
+    assert queue.claim().attempts == 1
+    queue._update(job.id, heartbeat_at=stale)
+    assert queue.claim().attempts == 2
+    queue._update(job.id, heartbeat_at=stale)
+
+    assert queue.claim() is None
+    failed = queue.get(job.id)
+    assert failed.status == JobStatus.FAILED
+    assert "2 attempts" in failed.error
+
+
+def test_process_job_throttles_progress_writes(db_session):
+    """
+    Ensure progress is written at most once per interval while solving, plus the final progress.
+    """
+    class CountingQueue(InMemoryJobQueue):
+        def __init__(self):
+            super().__init__()
+            self.reported = []
+
+        def report_progress(self, job_id, solutions_found, best_objective, best_bound):
+            self.reported.append(solutions_found)
+            super().report_progress(job_id, solutions_found, best_objective, best_bound)
+
+    loc_id = setup_location(db_session, num_employees=6)
+    queue = CountingQueue()
+    job = queue.enqueue(loc_id, datetime.date(2026, 1, 4), warm_start=False)
+
+    process_job(queue, queue.claim(), session_factory=lambda: db_session, progress_interval=3600)
+
+    finished = queue.get(job.id)
+    assert finished.status == JobStatus.SUCCEEDED
+    assert 1 <= len(queue.reported) <= 2
+    assert queue.reported[0] == 1
+    assert finished.solutions_found == queue.reported[-1] >= 1